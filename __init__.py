@@ -3,12 +3,15 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
 
 import logging
+import time
 from .const import *
-from .config_flow import time_to_seconds
-from .model import StateController, GarageDoorState
+from .model import StateController, GarageDoorState, time_to_seconds
+from .storage import DoorHistory, DoorStore, async_remove_door_data
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,10 +20,22 @@ PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,  # report door stuck
     Platform.SENSOR,  # report last real open/close time
 ]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up integration-wide services & WebSocket commands; doors themselves are set up from config entries"""
+    # Imported here, as service schemas aren't needed until HA is actually set up (e.g. not when checking config)
+    from .services import async_setup_services
+    from .websocket import async_setup_websocket
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Up-Smart Garage from a config entry."""
+    started = time.perf_counter()
     hass.data.setdefault(DOMAIN, {})
 
     open_time = time_to_seconds(entry.data[CONF_OPEN_TIME])
@@ -33,8 +48,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         controller.invert_closed_signal()
     if entry.data[CONF_INVERT_OPENED_SENSOR]:
         controller.invert_opened_signal()
+    controller.decode_closed_signal(tuple(entry.data.get(CONF_CLOSED_SENSOR_ON_VALUES, ())),
+                                    entry.data.get(CONF_CLOSED_SENSOR_THRESHOLD),
+                                    entry.data.get(CONF_CLOSED_SENSOR_ATTRIBUTE) or None)
+    controller.decode_opened_signal(tuple(entry.data.get(CONF_OPENED_SENSOR_ON_VALUES, ())),
+                                    entry.data.get(CONF_OPENED_SENSOR_THRESHOLD),
+                                    entry.data.get(CONF_OPENED_SENSOR_ATTRIBUTE) or None)
+    controller.debounce_closed_signal(entry.data.get(CONF_CLOSED_SENSOR_DEBOUNCE, 0),
+                                      entry.data.get(CONF_CLOSED_SENSOR_MIN_STABLE, 0))
+    controller.debounce_opened_signal(entry.data.get(CONF_OPENED_SENSOR_DEBOUNCE, 0),
+                                      entry.data.get(CONF_OPENED_SENSOR_MIN_STABLE, 0))
+    for sensor, position in zip(entry.data.get(CONF_CHECKPOINT_SENSORS, ()),
+                                entry.data.get(CONF_CHECKPOINT_POSITIONS, ())):
+        controller.add_checkpoint(sensor, float(position))
+    controller.monitor_power(entry.data.get(CONF_POWER_SENSOR))
 
-    hass.data[DOMAIN][entry.entry_id] = GarageDoorState(entry.entry_id, controller)
+    state = GarageDoorState(entry.entry_id, controller)
+    store = DoorStore(hass, state)
+    await store.async_load()
+    restored = time.perf_counter()
+    entry.async_on_unload(store.async_watch())
+    entry.async_on_unload(store.async_flush)
+    history = DoorHistory(hass, state)
+    entry.async_on_unload(history.async_watch())
+    entry.async_on_unload(history.async_flush)
+    # The recorder is optional (set up before us when it's configured); without it there's nowhere to keep statistics
+    if "recorder" in hass.config.components:
+        from .long_term_statistics import DoorStatistics  # imports the recorder, so only when it's loaded
+
+        statistics = DoorStatistics(hass, state, history, entry.data[CONF_NAME])
+        entry.async_on_unload(statistics.async_watch())
+        # Reads the recorder - not worth delaying startup for, as statistics are only imported once an hour
+        entry.async_create_background_task(hass, statistics.async_replay(), f"{DOMAIN} statistics replay")
+    else:
+        _LOGGER.debug("%s keeps no long-term statistics, as the recorder isn't loaded", entry.entry_id)
+    hass.data[DOMAIN][entry.entry_id] = state
+    hass.data.setdefault(DATA_HISTORY, {})[entry.entry_id] = history
+    async_dispatcher_send(hass, SIGNAL_DOORS_CHANGED)
 
     # Keys must match one of the types as per validation added in ~2023.8 and later moved:
     # https://github.com/home-assistant/core/pull/95641
@@ -58,6 +108,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Boot time grows with every door, so keep an eye on how much each one costs
+    _LOGGER.debug("Set up door %s in %.1fms (restoring state took %.1fms)", entry.entry_id,
+                  (time.perf_counter() - started) * 1000, (restored - started) * 1000)
 
     return True
 
@@ -66,5 +119,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_HISTORY].pop(entry.entry_id, None)
+        async_dispatcher_send(hass, SIGNAL_DOORS_CHANGED)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete learned data and transition history of a removed door, which would otherwise stay in storage forever"""
+    await async_remove_door_data(hass, entry.entry_id)
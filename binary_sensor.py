@@ -6,16 +6,12 @@ import logging
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change
-from homeassistant.helpers import entity_registry as er
-from homeassistant.const import Platform
 
 from .const import DOMAIN
 from .entity import UpSmartCoverDerivedEntity
 if TYPE_CHECKING:
-    from .model import GarageDoorState
+    from .model import GarageDoorState, TransitionEvent
 
 _LOGGER = logging.getLogger(__package__)
 PARALLEL_UPDATES = 0
@@ -49,5 +45,5 @@ class GarageDoorBlockedSensor(UpSmartCoverDerivedEntity, BinarySensorEntity):
         return 'mdi:sync-alert' if self._garage_state.error else 'mdi:sync'
 
     @callback
-    async def _on_cover_state_change(self, entity_id, old_state, new_state) -> None:
-        self.async_write_ha_state()  # signal we may have an update - the is_on() is derived anyway
+    def _on_transition(self, event: TransitionEvent) -> None:
+        self._async_mark_dirty()  # signal we may have an update - the is_on() is derived anyway
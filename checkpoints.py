@@ -0,0 +1,85 @@
+"""Fusion of intermediate checkpoint sensors into a position & velocity estimate of a moving door"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Final, Iterable, NamedTuple
+
+# Next checkpoint is overdue once the door took this much longer than the current velocity predicts, plus the slack
+CHECKPOINT_MARGIN: Final[float] = 1.5
+CHECKPOINT_SLACK: Final[float] = 1.0  # seconds; covers sensor reporting delay, which matters for short segments
+
+
+class Checkpoint(NamedTuple):
+    sensor: str
+    position: float  # where the sensor trips; 0 = fully closed, 100 = fully opened
+
+
+class CheckpointFusion:
+    """
+    Tracks a moving door between checkpoints. Every crossing anchors the position, and the time taken since the
+    previous anchor gives the current velocity - so a door slowing down mid-way (e.g. a failing motor) is followed.
+
+    Fully closed/opened positions count as checkpoints as well, but only at the start of a transition - reaching them
+    is handled by the dedicated sensors and the transition deadline.
+    """
+    __slots__ = ("positions", "velocity", "_direction", "_anchor_position", "_anchor_time")
+
+    def __init__(self, positions: Iterable[float]):
+        self.positions = sorted(positions)
+        self.velocity: float | None = None  # percent per second, regardless of direction
+        self._direction = 0  # 1 = opening, -1 = closing, 0 = not moving
+        self._anchor_position: float | None = None
+        self._anchor_time = 0.0
+
+    @property
+    def is_tracking(self) -> bool:
+        return self._direction != 0 and self._anchor_position is not None
+
+    def start(self, opening: bool, position: float | None, now: float, duration: float) -> None:
+        """Starts tracking a transition from a known position (None if unknown), expected to take duration seconds"""
+        self._direction = 1 if opening else -1
+        self._anchor_position = position
+        self._anchor_time = now
+        self.velocity = 100 / duration
+
+    def stop(self) -> None:
+        self._direction = 0
+        self._anchor_position = None
+
+    def cross(self, position: float, now: float) -> None:
+        """Re-anchors the estimate at a checkpoint the door just passed"""
+        if self._anchor_position is not None and now > self._anchor_time and position != self._anchor_position:
+            self.velocity = abs(position - self._anchor_position) / (now - self._anchor_time)
+        self._anchor_position = position
+        self._anchor_time = now
+
+    def next_checkpoint(self) -> float | None:
+        """Position of the next checkpoint the door should pass, if any is left before the end of travel"""
+        if not self.is_tracking:
+            return None
+
+        if self._direction > 0:
+            index = bisect_right(self.positions, self._anchor_position)
+            return self.positions[index] if index < len(self.positions) else None
+        index = bisect_left(self.positions, self._anchor_position)
+        return self.positions[index - 1] if index > 0 else None
+
+    def deadline(self) -> float | None:
+        """Time the next checkpoint becomes overdue at, i.e. the door is considered jammed"""
+        checkpoint = self.next_checkpoint()
+        if checkpoint is None or not self.velocity:
+            return None
+
+        return self._anchor_time + abs(checkpoint - self._anchor_position) / self.velocity * CHECKPOINT_MARGIN \
+            + CHECKPOINT_SLACK
+
+    def position(self, now: float) -> float | None:
+        """Estimated position; never extrapolated past the next checkpoint, as the door would've reported crossing it"""
+        if not self.is_tracking or not self.velocity:
+            return None
+
+        position = self._anchor_position + self._direction * self.velocity * (now - self._anchor_time)
+        limit = self.next_checkpoint()
+        if limit is None:
+            limit = 100.0 if self._direction > 0 else 0.0
+        return min(position, limit) if self._direction > 0 else max(position, limit)
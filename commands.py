@@ -0,0 +1,159 @@
+"""Per-door actor serializing and coalescing door commands"""
+from __future__ import annotations
+
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Coroutine, Mapping
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class DoorCommand(Enum):
+    OPEN = "open"
+    CLOSE = "close"
+    STOP = "stop"
+    PULSE = "pulse"  # bare relay pulse, e.g. to release the relay after an external press
+
+
+_DIRECTIONAL = (DoorCommand.OPEN, DoorCommand.CLOSE)
+
+
+class CommandSuperseded(Exception):
+    """Raised to submitters of an open/close that was replaced by the opposite command before it could run"""
+
+
+class _Request:
+    __slots__ = ("command", "future", "submitted")
+
+    def __init__(self, command: DoorCommand, future: asyncio.Future[None], submitted: float):
+        self.command = command
+        self.future = future
+        self.submitted = submitted
+
+
+class CommandQueue:
+    """
+    Executes commands of a single door one at a time, in order of submission.
+
+    Redundant requests are coalesced instead of queued: a command identical to the last queued (or running, if nothing
+    is queued) one joins it, and an open/close waiting in the queue is replaced by the opposite one submitted later.
+    Every submitter awaits the request its command ended up in; those of a replaced one get CommandSuperseded.
+
+    The worker executing the queue is started with spawn, so the owner can tie its lifetime to e.g. a config entry.
+    """
+
+    def __init__(self, execute: Callable[[DoorCommand], Awaitable[Any]],
+                 clock: Callable[[], float] = time.monotonic,
+                 spawn: Callable[[Coroutine[Any, Any, None]], asyncio.Task[None]] | None = None):
+        self._execute = execute
+        self._clock = clock
+        self._spawn = spawn
+        self._pending: deque[_Request] = deque()
+        self._running: _Request | None = None
+        self._worker: asyncio.Task[None] | None = None
+
+        self.executed = 0
+        self.coalesced = 0
+        self.last_latency: float | None = None  # seconds from submission to completion of the last command
+        self.max_latency: float | None = None
+
+    @property
+    def depth(self) -> int:
+        """Number of commands waiting or being executed"""
+        return len(self._pending) + (self._running is not None)
+
+    async def async_submit(self, command: DoorCommand) -> None:
+        """Queues the command and waits until it (or the request it was coalesced into) is executed"""
+        request = self._coalesce(command)
+        if request is None:
+            request = _Request(command, asyncio.get_running_loop().create_future(), self._clock())
+            self._pending.append(request)
+            if self._worker is None:
+                self._worker = (self._spawn or asyncio.get_running_loop().create_task)(self._run())
+
+        # shielded, as one of the submitters being cancelled must not cancel the command for the others
+        await asyncio.shield(request.future)
+
+    def cancel(self) -> None:
+        """Drops all queued commands. The one being executed is let finish, so a relay is never left mid-pulse."""
+        for request in self._pending:
+            request.future.cancel()
+        self._pending.clear()
+
+    def _coalesce(self, command: DoorCommand) -> _Request | None:
+        tail = self._pending[-1] if self._pending else self._running
+        if tail is None:
+            return None
+
+        if tail.command is command:
+            self.coalesced += 1
+            _LOGGER.debug("Coalesced %s command with an identical one queued before", command.name)
+            return tail
+
+        # running command cannot be changed anymore, but the opposite waiting one can be superseded
+        if self._pending and command in _DIRECTIONAL and tail.command in _DIRECTIONAL:
+            self.coalesced += 1
+            _LOGGER.debug("Replaced queued %s command with %s", tail.command.name, command.name)
+            self._pending.pop()
+            tail.future.set_exception(CommandSuperseded(f"Superseded by {command.value} before it was executed"))
+            # its place in the queue is taken by a new request, so the new submitter's latency is measured from now
+            return None
+
+        return None
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                request = self._running = self._pending.popleft()
+                try:
+                    await self._execute(request.command)
+                except asyncio.CancelledError:
+                    request.future.cancel()
+                    raise
+                except Exception as e:  # pylint: disable=broad-except
+                    request.future.set_exception(e)
+                else:
+                    request.future.set_result(None)
+                finally:
+                    self._running = None
+
+                self.executed += 1
+                self.last_latency = self._clock() - request.submitted
+                if self.max_latency is None or self.last_latency > self.max_latency:
+                    self.max_latency = self.last_latency
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
+
+
+async def async_run_staggered(jobs: Mapping[str, Callable[[], Awaitable[Any]]], max_concurrent: int,
+                              stagger: float) -> dict[str, BaseException | None]:
+    """
+    Runs jobs concurrently, spread out in time: consecutive jobs start at least stagger seconds apart, and no more than
+    max_concurrent of them run at the same time. Returns exception raised by each job (None on success).
+
+    A job lasts only as long as its command (e.g. a relay pulse), not the door motion it starts - so it's the stagger
+    that spreads motor starts, while max_concurrent only limits relays pulsed at once.
+    """
+    if max_concurrent < 1:
+        raise ValueError(f"At least one job must be allowed to run at a time (got \"{max_concurrent}\")")
+
+    budget = asyncio.Semaphore(max_concurrent)
+    loop = asyncio.get_running_loop()
+    next_start = loop.time()
+
+    async def _run(job: Callable[[], Awaitable[Any]]) -> None:
+        nonlocal next_start
+        async with budget:
+            # start slots are handed out in order of acquiring the budget, so a freed slot doesn't start 2 jobs at once
+            start = max(next_start, loop.time())
+            next_start = start + stagger
+            await asyncio.sleep(start - loop.time())
+            await job()
+
+    keys = list(jobs)
+    results = await asyncio.gather(*(_run(jobs[key]) for key in keys), return_exceptions=True)
+    return {key: result for key, result in zip(keys, results)}
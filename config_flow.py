@@ -11,8 +11,10 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.selector import selector
 
 from .const import *
+from .model import time_to_seconds
 
 _LOGGER = logging.getLogger(__name__)
+DEBOUNCE_SELECTOR = {"min": 0, "max": 10, "step": 0.05, "unit_of_measurement": "s", "mode": "box"}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -32,6 +34,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         }),
         vol.Required(CONF_INVERT_CLOSED_SENSOR, default=False): bool,
+        vol.Optional(CONF_CLOSED_SENSOR_ON_VALUES): selector({"text": {"multiple": True}}),
+        vol.Optional(CONF_CLOSED_SENSOR_THRESHOLD): selector({"number": {"mode": "box", "step": "any"}}),
+        vol.Optional(CONF_CLOSED_SENSOR_ATTRIBUTE): str,
+        vol.Optional(CONF_CLOSED_SENSOR_DEBOUNCE, default=0): selector({"number": DEBOUNCE_SELECTOR}),
+        vol.Optional(CONF_CLOSED_SENSOR_MIN_STABLE, default=0): selector({"number": DEBOUNCE_SELECTOR}),
         vol.Required(CONF_CLOSE_TIME): selector({"duration": {}}),
 
         vol.Optional(CONF_OPENED_SENSOR): selector({
@@ -40,7 +47,26 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         }),
         vol.Required(CONF_INVERT_OPENED_SENSOR, default=False): bool,
+        vol.Optional(CONF_OPENED_SENSOR_ON_VALUES): selector({"text": {"multiple": True}}),
+        vol.Optional(CONF_OPENED_SENSOR_THRESHOLD): selector({"number": {"mode": "box", "step": "any"}}),
+        vol.Optional(CONF_OPENED_SENSOR_ATTRIBUTE): str,
+        vol.Optional(CONF_OPENED_SENSOR_DEBOUNCE, default=0): selector({"number": DEBOUNCE_SELECTOR}),
+        vol.Optional(CONF_OPENED_SENSOR_MIN_STABLE, default=0): selector({"number": DEBOUNCE_SELECTOR}),
         vol.Required(CONF_OPEN_TIME): selector({"duration": {}}),
+
+        vol.Optional(CONF_CHECKPOINT_SENSORS): selector({
+            "entity": {
+                "multiple": True,
+                "filter": {"domain": ["binary_sensor", "sensor"]}
+            }
+        }),
+        vol.Optional(CONF_CHECKPOINT_POSITIONS): selector({"text": {"multiple": True}}),
+
+        vol.Optional(CONF_POWER_SENSOR): selector({
+            "entity": {
+                "filter": {"domain": ["sensor"], "device_class": ["power", "current"]}
+            }
+        }),
     }
 
     def _create_form_schema(self) -> vol.Schema:
@@ -64,6 +90,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if CONF_OPENED_SENSOR not in data and CONF_CLOSED_SENSOR not in data:
             raise SensorRequired("At least one sensor is required")
 
+        for on_values, threshold in ((CONF_CLOSED_SENSOR_ON_VALUES, CONF_CLOSED_SENSOR_THRESHOLD),
+                                     (CONF_OPENED_SENSOR_ON_VALUES, CONF_OPENED_SENSOR_THRESHOLD)):
+            if data.get(on_values) and data.get(threshold) is not None:
+                raise InvalidDecoding(f"Only one of \"{on_values}\" and \"{threshold}\" can be set")
+
+        sensors = data.get(CONF_CHECKPOINT_SENSORS, [])
+        positions = data.get(CONF_CHECKPOINT_POSITIONS, [])
+        if len(sensors) != len(positions):
+            raise InvalidCheckpoints("Every checkpoint sensor needs exactly one position")
+        try:
+            positions = [float(position) for position in positions]
+        except ValueError as e:
+            raise InvalidCheckpoints("Checkpoint positions must be numbers") from e
+        if any(not 0 < position < 100 for position in positions) or len(set(positions)) != len(positions):
+            raise InvalidCheckpoints("Checkpoint positions must be unique and between 0% and 100%")
+
         return data
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
@@ -86,6 +128,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except InvalidCloseTime as e:
             _LOGGER.exception(f"Invalid close time: {str(e)}")
             errors["base"] = "invalid_close_time"
+        except InvalidDecoding as e:
+            _LOGGER.exception(f"Invalid sensor decoding: {str(e)}")
+            errors["base"] = "invalid_decoding"
+        except InvalidCheckpoints as e:
+            _LOGGER.exception(f"Invalid checkpoints: {str(e)}")
+            errors["base"] = "invalid_checkpoints"
         except Exception as e:  # pylint: disable=broad-except
             _LOGGER.exception(f"Unexpected exception: {str(e)}")
             errors["base"] = "unknown"
@@ -98,21 +146,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(step_id="user", data_schema=self._create_form_schema(), errors=errors)
 
 
-def time_to_seconds(time: dict) -> int:
-    seconds = 0
-
-    if 'seconds' in time:
-        seconds += time['seconds']
-
-    if 'minutes' in time:
-        seconds += time['minutes'] * 60
-
-    if 'hours' in time:
-        seconds += time['hours'] * 3600
-
-    return seconds
-
-
 class SensorRequired(HomeAssistantError):
     """At least one sensor is required"""
 
@@ -123,3 +156,11 @@ class InvalidOpenTime(HomeAssistantError):
 
 class InvalidCloseTime(HomeAssistantError):
     """Time to close needs to be set"""
+
+
+class InvalidDecoding(HomeAssistantError):
+    """Sensor state is decoded either by on values or by a threshold"""
+
+
+class InvalidCheckpoints(HomeAssistantError):
+    """Checkpoint sensors need matching, distinct positions"""
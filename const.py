@@ -11,7 +11,49 @@ CONF_NAME: Final = "name"
 CONF_TOGGLE_RELAY: Final = "state_toggle_relay"
 CONF_CLOSED_SENSOR: Final = "closed_sensor"
 CONF_INVERT_CLOSED_SENSOR: Final = "invert_closed_sensor"
+CONF_CLOSED_SENSOR_ON_VALUES: Final = "closed_sensor_on_values"
+CONF_CLOSED_SENSOR_THRESHOLD: Final = "closed_sensor_threshold"
+CONF_CLOSED_SENSOR_ATTRIBUTE: Final = "closed_sensor_attribute"
+CONF_CLOSED_SENSOR_DEBOUNCE: Final = "closed_sensor_debounce"
+CONF_CLOSED_SENSOR_MIN_STABLE: Final = "closed_sensor_min_stable"
 CONF_OPENED_SENSOR: Final = "opened_sensor"
 CONF_INVERT_OPENED_SENSOR: Final = "invert_opened_sensor"
+CONF_OPENED_SENSOR_ON_VALUES: Final = "opened_sensor_on_values"
+CONF_OPENED_SENSOR_THRESHOLD: Final = "opened_sensor_threshold"
+CONF_OPENED_SENSOR_ATTRIBUTE: Final = "opened_sensor_attribute"
+CONF_OPENED_SENSOR_DEBOUNCE: Final = "opened_sensor_debounce"
+CONF_OPENED_SENSOR_MIN_STABLE: Final = "opened_sensor_min_stable"
 CONF_OPEN_TIME: Final = "open_time"
 CONF_CLOSE_TIME: Final = "close_time"
+CONF_CHECKPOINT_SENSORS: Final = "checkpoint_sensors"
+CONF_CHECKPOINT_POSITIONS: Final = "checkpoint_positions"  # percent opened each checkpoint sensor trips at
+CONF_POWER_SENSOR: Final = "power_sensor"
+
+SERVICE_DUMP_TRACE: Final = "dump_trace"
+SERVICE_OPERATE_DOORS: Final = "operate_doors"
+SERVICE_QUERY_HISTORY: Final = "query_history"
+WS_TYPE_SUBSCRIBE_DOORS: Final = f"{DOMAIN}/subscribe_doors"
+SIGNAL_DOORS_CHANGED: Final = f"{DOMAIN}_doors_changed"  # a door was set up or unloaded
+ATTR_DEVICE_ID: Final = "device_id"
+ATTR_COMMAND: Final = "command"
+ATTR_MAX_CONCURRENT: Final = "max_concurrent"
+ATTR_STAGGER: Final = "stagger"
+DEFAULT_MAX_CONCURRENT: Final = 2  # how many door relays may be pulsed at the same time (motors run on after it)
+DEFAULT_STAGGER: Final = 1.0  # seconds between starting consecutive motors, letting inrush current settle
+ATTR_SINCE: Final = "since"
+ATTR_UNTIL: Final = "until"
+ATTR_LIMIT: Final = "limit"
+ATTR_AGGREGATE: Final = "aggregate"
+DEFAULT_HISTORY_LIMIT: Final = 100
+MAX_HISTORY_LIMIT: Final = 10000
+
+DATA_ROUTER: Final = f"{DOMAIN}_router"
+DATA_COMMANDS: Final = f"{DOMAIN}_commands"
+DATA_WRITER: Final = f"{DOMAIN}_writer"
+DATA_HISTORY: Final = f"{DOMAIN}_history"
+DATA_TIMERS: Final = f"{DOMAIN}_timers"
+
+STORAGE_VERSION: Final = 1
+STORAGE_SAVE_DELAY: Final = 60  # seconds; learned data changes rarely, so writes are batched
+STATISTICS_REPLAY_DAYS: Final = 30  # how far back hours not imported into statistics are rebuilt from after restart
+HISTORY_WRITE_DELAY: Final = 300  # seconds; transitions finished within this time are appended to the log at once
@@ -1,28 +1,36 @@
 from __future__ import annotations
 
-import time
-from typing import TYPE_CHECKING, Final, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 import logging
-import datetime
 
 import asyncio
-from homeassistant.core import HomeAssistant, Event, callback, CALLBACK_TYPE
+from homeassistant.const import ATTR_DEVICE_CLASS, ATTR_UNIT_OF_MEASUREMENT, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, State, callback, CALLBACK_TYPE
 from homeassistant.components.cover import CoverEntity, CoverDeviceClass, CoverEntityFeature
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event, async_call_later
 from homeassistant.helpers import issue_registry as ir
 
-from .const import DOMAIN
+from .commands import CommandQueue, CommandSuperseded, DoorCommand
+from .const import DATA_COMMANDS, DATA_TIMERS, DOMAIN
+from .debounce import SensorFilter
+from .decoders import Decoder, build_decoder
+from .engine import DoorEngine
 from .entity import UpSmartGarageEntity
-from .model import DoorState
+from .issues import IssueTracker
+from .model import DoorState, SystemClock, TransitionEventType
+from .power import motor_reading
+from .router import async_get_router
+from .timer_wheel import TimerWheel
 if TYPE_CHECKING:
-    from .model import GarageDoorState
+    from .model import GarageDoorState, TransitionEvent
 
 _LOGGER = logging.getLogger(__package__)
 # SCAN_INTERVAL = timedelta(seconds=10)
 PARALLEL_UPDATES = 0
+PROGRESS_INTERVAL = 1.0  # seconds between position updates of a moving door
 
 
 async def async_setup_entry(
@@ -33,25 +41,109 @@ async def async_setup_entry(
     """Set up the actual door cover entity from config entry and central state"""
     state: GarageDoorState = hass.data[DOMAIN][config_entry.entry_id]
 
-    async_add_entities([UpSmartGarageCover(hass, state)], True)
+    async_add_entities([UpSmartGarageCover(hass, state, config_entry)], True)
 
 
-# The cover is the main state machine for the integration. Other entities derive its state from what the cover persists
-# in the GarageDoorState.
+class HassScheduler:
+    """
+    Runs timers of all doors (transition deadlines, debounce windows, progress updates) on the HA event loop. They
+    share a single TimerWheel, so there's at most one loop timer armed for the whole integration.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.wheel = TimerWheel(SystemClock(), self._wake)  # loop.time() is monotonic as well
+
+    def call_later(self, delay: float, action: Callable[[], None]) -> CALLBACK_TYPE:
+        return self.wheel.call_later(delay, action)
+
+    def _wake(self, when: float | None) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = None if when is None else self._hass.loop.call_at(when, self._advance)
+
+    def _advance(self) -> None:
+        self._wakeup = None
+        self.wheel.advance()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> HassScheduler:
+    scheduler: HassScheduler | None = hass.data.get(DATA_TIMERS)
+    if scheduler is None:
+        scheduler = hass.data[DATA_TIMERS] = HassScheduler(hass)
+
+    return scheduler
+
+
+# The cover is an adapter between HA and the DoorEngine, which is the main state machine for the integration. Other
+# entities derive its state from what the engine persists in the GarageDoorState.
 class UpSmartGarageCover(UpSmartGarageEntity, CoverEntity):
-    _transition_grace_multiplier: Final[float] = 1.1
     _attr_icon = "mdi:garage"
     _attr_device_class = CoverDeviceClass.GARAGE
 
-    _garage_state: GarageDoorState
-    _transition_timer: CALLBACK_TYPE | None = None  # in transition; watching for the typical delta+10% (i.e. failsafe)
-    _sensor_closed: bool | None = None  # if we have sensor for fully closed it will signify its state
-    _sensor_opened: bool | None = None  # if we have sensor for fully open it will signify its state
-    _toggle_state: bool | None = None  # toggle button state used to control the open/close/stop action of the door
+    _unrecorded_attributes = frozenset({"command_queue_depth", "command_latency", "closed_sensor_suppressed",
+                                        "opened_sensor_suppressed", "issues_suppressed"})
 
-    def __init__(self, hass: HomeAssistant, state: GarageDoorState):
+    _garage_state: GarageDoorState
+    _engine: DoorEngine
+    _commands: CommandQueue  # serializes relay pulses, as automations can command the door from many places at once
+    _closed_decoder: Decoder
+    _opened_decoder: Decoder
+    _toggle_decoder: Decoder
+    _checkpoint_decoder: Decoder
+    _closed_filter: SensorFilter  # collapses reed contact chatter before it reaches the engine
+    _opened_filter: SensorFilter
+    _issues: IssueTracker  # a flapping sensor would otherwise write the issue registry on every flap
+    _unknown_sensors: set[str]  # unavailable at startup; reconciling the restored state waits for their readings
+    _command_started: float  # when the command being executed started, for measuring relay latency
+    _scheduler: HassScheduler  # shared by all doors
+    _progress_timer: CALLBACK_TYPE | None  # publishes position while the door moves
+
+    def __init__(self, hass: HomeAssistant, state: GarageDoorState, entry: ConfigEntry):
+        # decoders are compiled once, so reading a sensor on every event is a single call
+        self._closed_decoder = build_decoder(state.controller.closed_decoding, not state.controller.on_close)
+        self._opened_decoder = build_decoder(state.controller.opened_decoding, not state.controller.on_open)
+        self._toggle_decoder = build_decoder()
+        self._checkpoint_decoder = build_decoder()
+        scheduler = async_get_scheduler(hass)
+        self._scheduler = scheduler
+        self._progress_timer: CALLBACK_TYPE | None = None
+        self._issues = IssueTracker(state.clock, self._create_state_issue, self._delete_state_issue)
+        self._engine = DoorEngine(state, scheduler, self._on_engine_update, self._issues.occurred, self._issues.resolve)
+        # worker is cancelled on unload, rather than outliving the entry and pulsing the relay of a removed door
+        self._commands = CommandQueue(self._async_execute, spawn=lambda run: entry.async_create_background_task(
+            hass, run, f"{DOMAIN} {state.internal_id} commands"))
+        self._command_started = state.clock.monotonic()
+        self._unknown_sensors = set()
+        self._closed_filter = SensorFilter(self._on_closed_edge, scheduler, state.clock,
+                                           state.controller.closed_debounce)
+        self._opened_filter = SensorFilter(self._on_opened_edge, scheduler, state.clock,
+                                           state.controller.opened_debounce)
         super().__init__(hass, state, "door")
-        self._sync_state()
+        self.async_on_remove(self._commands.cancel)
+        self.async_on_remove(self._closed_filter.cancel)
+        self.async_on_remove(self._opened_filter.cancel)
+        self.async_on_remove(state.subscribe(self._on_transition))
+        self.async_on_remove(self._cancel_progress)
+        if self._unknown_sensors:  # e.g. integration providing them isn't loaded yet
+            _LOGGER.debug("%s keeps restored state until %s report", self.unique_id, ", ".join(self._unknown_sensors))
+        else:
+            self._engine.sync()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # lets integration-wide services command the door directly, without a round-trip through the cover service
+        queues = self.hass.data.setdefault(DATA_COMMANDS, {})
+        queues[self._garage_state.internal_id] = self._commands
+        self.async_on_remove(lambda: queues.pop(self._garage_state.internal_id, None))
+
+        # issues raised before a restart are still in the registry, and should be resolved like the new ones
+        prefix = f"{self.unique_id}_"
+        for (domain, issue_id), issue in ir.async_get(self.hass).issues.items():
+            if domain == DOMAIN and issue_id.startswith(prefix) and issue.active and issue.severity is not None:
+                self._issues.adopt(issue_id[len(prefix):], issue.severity.value)
 
     @property
     def supported_features(self) -> CoverEntityFeature:
@@ -60,47 +152,27 @@ class UpSmartGarageCover(UpSmartGarageEntity, CoverEntity):
     @property
     def current_cover_position(self) -> int | None:
         """Attempts to derive door position based on time to open/close them"""
-        if not self._garage_state.is_in_motion():
-            match self._garage_state.last_state:
-                case DoorState.OPENED:
-                    return 100
-                case DoorState.PARTIALLY_OPEN:
-                    return 50
-                case DoorState.CLOSED:
-                    return 0
-                case None:
-                    return None
-
-        if self._garage_state.last_state is None:
-            _LOGGER.debug(f"{self.unique_id} guessed current position as 50% as last state is unknown")
-            return 50
-
-        real_delta = time.monotonic() - self._garage_state.transition_triggered
-        expected_delta = self._garage_state.delta_for_current_state
-        if real_delta > expected_delta:  # most likely stuck somewhere
-            _LOGGER.debug(f"{self.unique_id} current position unknown - time delta {real_delta}s > {expected_delta}s")
-            return None
-
-        transition_pos = int(round(real_delta/expected_delta))
-        return transition_pos if self._garage_state.target_state == DoorState.OPENED else 100-transition_pos
+        return self._engine.position()
 
     @property
     def is_closed(self) -> bool | None:
         """Determines whether the door is FULLY closed"""
         # even if last_state is unknown, when door is in motion we know it cannot be (fully) closed, regardless if we
         # can determine whether it's closING or openING
-        _LOGGER.debug(f"isClosed? lstate={self._garage_state.last_state} result={self._garage_state.last_state == DoorState.CLOSED and not self._garage_state.is_in_motion()}")
-        return self._garage_state.last_state == DoorState.CLOSED and not self._garage_state.is_in_motion()
+        # HA reads these properties on every state write: compute once & log lazily, so it is free with debug disabled
+        result = self._garage_state.last_state == DoorState.CLOSED and not self._garage_state.is_in_motion()
+        _LOGGER.debug("isClosed? lstate=%s result=%s", self._garage_state.last_state, result)
+        return result
 
     @property
     def is_open(self) -> bool | None:
         """Determines whether the door is FULLY opened"""
         # even if last_state is unknown, when door is in motion we know it cannot be (fully) open, regardless if we
         # can determine whether it's closING or openING
-        debug_target = (self._garage_state.last_state == DoorState.OPENED and not self._garage_state.is_in_motion()) or self._garage_state.last_state == DoorState.PARTIALLY_OPEN
-        _LOGGER.debug(f"isOpen? lstate={self._garage_state.last_state} result={debug_target}")
-        return (self._garage_state.last_state == DoorState.OPENED and not self._garage_state.is_in_motion()) or \
+        result = (self._garage_state.last_state == DoorState.OPENED and not self._garage_state.is_in_motion()) or \
             self._garage_state.last_state == DoorState.PARTIALLY_OPEN
+        _LOGGER.debug("isOpen? lstate=%s result=%s", self._garage_state.last_state, result)
+        return result
 
     @property
     def is_opening(self) -> bool | None:
@@ -109,10 +181,10 @@ class UpSmartGarageCover(UpSmartGarageEntity, CoverEntity):
             _LOGGER.debug("isOpening? lstate=None => result=None")
             return None
 
-        _LOGGER.debug(f"isOpening? lstate={self._garage_state.last_state} "
-                      f"target={self._garage_state.target_state} => " 
-                      f"result={self._garage_state.target_state == DoorState.OPENED}")
-        return self._garage_state.target_state == DoorState.OPENED
+        result = self._garage_state.target_state == DoorState.OPENED
+        _LOGGER.debug("isOpening? lstate=%s target=%s => result=%s", self._garage_state.last_state,
+                      self._garage_state.target_state, result)
+        return result
 
     @property
     def is_closing(self) -> bool | None:
@@ -120,8 +192,9 @@ class UpSmartGarageCover(UpSmartGarageEntity, CoverEntity):
         if self._garage_state.last_state is None:  # if last state is unknown we don't know if it's opening or closing
             _LOGGER.debug("isClosing? => None")
             return None
-        _LOGGER.debug(f"isClosing? => target={self._garage_state.target_state} result={self._garage_state.target_state == DoorState.CLOSED}")
-        return self._garage_state.target_state == DoorState.CLOSED
+        result = self._garage_state.target_state == DoorState.CLOSED
+        _LOGGER.debug("isClosing? => target=%s result=%s", self._garage_state.target_state, result)
+        return result
 
     @property
     def icon(self) -> str:
@@ -131,320 +204,305 @@ class UpSmartGarageCover(UpSmartGarageEntity, CoverEntity):
         return 'mdi:garage-alert' if self._garage_state.error else 'mdi:garage'
 
     async def async_set_cover_position(self, **kwargs: Any) -> None:
-        # While realistically it could be possible to kind-of implement this based on the open/close time, it will be
-        # probably grossly inaccurate and prone to failures. This is because typical door motion isn't linear and the
-        # time is only semi-predictable when starting from the bottom or top (i.e. time-to-close when open at 50% isn't
-        # equal to time-to-close/2)
+        # While the position is estimated from learned travel profiles, setting it would rely on stopping the door at
+        # the right moment. It will be probably grossly inaccurate and prone to failures, as the time is only
+        # semi-predictable when starting from the bottom or top (i.e. time-to-close when open at 50% isn't equal to
+        # time-to-close/2)
         raise NotImplementedError()
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        attributes = {
+            "command_queue_depth": self._commands.depth,
+            "command_latency": self._commands.last_latency,
+        }
+        if self._garage_state.controller.closed_sensor is not None:
+            attributes["closed_sensor_suppressed"] = self._closed_filter.suppressed
+        if self._garage_state.controller.opened_sensor is not None:
+            attributes["opened_sensor_suppressed"] = self._opened_filter.suppressed
+        attributes["issues_suppressed"] = self._issues.suppressed
+
+        return attributes
+
     async def async_open_cover(self, **kwargs: Any) -> None:
+        await self._async_submit(DoorCommand.OPEN)
+
+    async def async_close_cover(self, **kwargs: Any) -> None:
+        await self._async_submit(DoorCommand.CLOSE)
+
+    async def async_stop_cover(self, **kwargs: Any) -> None:
+        await self._async_submit(DoorCommand.STOP)
+
+    async def _async_submit(self, command: DoorCommand) -> None:
+        try:
+            await self._commands.async_submit(command)
+        except CommandSuperseded as e:
+            raise HomeAssistantError(f"Could not {command.value} {self.unique_id}: {e}") from e
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        super().async_write_ha_state()
+        self._garage_state.metrics.state_written()
+
+    async def _async_execute(self, command: DoorCommand) -> None:
+        """Executes a command from the queue; only one runs at a time"""
+        self._command_started = self._garage_state.clock.monotonic()
+        match command:
+            case DoorCommand.OPEN:
+                await self._async_open()
+            case DoorCommand.CLOSE:
+                await self._async_close()
+            case DoorCommand.STOP:
+                await self._async_stop()
+            case DoorCommand.PULSE:
+                await self._pulse_toggle()
+                self._async_mark_dirty()
+
+    async def _async_open(self) -> None:
         """Performs fully closed to open transition"""
-        _LOGGER.debug(f"Open requested for {self.unique_id}")
+        _LOGGER.debug("Open requested for %s", self.unique_id)
         if self.is_opening:
-            _LOGGER.warning(f"Attempted to open {self.unique_id} when it is already opening")
+            _LOGGER.warning("Attempted to open %s when it is already opening", self.unique_id)
             return
 
         if self.is_closing:
-            _LOGGER.debug(f"{self.unique_id} is closing - stopping first")
-            await self.async_stop_cover()
+            _LOGGER.debug("%s is closing - stopping first", self.unique_id)
+            await self._async_stop()
 
         await self._do_transition_state(DoorState.OPENED)
 
-    async def async_close_cover(self, **kwargs: Any) -> None:
+    async def _async_close(self) -> None:
         """Performs open/partially-open to close transition"""
-        _LOGGER.debug(f"Close requested for {self.unique_id}")
+        _LOGGER.debug("Close requested for %s", self.unique_id)
         if self.is_closing:
-            _LOGGER.warning(f"Attempted to close {self.unique_id} when it is already closing")
+            _LOGGER.warning("Attempted to close %s when it is already closing", self.unique_id)
             return
 
         if self.is_opening:
-            _LOGGER.debug(f"{self.unique_id} is opening - stopping first")
-            await self.async_stop_cover()
+            _LOGGER.debug("%s is opening - stopping first", self.unique_id)
+            await self._async_stop()
 
         await self._do_transition_state(DoorState.CLOSED)
 
     async def _do_transition_state(self, state: DoorState) -> None:
         """Generic open-to-close / close-to-open transition function"""
-        # Attempt transition first, to make sure the intended action conforms to the state machine
-        try:
-            self._garage_state.transition(state)
-        except ValueError as e:
-            _LOGGER.error(e)
-
-        # Realistically, we hope that open/close sensor will trip before this timer. However, this lets us determine if
-        # the door maybe stopped in the middle before reaching the sensor. In addition, this timer is required to
-        # emulate door hitting the position where there may not be a sensor (e.g. user only has close but not open
-        # sensor)
-        max_expected_time = self._garage_state.delta_for_current_state * self._transition_grace_multiplier
-        self._transition_timer = async_call_later(self.hass, max_expected_time, self.on_transition_timer_finish)
-        _LOGGER.debug(f"{self.unique_id} will be transitioning " 
-                      f"{self._garage_state.last_state} => {state.name} in max {max_expected_time}s")
-
+        self._engine.begin_transition(state)
         await self._pulse_toggle()
-        self.async_write_ha_state()
+        self._async_mark_dirty()
 
-    async def async_stop_cover(self, **kwargs: Any) -> None:
-        if not self._garage_state.is_in_motion():
-            _LOGGER.warning(f"{self.unique_id} not in motion - not stopping")
+    async def _async_stop(self) -> None:
+        if not self._engine.stop():
             return
 
-        # Attempt transition first, to make sure the intended action conforms to the state machine
-        _LOGGER.debug(f"{self.unique_id} stopping on request")
-        try:
-            self._garage_state.abort_transition()
-        except ValueError as e:
-            _LOGGER.error(e)
-
-        # take care of the timer as manually stopping the cover is physically equivalent of it getting stuck but on
-        # purpose. However, it is not an error condition per-se.
-        if self._transition_timer is not None:
-            self._transition_timer()
-
         await self._pulse_toggle()
-        self.async_write_ha_state()
+        self._async_mark_dirty()
 
     async def _pulse_toggle(self) -> None:
         """Causes a physical toggle on-wait-off to be sent to the garage door controller without any logic"""
-        _LOGGER.debug(f"Toggle pulse requested for {self.unique_id}")
-        if self._toggle_state:
-            _LOGGER.warning(f"Toggle pulse denied - another one in progress")
+        _LOGGER.debug("Toggle pulse requested for %s", self.unique_id)
+        if self._engine.toggle_state:
+            _LOGGER.warning("Toggle pulse denied - another one in progress")
+            self._garage_state.metrics.pulse_suppressed()
             return
 
-        if self._toggle_state is None:  # this can happen esp. when the integration started before relay integration
-            _LOGGER.warning(f"Toggle in unknown state - attempting pulse anyway")
+        if self._engine.toggle_state is None:  # this can happen esp. when the integration started before relay's one
+            _LOGGER.warning("Toggle in unknown state - attempting pulse anyway")
 
         await self.hass.services.async_call('homeassistant', 'turn_on',
                                             {'entity_id': self._garage_state.controller.toggle_controller})
-        self._toggle_state = True
-        # cannot use async_call_later() here, as we need an async job to await, making rest of the code simpler
-        await asyncio.sleep(self._garage_state.controller.pulse_time)
-        _LOGGER.debug(f"Toggle pulse finished for {self.unique_id}")
-        await self.hass.services.async_call('homeassistant', 'turn_off',
-                                            {'entity_id': self._garage_state.controller.toggle_controller})
-        self._toggle_state = False
-        self._garage_state.error = False  # clear error if any; we moved the door (presumably)
+        self._engine.toggle_state = True
+        self._garage_state.metrics.relay_turned_on(self._command_started)
+        try:
+            # cannot use async_call_later() here, as we need an async job to await, making rest of the code simpler
+            await asyncio.sleep(self._garage_state.controller.pulse_time)
+        finally:  # even when cancelled (e.g. on shutdown) - the relay must not stay energized
+            _LOGGER.debug("Toggle pulse finished for %s", self.unique_id)
+            await self.hass.services.async_call('homeassistant', 'turn_off',
+                                                {'entity_id': self._garage_state.controller.toggle_controller})
+            self._engine.toggle_state = False
+        self._garage_state.clear_error()  # we moved the door (presumably)
 
     def _subscribe_state_changes(self) -> None:
         """Observes changes in the physical world to develop a virtual state"""
-        if self._garage_state.controller.closed_sensor is not None:
-            _LOGGER.debug(f"{self.unique_id} has closed sensor - subscribing")
-            async_track_state_change_event(self.hass, self._garage_state.controller.closed_sensor,
-                                           self.on_closed_sensor_state_change)
-            self.read_closed_sensor()
-
-        if self._garage_state.controller.opened_sensor is not None:
-            _LOGGER.debug(f"{self.unique_id} has opened sensor - subscribing")
-            async_track_state_change_event(self.hass, self._garage_state.controller.opened_sensor,
-                                           self.on_opened_sensor_state_change)
-            self.read_opened_sensor()
-
-        async_track_state_change_event(self.hass, self._garage_state.controller.toggle_controller,
-                                       self.on_toggle_state_change)
-        self._toggle_state = self._do_read_binary_state(self._garage_state.controller.toggle_controller)
+        router = async_get_router(self.hass)
+        controller = self._garage_state.controller
+        if controller.closed_sensor is not None:
+            _LOGGER.debug("%s has closed sensor - subscribing", self.unique_id)
+            self.async_on_remove(router.async_register(controller.closed_sensor,
+                                                       self._measured(self.on_closed_sensor_state_change),
+                                                       controller.closed_decoding.attribute))
+            closed = self._do_read_binary_state(controller.closed_sensor, self._closed_decoder)
+            if closed is None:
+                self._unknown_sensors.add(controller.closed_sensor)
+            self._engine.sensor_closed = bool(closed)
+            self._closed_filter.reset(self._engine.sensor_closed)
+
+        if controller.opened_sensor is not None:
+            _LOGGER.debug("%s has opened sensor - subscribing", self.unique_id)
+            self.async_on_remove(router.async_register(controller.opened_sensor,
+                                                       self._measured(self.on_opened_sensor_state_change),
+                                                       controller.opened_decoding.attribute))
+            opened = self._do_read_binary_state(controller.opened_sensor, self._opened_decoder)
+            if opened is None:
+                self._unknown_sensors.add(controller.opened_sensor)
+            self._engine.sensor_opened = bool(opened)
+            self._opened_filter.reset(self._engine.sensor_opened)
+
+        for checkpoint in controller.checkpoints:
+            _LOGGER.debug("%s has checkpoint sensor at %s%% - subscribing", self.unique_id, checkpoint.position)
+            handler = self._measured(self._checkpoint_state_change(checkpoint.position))
+            self.async_on_remove(router.async_register(checkpoint.sensor, handler))
+
+        if controller.power_sensor is not None:
+            _LOGGER.debug("%s has power sensor - subscribing", self.unique_id)
+            self.async_on_remove(router.async_register(controller.power_sensor, self.on_power_state_change))
+
+        self.async_on_remove(router.async_register(controller.toggle_controller,
+                                                   self._measured(self.on_toggle_state_change)))
+        self._engine.toggle_state = self._do_read_binary_state(controller.toggle_controller, self._toggle_decoder)
 
     @callback
-    async def on_closed_sensor_state_change(self, event: Event) -> None:
+    def on_closed_sensor_state_change(self, state: State) -> None:
         """Triggers when door-fully-closed sensor changes its state"""
-        self.read_closed_sensor(event.data.get('new_state').state)
-        self._ensure_no_sensor_state_conflict()
-
-        if not self._garage_state.is_in_motion():  # door was opened or closed externally
-            # we don't need to check _sensor_opened here (it will be None or False) as _ensure_no_sensor_state_conflict
-            # guarantees it is not True when _sensor_closed is True
-            state = DoorState.CLOSED if self._sensor_closed else DoorState.OPENED
-            self._garage_state.force_state(state)
-            _LOGGER.debug(f"{self.unique_id} closed sensor tripped when not in motion - computed {state}")
-            self.async_write_ha_state()
+        value = self._decode(state, self._closed_decoder)
+        if value is None:
             return
-
-        if self._sensor_closed:  # sensor indicates that the door has closed
-            if self._garage_state.target_state == DoorState.CLOSED:  # ...and we expected it to close -> all good
-                self._garage_state.complete_transition()
-            else:  # -> we expected it to open; not good - something is broken (either door stuck or sensors inverted)
-                self._garage_state.abort_transition(error=True)
-                self._create_state_issue("closed_when_opening")
-
-            assert self._transition_timer
-            self._transition_timer()
-            self.async_write_ha_state()
+        if state.entity_id in self._unknown_sensors:
+            self._engine.sensor_closed = value
+            self._closed_filter.reset(value)
+            self._on_first_reading(state.entity_id)
             return
-
-        # sensor indicated the door is not fully closed anymore, and it is in motion
-        if self._garage_state.target_state != DoorState.OPENED:  # ...but we didn't expect it to start opening!
-            self._garage_state.abort_transition(error=True)
-            self._create_state_issue("opened_when_closing")
-            self.async_write_ha_state()
+        self._closed_filter.push(value)
 
     @callback
-    async def on_opened_sensor_state_change(self, event: Event) -> None:
+    def on_opened_sensor_state_change(self, state: State) -> None:
         """Triggers when door-fully-open sensor changes its state"""
-        self.read_opened_sensor(event.data.get('new_state').state)
-        self._ensure_no_sensor_state_conflict()
-
-        if not self._garage_state.is_in_motion():  # door was opened or closed externally
-            state = DoorState.OPENED if self._sensor_opened and self._sensor_closed is not False else DoorState.CLOSED
-            self._garage_state.force_state(state)
-            _LOGGER.debug(f"{self.unique_id} opened sensor tripped when not in motion - computed {state}")
-            self.async_write_ha_state()
+        value = self._decode(state, self._opened_decoder)
+        if value is None:
             return
-
-        if self._sensor_opened:  # sensor indicates that the door has opened
-            if self._garage_state.target_state == DoorState.OPENED:  # ...and we expected it to open -> all good
-                self._garage_state.complete_transition()
-            else:  # -> we expected it to close; not good - something is broken (either door stuck or sensors inverted)
-                self._garage_state.abort_transition(error=True)
-                self._create_state_issue("opened_when_closing")
-
-            assert self._transition_timer
-            self._transition_timer()
-            self.async_write_ha_state()
+        if state.entity_id in self._unknown_sensors:
+            self._engine.sensor_opened = value
+            self._opened_filter.reset(value)
+            self._on_first_reading(state.entity_id)
             return
-
-        # sensor indicated the door is not fully opened anymore, and it is in motion
-        if self._garage_state.target_state != DoorState.CLOSED:  # ...but we didn't expect it to start closing!
-            self._garage_state.abort_transition(error=True)
-            self._create_state_issue("closed_when_opening")
-            self.async_write_ha_state()
+        self._opened_filter.push(value)
 
     @callback
-    async def on_toggle_state_change(self, event: Event) -> None:
+    def on_toggle_state_change(self, state: State) -> None:
         """Triggered when garage toggle button controller changes its state"""
-        event_state = self.value_to_bool(event.data.get('new_state').state)
-        _LOGGER.debug(f"{self.unique_id} detected action controller state transition to {event_state}")
-        if self._toggle_state == event_state:  # ignore - we triggered it via _toggle_pulse()
-            _LOGGER.debug(f"{self.unique_id} transition state is the same as _toggle_state - ignoring")
-            return
-
-        # we're DELIBERATELY ignoring transition to "off" state. This can be either the external relay automatically
-        # turning off without HA prompting it to do so (safety feature)
-        if not event_state:
-            _LOGGER.debug(f"{self.unique_id} transition to off - ignoring")
-            return
-
-        # since the toggle turned on outside our integration (either from another HA automation or e.g. via native
-        # app for a relay or similar) we have no choice other than derive the state
-        if self._garage_state.is_in_motion():  # pressing the button will stop the door
-            if self._transition_timer is not None:
-                self._transition_timer()
-            self._garage_state.abort_transition()
-            self.async_write_ha_state()
-            return
-
-        # if it was FULLY closed (i.e. not opened nor partially) opened we assume transition to open
-        _LOGGER.info(f"{self.unique_id} action controller triggered without internal motion - deriving state")
-        await self._do_transition_state(DoorState.OPENED if self.is_closed else DoorState.CLOSED)
-        self.async_write_ha_state()
+        if self._engine.on_toggle(self._toggle_decoder(state.state, state.attributes)):
+            # finishes transition started by an external toggle press (see DoorEngine.on_toggle())
+            self.hass.async_create_task(self._commands.async_submit(DoorCommand.PULSE))
 
     @callback
-    async def on_transition_timer_finish(self, _now: datetime) -> None:
-        """Handles finishing of the state transition timer running for maximum amount of time expected for transition"""
-        _LOGGER.debug(f"{self.unique_id} hit transition timer")
-        self._transition_timer = None
-
-        if not self._garage_state.is_in_motion():
-            _LOGGER.error(f"Got a timer finish trigger when not in motion. "
-                          f"This is a bug in the {self.platform.platform_name} integration")
-            return
-
-        # The users can use one or two sensors for homing. If just one was installed (e.g. closed one) the other state
-        # will be derived from the time. While not perfect, this isn't an error condition. If we have a sensor for the
-        # state, and we hit the timer it means the door got stuck on the way.
-        if self._garage_state.target_state == DoorState.OPENED and self._sensor_opened is None:
-            # edge case: timer for opening ran out, we have no door-opened sensor, but we have door-closed sensor and
-            # the sensor is still indicating "door closed". This means the door never moved and it's still fully closed.
-            if self._sensor_closed is not None and self._sensor_closed:
-                self._garage_state.force_state(DoorState.CLOSED, error=True)
-                self._create_state_issue("closed_after_opening", severity=ir.IssueSeverity.ERROR)
-            else:
-                _LOGGER.debug(f"{self.unique_id} has no sensor for fully opened - completing on timer")
-                self._garage_state.complete_transition()
-
-            self.async_write_ha_state()
-            return
-
-        elif self._garage_state.target_state is DoorState.CLOSED and self._sensor_closed is None:
-            # edge case: timer for closing ran out, we have no door-closed sensor, but we have door-opened sensor and
-            # the sensor is still indicating "door opened". This means the door never moved and it's still fully opened.
-            if self._sensor_opened is not None and self._sensor_opened:
-                self._garage_state.force_state(DoorState.CLOSED, error=True)
-                self._create_state_issue("open_after_closing", severity=ir.IssueSeverity.ERROR)
-            else:
-                _LOGGER.debug(f"{self.unique_id} has no sensor for fully closed - completing on timer")
-                self._garage_state.complete_transition()
-
-            self.async_write_ha_state()
+    def on_power_state_change(self, state: State) -> None:
+        """Triggers when the motor power draw changes; not counted as an event, as it's reported many times a second"""
+        try:
+            value = float(state.state)
+        except ValueError:  # unavailable/unknown
             return
 
-        _LOGGER.warning(f"{self.unique_id} door took longer than expected to " 
-                        f"complete transition to {self._garage_state.target_state.name} or got stuck")
-        self._garage_state.abort_transition(True)
-        self.async_write_ha_state()
-
-    def read_opened_sensor(self, raw_value: str | None = None) -> None:
-        self._sensor_opened = self._do_read_binary_state(self._garage_state.controller.opened_sensor, raw_value,
-                                                         not self._garage_state.controller.on_open)
-
-    def read_closed_sensor(self, raw_value: str | None = None) -> None:
-        self._sensor_closed = self._do_read_binary_state(self._garage_state.controller.closed_sensor, raw_value,
-                                                         not self._garage_state.controller.on_close)
-
-    def _sync_state(self) -> None:
-        """Attempts to derive initial state of the door from sensors"""
-        if self._ensure_no_sensor_state_conflict():
+        reading = motor_reading(value, state.attributes.get(ATTR_UNIT_OF_MEASUREMENT),
+                                state.attributes.get(ATTR_DEVICE_CLASS))
+        if reading is None:
+            _LOGGER.debug("%s ignoring motor reading in unsupported unit \"%s\"", self.unique_id,
+                          state.attributes.get(ATTR_UNIT_OF_MEASUREMENT))
             return
+        self._engine.on_power(reading.level, reading.idle)
 
-        if self._sensor_opened:
-            self._garage_state.last_state = DoorState.OPENED
-            return
+    def _checkpoint_state_change(self, position: float) -> Callable[[State], None]:
+        """Builds a handler of a checkpoint sensor, reporting the door passing it when the sensor turns on"""
+        @callback
+        def _on_change(state: State) -> None:
+            if self._checkpoint_decoder(state.state, state.attributes):
+                self._garage_state.metrics.sensor_edge()
+                self._engine.on_checkpoint(position)
 
-        if self._sensor_closed:
-            self._garage_state.last_state = DoorState.CLOSED
-            return
+        return _on_change
 
-        # If none of the sensors are tripped we hope that at least one sensor is present. In such a condition we can
-        # wait the time normally needed to close or open the cover. We don't need a separate timer here, as we're
-        # observing sensors anyway. Until then, we should let the user know that the state of the door is unknown.
+    def _measured(self, handler: Callable[[State], None]) -> Callable[[State], None]:
+        """Wraps an event handler, so a state write the event results in is timed from its arrival (see DoorMetrics)"""
+        metrics = self._garage_state.metrics
 
-    def _ensure_no_sensor_state_conflict(self) -> bool:
-        """Ensures unrealistic sensor reading aren't present (i.e. door open and closed at the same time)"""
-        if self._sensor_opened and self._sensor_closed:
-            self._create_state_issue("open_and_closed", ir.IssueSeverity.CRITICAL)
-            return True
+        @callback
+        def _handle(state: State) -> None:
+            metrics.event_received()
+            try:
+                handler(state)
+            finally:
+                metrics.event_handled()
 
-        return False
+        return _handle
 
-    def _create_state_issue(self, state: str, severity: ir.IssueSeverity = ir.IssueSeverity.WARNING) -> None:
-        _LOGGER.error(f"{self.unique_id} door error \"{state}\"")
-        ir.async_create_issue(self.hass, DOMAIN, f"{self.unique_id}_{state}", is_fixable=True, severity=severity,
-                              translation_key=state)
+    @callback
+    def _on_engine_update(self) -> None:
+        self._garage_state.metrics.update_requested()
+        self._async_mark_dirty()
 
-    def _do_read_binary_state(self, sensor_id: str | None, known_value: str | None = None,
-                              invert: bool = False) -> bool:
-        """Read sensor or switch state and normalize it to a binary form"""
-        assert sensor_id is not None
+    def _on_closed_edge(self, value: bool) -> None:
+        """Debounced closed sensor reading"""
+        self._garage_state.metrics.sensor_edge()
+        self._engine.on_closed_sensor(value)
 
-        if known_value is None:
-            state = self.hass.states.get(sensor_id)
-            if state is None:
-                return False
-            known_value = state.state
+    def _on_opened_edge(self, value: bool) -> None:
+        """Debounced opened sensor reading"""
+        self._garage_state.metrics.sensor_edge()
+        self._engine.on_opened_sensor(value)
 
-        value = not self.value_to_bool(known_value) if invert else self.value_to_bool(known_value)
-        _LOGGER.debug(f"{self.unique_id} read {sensor_id} sensor raw={known_value} transform={value}")
+    @callback
+    def _on_transition(self, event: TransitionEvent) -> None:
+        self._cancel_progress()
+        if event.type is TransitionEventType.STARTED:
+            self._progress_timer = self._scheduler.call_later(PROGRESS_INTERVAL, self._on_progress)
+        if event.type is TransitionEventType.COMPLETED and not event.error:  # door is evidently working again
+            self._issues.resolve()
+
+    def _on_progress(self) -> None:
+        """Publishes the position of a moving door, which would otherwise only be updated when it stops"""
+        self._progress_timer = None
+        if self._garage_state.is_in_motion():
+            self._async_mark_dirty()
+            self._progress_timer = self._scheduler.call_later(PROGRESS_INTERVAL, self._on_progress)
+
+    def _cancel_progress(self) -> None:
+        if self._progress_timer is not None:
+            self._progress_timer()
+            self._progress_timer = None
+
+    def _create_state_issue(self, state: str, severity: str = ir.IssueSeverity.WARNING, occurrences: int = 1) -> None:
+        if occurrences == 1:
+            _LOGGER.error("%s door error \"%s\"", self.unique_id, state)
+        else:
+            _LOGGER.error("%s door error \"%s\" (occurred %d times)", self.unique_id, state, occurrences)
+        ir.async_create_issue(self.hass, DOMAIN, f"{self.unique_id}_{state}", is_fixable=True,
+                              severity=ir.IssueSeverity(severity), translation_key=state,
+                              data={"occurrences": occurrences})
+
+    def _delete_state_issue(self, state: str) -> None:
+        _LOGGER.info("%s door recovered from \"%s\"", self.unique_id, state)
+        ir.async_delete_issue(self.hass, DOMAIN, f"{self.unique_id}_{state}")
+
+    def _on_first_reading(self, sensor_id: str) -> None:
+        """Reconciles the restored state once every sensor unknown at startup reported a real reading"""
+        self._unknown_sensors.discard(sensor_id)
+        if not self._unknown_sensors:
+            _LOGGER.debug("%s all sensors reported - syncing", self.unique_id)
+            self._engine.sync()
+            self._async_mark_dirty()
+
+    def _do_read_binary_state(self, sensor_id: str, decoder: Decoder) -> bool | None:
+        """Read current sensor or switch state and normalize it to a binary form; None if it isn't known yet"""
+        state = self.hass.states.get(sensor_id)
+        value = self._decode(state, decoder)
+        _LOGGER.debug("%s read %s sensor raw=%s transform=%s", self.unique_id, sensor_id,
+                      None if state is None else state.state, value)
 
         return value
 
     @staticmethod
-    def value_to_bool(state: bool | str | int | float) -> bool:
-        if type(state) is bool:
-            return state
-
-        if isinstance(state, (int, float)):
-            return state > 0
-
-        try:
-            return float(state) > 0
-        except (ValueError, TypeError):
-            pass
+    def _decode(state: State | None, decoder: Decoder) -> bool | None:
+        # "off" is a real reading, while an unavailable sensor says nothing about the door
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return None
 
-        return len(state) > 0 and (state.lower() == 'on' or state[0].lower() == 't')
+        return decoder(state.state, state.attributes)
@@ -0,0 +1,83 @@
+"""Glitch filter collapsing chattering sensor readings (e.g. a bouncing reed contact) into single logical edges"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    from .engine import Scheduler
+    from .model import Clock
+
+
+class DebounceSettings(NamedTuple):
+    window: float = 0.0  # after an edge is accepted, the next one is held back until this many seconds pass
+    min_stable: float = 0.0  # a new value must persist for this many seconds before it is accepted
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 or self.min_stable > 0
+
+
+class SensorFilter:
+    """
+    Passes a binary signal through, accepting an edge only once the value was stable for min_stable seconds and at
+    least window seconds passed since the previous edge. Every raw change that never became an edge is counted as
+    suppressed. With both rules disabled values are passed through right away.
+    """
+    __slots__ = ("value", "suppressed", "_output", "_scheduler", "_clock", "_settings", "_last_edge", "_pending",
+                 "_pending_value")
+
+    def __init__(self, output: Callable[[bool], None], scheduler: Scheduler, clock: Clock,
+                 settings: DebounceSettings = DebounceSettings()):
+        self.value: bool | None = None  # last accepted value
+        self.suppressed = 0
+        self._output = output
+        self._scheduler = scheduler
+        self._clock = clock
+        self._settings = settings
+        self._last_edge: float | None = None
+        self._pending: Callable[[], None] | None = None
+        self._pending_value: bool | None = None  # value waiting to be accepted by _pending
+
+    def reset(self, value: bool) -> None:
+        """Sets the current value without producing an edge, e.g. when reading the initial state"""
+        self.cancel()
+        self.value = value
+
+    def push(self, value: bool) -> None:
+        if not self._settings.enabled:
+            self.value = value
+            self._output(value)
+            return
+
+        if self._pending is not None:
+            if value == self._pending_value:  # same reading again (e.g. only attributes changed) - keep waiting
+                return
+            self._pending()  # the previous change didn't last long enough
+            self._pending = None
+            self.suppressed += 1
+
+        if value == self.value:  # ...and it bounced back
+            self.suppressed += 1
+            return
+
+        now = self._clock.monotonic()
+        delay = self._settings.min_stable
+        if self._last_edge is not None:
+            delay = max(delay, self._last_edge + self._settings.window - now)
+        if delay <= 0:
+            self._accept(value)
+            return
+
+        self._pending = self._scheduler.call_later(delay, lambda: self._accept(value))
+        self._pending_value = value
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._pending()
+            self._pending = None
+
+    def _accept(self, value: bool) -> None:
+        self._pending = None
+        self._last_edge = self._clock.monotonic()
+        self.value = value
+        self._output(value)
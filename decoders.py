@@ -0,0 +1,92 @@
+"""Sensor value decoders, compiled once per sensor, turning raw HA states into binary readings"""
+from __future__ import annotations
+
+from typing import Any, Callable, Final, Mapping, NamedTuple
+
+# Raw state value + state attributes => whether the sensor is tripped
+Decoder = Callable[[str, Mapping[str, Any]], bool]
+
+_MAX_MEMOIZED: Final[int] = 256  # numeric sensors can produce unlimited distinct values - don't let the cache grow
+
+
+class DecoderSettings(NamedTuple):
+    on_values: tuple[str, ...] = ()  # custom vocabulary of tripped states (e.g. "open", "detected"); case-insensitive
+    threshold: float | None = None  # numeric readings are tripped above this value
+    attribute: str | None = None  # read this state attribute instead of the state itself
+
+
+def legacy_value_to_bool(state: bool | str | int | float) -> bool:
+    """Default interpretation: positive numbers, "on" and anything starting with "t" (e.g. "true") are truthy"""
+    if type(state) is bool:
+        return state
+
+    if isinstance(state, (int, float)):
+        return state > 0
+
+    try:
+        return float(state) > 0
+    except (ValueError, TypeError):
+        pass
+
+    return len(state) > 0 and (state.lower() == 'on' or state[0].lower() == 't')
+
+
+def build_decoder(settings: DecoderSettings = DecoderSettings(), invert: bool = False) -> Decoder:
+    """Compiles settings into a single callable, with inversion folded into lookup tables where possible"""
+    if settings.threshold is not None:
+        decode_value = _threshold_decoder(settings.threshold, invert)
+    elif settings.on_values:
+        decode_value = _vocabulary_decoder(settings.on_values, invert)
+    else:
+        decode_value = _memoized_decoder(legacy_value_to_bool, invert)
+
+    if settings.attribute is None:
+        return lambda state, _attributes: decode_value(state)
+
+    attribute = settings.attribute
+    missing = invert  # a missing attribute means "not tripped", i.e. False before inversion
+
+    def _decode_attribute(_state: str, attributes: Mapping[str, Any]) -> bool:
+        value = attributes.get(attribute)
+        return missing if value is None else decode_value(value)
+
+    return _decode_attribute
+
+
+def _threshold_decoder(threshold: float, invert: bool) -> Callable[[Any], bool]:
+    def _decode(value: Any) -> bool:
+        try:
+            return (float(value) > threshold) is not invert
+        except (ValueError, TypeError):  # e.g. "unavailable"
+            return invert
+
+    return _decode
+
+
+def _vocabulary_decoder(on_values: tuple[str, ...], invert: bool) -> Callable[[Any], bool]:
+    on = frozenset(value.lower() for value in on_values)
+
+    def _decode(value: Any) -> bool:
+        if type(value) is bool:
+            return value is not invert
+        return (str(value).lower() in on) is not invert
+
+    return _decode
+
+
+def _memoized_decoder(decode: Callable[[Any], bool], invert: bool) -> Callable[[Any], bool]:
+    """Sensors report a handful of distinct states, so after the first occurrence every one is a single dict lookup"""
+    table: dict[Any, bool] = {}
+
+    def _decode(value: Any) -> bool:
+        try:
+            return table[value]
+        except KeyError:
+            result = decode(value) is not invert
+            if len(table) < _MAX_MEMOIZED:
+                table[value] = result
+            return result
+        except TypeError:  # unhashable attribute value
+            return decode(value) is not invert
+
+    return _decode
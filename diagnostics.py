@@ -0,0 +1,57 @@
+"""Diagnostics download of a door: its state, learned data, hot-path latencies and counters"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_COMMANDS, DATA_TIMERS, DATA_WRITER, DOMAIN
+
+if TYPE_CHECKING:
+    from .commands import CommandQueue
+    from .cover import HassScheduler
+    from .model import GarageDoorState
+    from .writes import StateWriteCoalescer
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    state: GarageDoorState = hass.data[DOMAIN][entry.entry_id]
+    queue: CommandQueue | None = hass.data.get(DATA_COMMANDS, {}).get(entry.entry_id)
+    writer: StateWriteCoalescer | None = hass.data.get(DATA_WRITER)
+    scheduler: HassScheduler | None = hass.data.get(DATA_TIMERS)
+
+    return {
+        "entry": dict(entry.data),  # only entity ids and timings - nothing to redact
+        "state": {
+            "last_state": None if state.last_state is None else state.last_state.name,
+            "target_state": None if state.target_state is None else state.target_state.name,
+            "error": state.error,
+            "in_motion_for": None if state.transition_triggered is None
+            else state.clock.monotonic() - state.transition_triggered,
+        },
+        "metrics": state.metrics.as_dict(),
+        "commands": None if queue is None else {
+            "depth": queue.depth,
+            "executed": queue.executed,
+            "coalesced": queue.coalesced,
+            "last_latency": queue.last_latency,
+            "max_latency": queue.max_latency,
+        },
+        "writes": None if writer is None else {  # shared by all doors
+            "requested": writer.requested,
+            "written": writer.written,
+            "saved": writer.saved,
+        },
+        "timers": None if scheduler is None else {  # shared by all doors
+            "pending": scheduler.wheel.pending,
+            "fired": scheduler.wheel.fired,
+        },
+        "learned": {target.name: {
+            "durations": {"count": state.durations[target].count, "p50": state.durations[target].quantile(0.5),
+                          "p99": state.durations[target].quantile(0.99)},
+            "profile_cycles": state.profiles[target].cycles,
+            "drift": state.drift[target].as_dict(),
+        } for target in state.durations},
+        "trace": state.trace.dump(),
+    }
@@ -0,0 +1,81 @@
+"""Incremental detection of transition times creeping up, e.g. as the motor or springs wear out"""
+from __future__ import annotations
+
+import math
+from typing import Any, Final
+
+DEFAULT_ALPHA: Final[float] = 0.02  # weight of a new measurement in the baseline; the baseline lags well behind wear
+DEFAULT_SLACK: Final[float] = 0.5  # deviations (in standard deviations) within this are considered noise
+DEFAULT_THRESHOLD: Final[float] = 5.0  # accumulated deviations (in standard deviations) considered a drift
+DEFAULT_WARMUP: Final[int] = 10  # measurements collected before the baseline is trusted
+MIN_RELATIVE_DEVIATION: Final[float] = 0.02  # keeps a very consistent door from alarming on a fraction of a second
+
+
+class DriftDetector:
+    """
+    One-sided CUSUM over deviations from an exponentially weighted baseline. Each measurement costs O(1) and only a
+    handful of numbers are kept, regardless of how long the door is in service.
+
+    Deviations above the baseline accumulate, so a slow but steady slowdown is detected long before any single
+    transition looks suspicious. The baseline slowly follows the measurements, so once the door settles on a new
+    normal (e.g. after a repair) the detector recovers by itself.
+    """
+    __slots__ = ("mean", "variance", "cusum", "count", "drifting", "_alpha", "_slack", "_threshold", "_warmup")
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, slack: float = DEFAULT_SLACK, threshold: float = DEFAULT_THRESHOLD,
+                 warmup: int = DEFAULT_WARMUP):
+        if not 0 < alpha < 1:
+            raise ValueError(f"Alpha must be between 0 and 1 (got \"{alpha}\")")
+        if threshold <= 0:
+            raise ValueError(f"Threshold must be a positive number (got \"{threshold}\")")
+
+        self.mean = 0.0
+        self.variance = 0.0
+        self.cusum = 0.0
+        self.count = 0
+        self.drifting = False
+        self._alpha = alpha
+        self._slack = slack
+        self._threshold = threshold
+        self._warmup = warmup
+
+    @property
+    def health(self) -> float:
+        """1 when in line with the baseline, falling to 0 as the accumulated deviation reaches the threshold"""
+        return max(0.0, 1 - self.cusum / self._threshold)
+
+    def add(self, value: float) -> bool:
+        """Feeds a measurement; returns True when it started a drift (i.e. once per drift)"""
+        self.count += 1
+        if self.count <= self._warmup:  # plain running mean & variance until there's enough data
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.variance += (delta * (value - self.mean) - self.variance) / self.count
+            return False
+
+        deviation = max(math.sqrt(self.variance), self.mean * MIN_RELATIVE_DEVIATION)
+        # capped, so after a drift the detector recovers in reasonable time once the baseline catches up
+        self.cusum = min(max(0.0, self.cusum + (value - self.mean) / deviation - self._slack), 2 * self._threshold)
+
+        delta = value - self.mean
+        self.mean += self._alpha * delta
+        self.variance = (1 - self._alpha) * (self.variance + self._alpha * delta * delta)
+
+        started = not self.drifting and self.cusum > self._threshold
+        if started:
+            self.drifting = True
+        elif self.cusum == 0:
+            self.drifting = False
+
+        return started
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"mean": self.mean, "variance": self.variance, "cusum": self.cusum, "count": self.count,
+                "drifting": self.drifting}
+
+    def load(self, data: dict[str, Any]) -> None:
+        self.mean = float(data.get("mean", 0.0))
+        self.variance = float(data.get("variance", 0.0))
+        self.cusum = float(data.get("cusum", 0.0))
+        self.count = int(data.get("count", 0))
+        self.drifting = bool(data.get("drifting", False))
@@ -0,0 +1,397 @@
+"""HomeAssistant-independent door state machine, driven by sensor readings, toggle presses and timers"""
+from __future__ import annotations
+
+from typing import Callable, Final, Protocol
+import logging
+
+from .checkpoints import CheckpointFusion
+from .model import DoorState, GarageDoorState, TransitionEvent
+from .power import IDLE_POWER, PowerAnalyzer, PowerSignal
+from .travel_profile import Sample
+from .transitions import ISSUE_CRITICAL, ISSUE_WARNING, TRANSITIONS, Action, Effect, EngineEvent
+
+_LOGGER = logging.getLogger(__package__)
+
+# Transition deadline is learned from the durations histogram once enough transitions have been observed, but never
+# drops below the configured time (with its grace)
+DEADLINE_QUANTILE: Final[float] = 0.99
+DEADLINE_MARGIN: Final[float] = 1.05
+DEADLINE_MIN_SAMPLES: Final[int] = 5
+
+
+class Scheduler(Protocol):
+    def call_later(self, delay: float, action: Callable[[], None]) -> Callable[[], None]:
+        """Runs action after delay seconds; returns a callable cancelling it"""
+
+
+class DoorEngine:
+    """
+    Keeps the virtual door state in sync with the physical world.
+
+    Event handlers (on_*) notify about state changes via on_update. Commands (begin_transition/stop) don't, as the
+    caller is expected to physically pulse the toggle first and only then publish the new state.
+    """
+    __slots__ = ("state", "sensor_closed", "sensor_opened", "toggle_state", "_scheduler", "_on_update", "_on_issue",
+                 "_on_resolve", "_transition_timer", "_checkpoints", "_checkpoint_timer",
+                 "_crossings", "_power")
+    transition_grace_multiplier: Final[float] = 1.1
+
+    sensor_closed: bool | None  # if we have sensor for fully closed it will signify its state
+    sensor_opened: bool | None  # if we have sensor for fully open it will signify its state
+    toggle_state: bool | None  # toggle button state used to control the open/close/stop action of the door
+
+    def __init__(self, state: GarageDoorState, scheduler: Scheduler,
+                 on_update: Callable[[], None] | None = None,
+                 on_issue: Callable[[str, str], None] | None = None,
+                 on_resolve: Callable[[str], None] | None = None):
+        self.state = state
+        self.sensor_closed = None
+        self.sensor_opened = None
+        self.toggle_state = None
+        self._scheduler = scheduler
+        self._on_update = on_update
+        self._on_issue = on_issue
+        self._on_resolve = on_resolve
+        # in transition; watching for the typical delta+10% (i.e. failsafe)
+        self._transition_timer: Callable[[], None] | None = None
+        # with checkpoint sensors a jam is detected as soon as the next checkpoint is overdue
+        self._checkpoints = CheckpointFusion(checkpoint.position for checkpoint in state.controller.checkpoints) \
+            if state.controller.checkpoints else None
+        self._checkpoint_timer: Callable[[], None] | None = None
+        self._crossings: list[Sample] = []  # checkpoints passed in the current transition, for learning its profile
+        # with a power sensor an obstruction or the motor cut-off is seen from the power draw
+        self._power = PowerAnalyzer() if state.controller.power_sensor is not None else None
+        state.subscribe(self._learn_from_transition)
+
+    def position(self) -> int | None:
+        """Attempts to derive door position (0 = fully closed, 100 = fully opened) based on learned travel profiles"""
+        state = self.state
+        if state.target_state is None:
+            match state.last_state:
+                case DoorState.OPENED:
+                    return 100
+                case DoorState.PARTIALLY_OPEN:
+                    return 50
+                case DoorState.CLOSED:
+                    return 0
+                case None:
+                    return None
+
+        if state.last_state is None:
+            _LOGGER.debug("%s guessed current position as 50%% as last state is unknown", state.internal_id)
+            return 50
+
+        if self._checkpoints is not None and self._checkpoints.is_tracking:
+            return int(round(self._checkpoints.position(state.clock.monotonic())))
+
+        elapsed = state.clock.monotonic() - state.transition_triggered
+        if elapsed > self.transition_deadline():  # most likely stuck somewhere
+            _LOGGER.debug("%s current position unknown - moving for %ss, longer than expected", state.internal_id,
+                          elapsed)
+            return None
+
+        travel = int(round(state.profiles[state.target_state].position(elapsed)))
+        return travel if state.target_state == DoorState.OPENED else 100 - travel
+
+    def begin_transition(self, target: DoorState, source: str = "command") -> float:
+        """Starts open-to-close / close-to-open transition and returns the maximum time it is expected to take"""
+        # Attempt transition first, to make sure the intended action conforms to the state machine
+        try:
+            self.state.transition(target, source)
+        except ValueError as e:
+            _LOGGER.error(e)
+
+        # Realistically, we hope that open/close sensor will trip before this timer. However, this lets us determine if
+        # the door maybe stopped in the middle before reaching the sensor. In addition, this timer is required to
+        # emulate door hitting the position where there may not be a sensor (e.g. user only has close but not open
+        # sensor)
+        max_expected_time = self.transition_deadline()
+        self._transition_timer = self._scheduler.call_later(max_expected_time, self.on_timer)
+        if self._checkpoints is not None:
+            start = {DoorState.CLOSED: 0.0, DoorState.OPENED: 100.0}.get(self.state.last_state)
+            self._checkpoints.start(target == DoorState.OPENED, start, self.state.clock.monotonic(),
+                                    self.expected_duration())
+            self._arm_checkpoint_timer()
+        if self._power is not None:
+            self._power.start(self.state.clock.monotonic())
+        _LOGGER.debug("%s will be transitioning %s => %s in max %ss", self.state.internal_id, self.state.last_state,
+                      target.name, max_expected_time)
+
+        return max_expected_time
+
+    def expected_duration(self) -> float:
+        """Typical time the current transition takes"""
+        durations = self.state.durations.get(self.state.target_state)
+        if durations is None or durations.count < DEADLINE_MIN_SAMPLES:
+            return self.state.delta_for_current_state
+
+        return durations.quantile(0.5)
+
+    def transition_deadline(self) -> float:
+        """Maximum time the current transition is expected to take, before the door is considered stuck"""
+        configured = self.state.delta_for_current_state * self.transition_grace_multiplier
+        durations = self.state.durations.get(self.state.target_state)
+        # Durations are learned only from sensor-confirmed transitions. Without a sensor the timer itself completes the
+        # transition, so the configured time must be used.
+        if durations is None or durations.count < DEADLINE_MIN_SAMPLES:
+            return configured
+
+        # Never below the configured grace: a door slowing down past the learned deadline would be aborted every time,
+        # and as aborted transitions aren't learned from, the deadline would never catch up.
+        return max(durations.quantile(DEADLINE_QUANTILE) * DEADLINE_MARGIN, configured)
+
+    def stop(self, source: str = "command") -> bool:
+        """Marks the door as stopped mid-way; returns False if it wasn't moving"""
+        if not self.state.is_in_motion():
+            _LOGGER.warning("%s not in motion - not stopping", self.state.internal_id)
+            return False
+
+        # Attempt transition first, to make sure the intended action conforms to the state machine
+        _LOGGER.debug("%s stopping on request", self.state.internal_id)
+        try:
+            self.state.abort_transition(source=source)
+        except ValueError as e:
+            _LOGGER.error(e)
+
+        # take care of the timer as manually stopping the cover is physically equivalent of it getting stuck but on
+        # purpose. However, it is not an error condition per-se.
+        self._cancel_timer()
+        return True
+
+    def sync(self) -> None:
+        """
+        Derives initial state of the door from sensors, reconciling it with the state restored from before a restart
+        (if any). Sensors always win, as the door could've been operated while HA was down.
+        """
+        if self.has_sensor_conflict():
+            return
+
+        state = self.state
+        if state.is_in_motion():  # restored mid-transition
+            reached = self.sensor_opened if state.target_state == DoorState.OPENED else self.sensor_closed
+            if reached:
+                state.complete_transition(source="startup")
+                return
+
+            # door was stopped and sent back while HA was down - it's where the sensor says, not stuck on the way
+            opposite = DoorState.CLOSED if state.target_state == DoorState.OPENED else DoorState.OPENED
+            if self.sensor_closed if opposite == DoorState.CLOSED else self.sensor_opened:
+                state.force_state(opposite, source="startup")
+                return
+
+            # the timer didn't survive the restart - give the door whatever time is left
+            remaining = self.transition_deadline() - (state.clock.monotonic() - state.transition_triggered)
+            _LOGGER.debug("%s restored in transition to %s with %ss left", state.internal_id, state.target_state.name,
+                          remaining)
+            if remaining <= 0:
+                self.on_timer()
+            else:
+                self._transition_timer = self._scheduler.call_later(remaining, self.on_timer)
+            return
+
+        if self.sensor_opened:
+            state.force_state(DoorState.OPENED, source="startup")
+            return
+
+        if self.sensor_closed:
+            state.force_state(DoorState.CLOSED, source="startup")
+            return
+
+        # None of the sensors is tripped. Restored state is good as long as the sensors don't contradict it, i.e. the
+        # door isn't restored fully opened/closed when a sensor for that position is present.
+        contradicted = (state.last_state == DoorState.CLOSED and self.sensor_closed is not None) or \
+                       (state.last_state == DoorState.OPENED and self.sensor_opened is not None)
+        if contradicted:
+            if self.sensor_closed is not None and self.sensor_opened is not None:
+                state.force_state(DoorState.PARTIALLY_OPEN, source="startup")
+            else:  # with one sensor, being away from its position means being in the other one
+                state.force_state(DoorState.OPENED if self.sensor_closed is not None else DoorState.CLOSED,
+                                  source="startup")
+            return
+
+        # If the state is still unknown, we hope that at least one sensor is present. In such a condition we can wait
+        # the time normally needed to close or open the cover. We don't need a separate timer here, as we're observing
+        # sensors anyway. Until then, we should let the user know that the state of the door is unknown.
+
+    def has_sensor_conflict(self) -> bool:
+        """Ensures unrealistic sensor reading aren't present (i.e. door open and closed at the same time)"""
+        if self.sensor_opened and self.sensor_closed:
+            self._issue("open_and_closed", ISSUE_CRITICAL)
+            return True
+
+        return False
+
+    def on_closed_sensor(self, value: bool) -> None:
+        """Handles door-fully-closed sensor changing its state"""
+        self.sensor_closed = value
+        self.has_sensor_conflict()
+        self._dispatch(EngineEvent.CLOSED_SENSOR_ON if value else EngineEvent.CLOSED_SENSOR_OFF, "closed_sensor")
+
+    def on_opened_sensor(self, value: bool) -> None:
+        """Handles door-fully-open sensor changing its state"""
+        self.sensor_opened = value
+        self.has_sensor_conflict()
+        self._dispatch(EngineEvent.OPENED_SENSOR_ON if value else EngineEvent.OPENED_SENSOR_OFF, "opened_sensor")
+
+    def on_toggle(self, value: bool) -> bool:
+        """
+        Handles garage toggle button controller changing its state.
+
+        Returns True when a press from outside the integration started a new transition. The caller should then pulse
+        the toggle itself, to make sure the relay isn't held for too long.
+        """
+        _LOGGER.debug("%s detected action controller state transition to %s", self.state.internal_id, value)
+        if self.toggle_state == value:  # ignore - we triggered it via a pulse
+            _LOGGER.debug("%s transition state is the same as toggle_state - ignoring", self.state.internal_id)
+            return False
+
+        # we're DELIBERATELY ignoring transition to "off" state. This can be either the external relay automatically
+        # turning off without HA prompting it to do so (safety feature)
+        if not value:
+            _LOGGER.debug("%s transition to off - ignoring", self.state.internal_id)
+            return False
+
+        # since the toggle turned on outside our integration (either from another HA automation or e.g. via native
+        # app for a relay or similar) we have no choice other than derive the state
+        return self._dispatch(EngineEvent.TOGGLE, "toggle").effect is Effect.BEGIN
+
+    def on_timer(self) -> None:
+        """Handles finishing of the state transition timer running for maximum amount of time expected for transition"""
+        _LOGGER.debug("%s hit transition timer", self.state.internal_id)
+        self._transition_timer = None
+
+        if not self.state.is_in_motion():
+            _LOGGER.error("%s got a timer finish trigger when not in motion. This is a bug in the integration",
+                          self.state.internal_id)
+            return
+
+        # The users can use one or two sensors for homing. If just one was installed (e.g. closed one) the other state
+        # will be derived from the time. While not perfect, this isn't an error condition. If we have a sensor for the
+        # state, and we hit the timer it means the door got stuck on the way.
+        self._dispatch(EngineEvent.TIMER, "timer")
+
+    def _dispatch(self, event: EngineEvent, source: str) -> Action:
+        """Applies the action the transition table prescribes for the event in the current state"""
+        state = self.state
+        action = TRANSITIONS[(state.last_state, state.target_state, self.sensor_closed, self.sensor_opened, event)]
+        _LOGGER.debug("%s %s in %s => %s: %s %s", state.internal_id, event.value, state.last_state,
+                      state.target_state, action.effect.value, action.state)
+
+        match action.effect:
+            case Effect.NONE:
+                return action
+            case Effect.BEGIN:  # not published yet - the caller is expected to pulse the toggle first
+                self.begin_transition(action.state, source)
+                return action
+            case Effect.COMPLETE:
+                state.complete_transition(source=source)
+            case Effect.ABORT:
+                state.abort_transition(action.error, source=source)
+            case Effect.FORCE:
+                state.force_state(action.state, action.error, source=source)
+
+        self._cancel_timer()  # the door isn't in motion anymore
+        if action.issue is not None:
+            self._issue(action.issue, action.severity)
+        elif action.error:
+            _LOGGER.warning("%s door took longer than expected to complete transition or got stuck",
+                            state.internal_id)
+        self._update()
+        return action
+
+    def on_checkpoint(self, position: float) -> None:
+        """Handles the door passing an intermediate checkpoint sensor at the given position"""
+        if self._checkpoints is None or not self.state.is_in_motion():  # moved externally; end sensors will tell
+            return
+
+        now = self.state.clock.monotonic()
+        self._checkpoints.cross(position, now)
+        self._crossings.append((now - self.state.transition_triggered,
+                                position if self.state.target_state == DoorState.OPENED else 100 - position))
+        _LOGGER.debug("%s passed checkpoint at %s moving at %.1f%%/s", self.state.internal_id, position,
+                      self._checkpoints.velocity)
+        self._arm_checkpoint_timer()
+        self._update()
+
+    def on_power(self, level: float, idle: float = IDLE_POWER) -> None:
+        """Handles a new motor power (or current) reading; idle is the level the motor is surely off under"""
+        if self._power is None or not self.state.is_in_motion():
+            return
+
+        signal = self._power.add(self.state.clock.monotonic(), level, idle)
+        if signal is None:
+            return
+
+        _LOGGER.debug("%s motor %s at %s (inrush %s, steady %s)", self.state.internal_id, signal.value, level,
+                      self._power.inrush, self._power.steady)
+        self._dispatch(EngineEvent.MOTOR_STALLED if signal is PowerSignal.STALLED else EngineEvent.MOTOR_STOPPED,
+                       "power")
+
+    def on_checkpoint_overdue(self) -> None:
+        _LOGGER.debug("%s didn't reach checkpoint %s in time", self.state.internal_id,
+                      None if self._checkpoints is None else self._checkpoints.next_checkpoint())
+        self._checkpoint_timer = None
+        self._dispatch(EngineEvent.CHECKPOINT_OVERDUE, "checkpoint")
+
+    def _arm_checkpoint_timer(self) -> None:
+        if self._checkpoint_timer is not None:
+            self._checkpoint_timer()
+            self._checkpoint_timer = None
+
+        deadline = self._checkpoints.deadline()
+        if deadline is not None:
+            self._checkpoint_timer = self._scheduler.call_later(deadline - self.state.clock.monotonic(),
+                                                                self.on_checkpoint_overdue)
+
+    def _cancel_timer(self) -> None:
+        if self._transition_timer is not None:
+            self._transition_timer()
+            self._transition_timer = None
+        if self._checkpoint_timer is not None:
+            self._checkpoint_timer()
+            self._checkpoint_timer = None
+        if self._checkpoints is not None:
+            self._checkpoints.stop()
+        self._crossings.clear()
+        if self._power is not None:
+            self._power.stop()
+
+    def _update(self) -> None:
+        if self._on_update is not None:
+            self._on_update()
+
+    def _issue(self, key: str, severity: str = ISSUE_WARNING) -> None:
+        if self._on_issue is not None:
+            self._on_issue(key, severity)
+
+    def _resolve(self, key: str) -> None:
+        if self._on_resolve is not None:
+            self._on_resolve(key)
+
+    def _learn_from_transition(self, event: TransitionEvent) -> None:
+        if not event.is_full_cycle:
+            return
+
+        self.state.durations[event.target].add(event.duration)
+        drift = self.state.drift[event.target]
+        was_drifting = drift.drifting
+        issue = "slower_opening" if event.target == DoorState.OPENED else "slower_closing"
+        if drift.add(event.duration):
+            _LOGGER.warning("%s door got slower while %s, it may need maintenance", self.state.internal_id,
+                            "opening" if event.target == DoorState.OPENED else "closing")
+            self._issue(issue)
+        elif was_drifting and not drift.drifting:  # settled on a new normal, e.g. after a repair
+            _LOGGER.info("%s door transition times are steady again", self.state.internal_id)
+            self._resolve(issue)
+        profile = self.state.profiles[event.target]
+        profile.add_cycle(((0.0, 0.0), *self._profile_samples(event.duration), (event.duration, 100.0)))
+        profile.fit()
+
+    def _profile_samples(self, duration: float) -> list[Sample]:
+        """Checkpoint crossings of the transition just completed, if they make a consistent profile"""
+        samples = sorted(self._crossings, key=lambda sample: sample[1])
+        times = [0.0, *(elapsed for elapsed, _position in samples), duration]
+        if any(t1 <= t0 for t0, t1 in zip(times, times[1:])):  # e.g. crossed back and forth; not a single pass
+            return []
+
+        return samples
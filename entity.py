@@ -4,17 +4,15 @@ from __future__ import annotations
 from abc import abstractmethod
 
 from .const import DOMAIN
+from .writes import async_get_writer
 from typing import TYPE_CHECKING
 import logging
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.const import Platform
-from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo, Entity
-from homeassistant.helpers.event import async_track_state_change
 
 if TYPE_CHECKING:
-    from .model import GarageDoorState
+    from .model import GarageDoorState, TransitionEvent
 
 _LOGGER = logging.getLogger(__package__)
 
@@ -29,7 +27,7 @@ class UpSmartGarageEntity(Entity):
         self._attr_translation_key = role
 
         self._attr_unique_id = f"{self._garage_state.internal_id}_{role}"
-        _LOGGER.debug(f"Registering entity {self._attr_unique_id}")
+        _LOGGER.debug("Registering entity %s", self._attr_unique_id)
         self._subscribe_state_changes()
 
     @property
@@ -37,6 +35,15 @@ class UpSmartGarageEntity(Entity):
         # This component uses explicit device registration over via-entity autoregistration - see __init__.py
         return DeviceInfo(identifiers={(DOMAIN, self._garage_state.internal_id)})
 
+    async def async_will_remove_from_hass(self) -> None:
+        async_get_writer(self.hass).async_discard(self)
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _async_mark_dirty(self) -> None:
+        """Schedules a state write; unlike async_write_ha_state(), many calls within a loop iteration write once"""
+        async_get_writer(self.hass).async_mark_dirty(self)
+
     @callback
     @abstractmethod
     def _subscribe_state_changes(self) -> None:
@@ -46,26 +53,21 @@ class UpSmartGarageEntity(Entity):
 class UpSmartCoverDerivedEntity(UpSmartGarageEntity):
     @property
     def should_poll(self) -> bool:
-        """State is updated to HA when cover triggers callback via _on_cover_state_change()"""
+        """State is updated to HA when GarageDoorState publishes a transition via _on_transition()"""
         return False
 
     def _subscribe_state_changes(self) -> None:
-        door_uid = f"{self._garage_state.internal_id}_door"
-        door_eid = er.async_get(self.hass).async_get_entity_id(Platform.COVER, DOMAIN, door_uid)
-
-        # todo fix me:
-        #  This also has some weird race condition when the device is first added to HASS. When cover is registered it
-        #  isn't available right away in the entity registry. Once HASS is reloaded it is there... probably some state
-        #  update call is missing when cover is registered, but I cannot locate it.
-        if door_eid is None:  # this can happen when user disables door entity... which is nonsensical but possible
-            _LOGGER.warning(f"{self.unique_id} will not be functional - no cover registered (expected {door_uid})")
-            return
+        # Transitions are pushed by the GarageDoorState directly, without a round-trip through the cover entity state.
+        # The subscription is deferred until the entity is added, as it cannot write its state before that.
+        pass
 
-        _LOGGER.debug(f"{self.unique_id} is watching {door_uid} (entity_id={door_eid})")
-        async_track_state_change(self.hass, door_eid, self._on_cover_state_change)
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        _LOGGER.debug("%s is watching transitions of %s", self.unique_id, self._garage_state.internal_id)
+        self.async_on_remove(self._garage_state.subscribe(self._on_transition))
 
     @callback
     @abstractmethod
-    async def _on_cover_state_change(self, entity_id, old_state, new_state) -> None:
-        """Called any time the main cover entity state changes"""
+    def _on_transition(self, event: TransitionEvent) -> None:
+        """Called any time the door state changes"""
         pass
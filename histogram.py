@@ -0,0 +1,73 @@
+"""Streaming duration histogram with bounded relative error, used for learning typical transition times"""
+from __future__ import annotations
+
+import math
+from typing import Any, Final
+
+DEFAULT_RELATIVE_ACCURACY: Final[float] = 0.02
+DEFAULT_MAX_COUNT: Final[int] = 500
+
+
+class DurationHistogram:
+    """
+    Sparse log-bucketed histogram (a.k.a. DDSketch): every value is kept with at most relative_accuracy error, and the
+    number of buckets only depends on the spread of values, not the number of them.
+
+    Once more than max_count values are collected all buckets are halved, so older measurements slowly fade away and
+    the histogram follows a door that changes its characteristics over time (e.g. wearing out).
+    """
+    __slots__ = ("_bins", "_count", "_gamma", "_log_gamma", "_max_count")
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_count: int = DEFAULT_MAX_COUNT):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy must be between 0 and 1 (got \"{relative_accuracy}\")")
+
+        self._bins: dict[int, int] = {}
+        self._count = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_count = max_count
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def add(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError(f"Duration must be a positive number (got \"{value}\")")
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._bins[index] = self._bins.get(index, 0) + 1
+        self._count += 1
+        if self._count > self._max_count:
+            self._decay()
+
+    def quantile(self, q: float) -> float | None:
+        """Returns an estimated q-th quantile (0..1) or None if nothing was recorded yet"""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1 (got \"{q}\")")
+        if self._count == 0:
+            return None
+
+        rank = q * (self._count - 1)
+        seen = 0
+        for index in sorted(self._bins):
+            seen += self._bins[index]
+            if seen > rank:
+                return self._value_of(index)
+
+        return self._value_of(max(self._bins))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"bins": {str(index): count for index, count in self._bins.items()}}
+
+    def load(self, data: dict[str, Any]) -> None:
+        self._bins = {int(index): int(count) for index, count in data.get("bins", {}).items() if int(count) > 0}
+        self._count = sum(self._bins.values())
+
+    def _value_of(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def _decay(self) -> None:
+        self._bins = {index: count // 2 for index, count in self._bins.items() if count > 1}
+        self._count = sum(self._bins.values())
@@ -0,0 +1,73 @@
+"""Hourly aggregates of finished transitions, compact enough to be kept as long-term statistics for years"""
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Final
+
+from .model import DoorState, TransitionEventType
+
+if TYPE_CHECKING:
+    from .transition_log import LogRecord
+
+HOUR: Final[int] = 3600
+
+
+def hour_start(timestamp: float) -> float:
+    return timestamp - timestamp % HOUR
+
+
+class DurationAggregate:
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.minimum = min(self.minimum, duration)
+        self.maximum = max(self.maximum, duration)
+
+
+class HourlyAggregate:
+    __slots__ = ("start", "cycles", "jams", "opening", "closing")
+
+    def __init__(self, start: float):
+        self.start = start  # UNIX timestamp of the beginning of the hour
+        self.cycles = 0  # completed transitions, measured or not
+        self.jams = 0  # transitions ended with an error
+        self.opening = DurationAggregate()
+        self.closing = DurationAggregate()
+
+
+class HourlyAggregator:
+    """Folds finished transitions into per-hour buckets; only the hours still in progress are kept in memory"""
+    __slots__ = ("_hours",)
+
+    def __init__(self):
+        self._hours: dict[float, HourlyAggregate] = {}
+
+    def add(self, record: LogRecord) -> None:
+        start = hour_start(record.timestamp)
+        hour = self._hours.get(start)
+        if hour is None:
+            hour = self._hours[start] = HourlyAggregate(start)
+
+        if record.outcome is TransitionEventType.COMPLETED:
+            hour.cycles += 1
+        elif record.outcome is TransitionEventType.ERROR:
+            hour.jams += 1
+        if record.duration is not None:
+            (hour.opening if record.direction is DoorState.OPENED else hour.closing).add(record.duration)
+
+    def pop_finished(self, now: float) -> list[HourlyAggregate]:
+        """Removes and returns hours which ended before now, oldest first"""
+        finished = sorted(start for start in self._hours if start + HOUR <= now)
+        return [self._hours.pop(start) for start in finished]
@@ -0,0 +1,90 @@
+"""Per-door cache of active issues, keeping a flapping sensor from flooding the issue registry (and its storage)"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Final
+import logging
+import math
+
+from .transitions import ISSUE_CRITICAL, ISSUE_ERROR, ISSUE_WARNING
+
+if TYPE_CHECKING:
+    from .model import Clock
+
+_LOGGER = logging.getLogger(__package__)
+
+DEFAULT_UPDATE_INTERVAL: Final[float] = 300.0  # seconds between updates of an issue that keeps occurring
+PERSISTENT_ISSUES: Final = frozenset({"slower_opening", "slower_closing"})  # wear isn't fixed by the door moving fine
+
+_SEVERITY_RANK: Final = {ISSUE_WARNING: 0, ISSUE_ERROR: 1, ISSUE_CRITICAL: 2}
+
+
+class _ActiveIssue:
+    __slots__ = ("severity", "occurrences", "reported", "reported_at")
+
+    def __init__(self, severity: str, reported_at: float):
+        self.severity = severity
+        self.occurrences = 1
+        self.reported = 1  # occurrences at the time of the last report
+        self.reported_at = reported_at
+
+
+class IssueTracker:
+    """
+    Reports an issue the first time it occurs. Repeated occurrences are only counted, and the issue is updated with the
+    count at most once per update_interval, or right away if its severity goes up.
+
+    Issues are resolved (except for PERSISTENT_ISSUES) as soon as the door completes a transition without an error.
+    PERSISTENT_ISSUES are only resolved by key, once whatever raised them sees the problem is gone.
+    """
+    __slots__ = ("suppressed", "_clock", "_report", "_clear", "_update_interval", "_active")
+
+    def __init__(self, clock: Clock, report: Callable[[str, str, int], None], clear: Callable[[str], None],
+                 update_interval: float = DEFAULT_UPDATE_INTERVAL):
+        self.suppressed = 0  # occurrences not reported right away
+        self._clock = clock
+        self._report = report
+        self._clear = clear
+        self._update_interval = update_interval
+        self._active: dict[str, _ActiveIssue] = {}
+
+    @property
+    def active(self) -> dict[str, int]:
+        """Occurrences of every active issue"""
+        return {key: issue.occurrences for key, issue in self._active.items()}
+
+    def adopt(self, key: str, severity: str = ISSUE_WARNING) -> None:
+        """Registers an issue reported before (e.g. before a restart), so it's resolved like any other"""
+        if key not in self._active:
+            self._active[key] = _ActiveIssue(severity, -math.inf)  # so the next occurrence updates it right away
+
+    def occurred(self, key: str, severity: str) -> None:
+        now = self._clock.monotonic()
+        issue = self._active.get(key)
+        if issue is None:
+            self._active[key] = _ActiveIssue(severity, now)
+            self._report(key, severity, 1)
+            return
+
+        issue.occurrences += 1
+        escalated = _SEVERITY_RANK.get(severity, 0) > _SEVERITY_RANK.get(issue.severity, 0)
+        if not escalated and now - issue.reported_at < self._update_interval:
+            self.suppressed += 1
+            return
+
+        if escalated:
+            issue.severity = severity
+        _LOGGER.debug("Issue \"%s\" occurred %d times since last reported", key, issue.occurrences - issue.reported)
+        issue.reported = issue.occurrences
+        issue.reported_at = now
+        self._report(key, issue.severity, issue.occurrences)
+
+    def resolve(self, key: str | None = None) -> None:
+        """Clears the given issue, or (by default) all active issues the door recovers from by itself"""
+        if key is not None:
+            if self._active.pop(key, None) is not None:
+                self._clear(key)
+            return
+
+        for key in [key for key in self._active if key not in PERSISTENT_ISSUES]:
+            del self._active[key]
+            self._clear(key)
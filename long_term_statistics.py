@@ -0,0 +1,171 @@
+"""Hourly door statistics imported into the recorder as external statistics, instead of recording every raw state"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable
+import logging
+
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback, CALLBACK_TYPE
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MAX_HISTORY_LIMIT, STATISTICS_REPLAY_DAYS
+from .hourly import HOUR, DurationAggregate, HourlyAggregate, HourlyAggregator, hour_start
+from .transition_log import LogRecord
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+    from .model import GarageDoorState, TransitionEvent
+    from .storage import DoorHistory
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class DoorStatistics:
+    """
+    Aggregates finished transitions of a door per hour and imports every finished hour in a single batch: cycle and jam
+    counts (as cumulative sums) and open/close durations (mean/min/max).
+
+    Hours not imported yet aren't persisted - after a restart they're rebuilt from the transition log instead, starting
+    right after the last hour the recorder knows about.
+
+    The recorder is an optional dependency, so it's only imported once statistics are actually read or written. Doors
+    get statistics only while the recorder is loaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, state: GarageDoorState, history: DoorHistory, name: str):
+        self._hass = hass
+        self._state = state
+        self._history = history
+        self._name = name
+        self._aggregator = HourlyAggregator()
+        self._watching_since: float | None = None
+        self._sums: dict[str, float] | None = None  # last imported value of each cumulative sum; None until replayed
+
+        prefix = f"{DOMAIN}:{state.internal_id.lower()}"
+        self._cycles_id = f"{prefix}_cycles"
+        self._jams_id = f"{prefix}_jams"
+        self._opening_id = f"{prefix}_open_duration"
+        self._closing_id = f"{prefix}_close_duration"
+
+    @callback
+    def async_watch(self) -> CALLBACK_TYPE:
+        """Starts aggregating transitions; returns a callable to stop it. Must be followed by async_replay()."""
+        self._watching_since = self._state.clock.time()
+        unsubscribe = self._state.subscribe(self._on_transition)
+        # a bit past the full hour, so transitions finished right at the end of an hour are in
+        stop_timer = async_track_utc_time_change(self._hass, self._on_hour, minute=0, second=30)
+
+        @callback
+        def _stop() -> None:
+            unsubscribe()
+            stop_timer()
+
+        return _stop
+
+    async def async_replay(self) -> None:
+        """Aggregates transitions logged before watching started but not imported yet, e.g. before a restart"""
+        from homeassistant.components.recorder import get_instance
+
+        assert self._watching_since is not None
+        sums, last = await get_instance(self._hass).async_add_executor_job(self._last_sums)
+        since = hour_start(self._watching_since - STATISTICS_REPLAY_DAYS * 24 * HOUR)
+        if last is not None:
+            since = max(since, last + HOUR)
+
+        replayed = await self._async_replay_log(since)
+        _LOGGER.debug("%s replayed %d transitions into statistics", self._state.internal_id, replayed)
+        # only now, as an hour imported in the middle of the replay would miss the transitions not replayed yet
+        self._sums = sums
+        self._import(self._state.clock.time())
+
+    async def _async_replay_log(self, since: float) -> int:
+        """Aggregates the transition log from since until watching started, page by page; returns records replayed"""
+        replayed = 0
+        seen = 0  # records at the start of the page replayed with the previous one, as they share the timestamp
+        while True:
+            records = await self._history.async_read(since, self._watching_since, MAX_HISTORY_LIMIT)
+            for record in records[seen:]:
+                self._aggregator.add(record)
+            replayed += len(records) - seen
+            if len(records) < MAX_HISTORY_LIMIT:
+                return replayed
+
+            boundary = records[-1].timestamp
+            if records[0].timestamp == boundary:  # a whole page of a single timestamp; there's no way past it
+                _LOGGER.warning("%s has over %d transitions logged at %s, statistics may miss some of them",
+                                self._state.internal_id, MAX_HISTORY_LIMIT, dt_util.utc_from_timestamp(boundary))
+                return replayed
+
+            since = boundary
+            seen = sum(1 for record in records if record.timestamp == boundary)
+
+    def _last_sums(self) -> tuple[dict[str, float], float | None]:
+        """Returns sums imported before, and start of the newest hour imported (None if nothing was imported yet)"""
+        from homeassistant.components.recorder.statistics import get_last_statistics
+
+        sums: dict[str, float] = {}
+        last_start: float | None = None
+        for statistic_id in (self._cycles_id, self._jams_id):
+            rows = get_last_statistics(self._hass, 1, statistic_id, False, {"sum"}).get(statistic_id)
+            sums[statistic_id] = (rows[0]["sum"] or 0.0) if rows else 0.0
+            if rows and (last_start is None or rows[0]["start"] > last_start):
+                last_start = rows[0]["start"]
+
+        return sums, last_start
+
+    @callback
+    def _on_transition(self, event: TransitionEvent) -> None:
+        record = LogRecord.from_event(event, self._state.clock.time())
+        if record is not None:
+            self._aggregator.add(record)
+
+    @callback
+    def _on_hour(self, now: datetime) -> None:
+        if self._sums is not None:  # otherwise hours wait until the sums are known
+            self._import(now.timestamp())
+
+    def _import(self, now: float) -> None:
+        assert self._sums is not None
+        hours = self._aggregator.pop_finished(now)
+        if not hours:
+            return
+
+        self._import_sum(self._cycles_id, "cycles", hours, lambda hour: hour.cycles)
+        self._import_sum(self._jams_id, "jams", hours, lambda hour: hour.jams)
+        self._import_durations(self._opening_id, "open duration", hours, lambda hour: hour.opening)
+        self._import_durations(self._closing_id, "close duration", hours, lambda hour: hour.closing)
+
+    def _import_sum(self, statistic_id: str, name: str, hours: list[HourlyAggregate],
+                    value: Callable[[HourlyAggregate], int]) -> None:
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        statistics = []
+        for hour in hours:
+            self._sums[statistic_id] += value(hour)
+            statistics.append(StatisticData(start=dt_util.utc_from_timestamp(hour.start), state=value(hour),
+                                            sum=self._sums[statistic_id]))
+
+        async_add_external_statistics(self._hass, self._metadata(statistic_id, name, None, has_sum=True), statistics)
+
+    def _import_durations(self, statistic_id: str, name: str, hours: list[HourlyAggregate],
+                          value: Callable[[HourlyAggregate], DurationAggregate]) -> None:
+        from homeassistant.components.recorder.models import StatisticData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        statistics = [StatisticData(start=dt_util.utc_from_timestamp(hour.start), mean=value(hour).mean,
+                                    min=value(hour).minimum, max=value(hour).maximum)
+                      for hour in hours if value(hour).count]
+        if statistics:
+            async_add_external_statistics(self._hass, self._metadata(statistic_id, name, UnitOfTime.SECONDS,
+                                                                     has_mean=True), statistics)
+
+    def _metadata(self, statistic_id: str, name: str, unit: str | None, has_mean: bool = False,
+                  has_sum: bool = False) -> StatisticMetaData:
+        from homeassistant.components.recorder.models import StatisticMetaData
+
+        return StatisticMetaData(has_mean=has_mean, has_sum=has_sum, name=f"{self._name} {name}", source=DOMAIN,
+                                 statistic_id=statistic_id, unit_of_measurement=unit)
@@ -0,0 +1,84 @@
+"""Hot-path latency and event counters of a door, for telling where the time goes when a door "feels slow\""""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Final
+
+from .histogram import DurationHistogram
+
+if TYPE_CHECKING:
+    from .model import Clock
+
+MIN_LATENCY: Final[float] = 1e-6  # histogram only takes positive values, while a virtual clock can report 0
+REPORTED_QUANTILES: Final = (0.5, 0.9, 0.99, 1.0)
+
+
+class DoorMetrics:
+    """
+    Each hook is a clock read and a couple of integer operations, and nothing runs between events - so an idle door
+    costs nothing at all.
+    """
+    __slots__ = ("sensor_to_write", "command_to_relay", "relay_to_sensor", "events", "writes", "suppressed_pulses",
+                 "_clock", "_handling_since", "_event_at", "_relay_at")
+
+    def __init__(self, clock: Clock):
+        self.sensor_to_write = DurationHistogram()  # sensor event received => door state written to HA
+        self.command_to_relay = DurationHistogram()  # command started executing => relay turned on
+        self.relay_to_sensor = DurationHistogram()  # relay turned on => first sensor edge (i.e. door started moving)
+        self.events = 0  # sensor & toggle events received
+        self.writes = 0  # door state writes
+        self.suppressed_pulses = 0  # pulses denied, as another one was in progress
+        self._clock = clock
+        self._handling_since: float | None = None  # event being handled right now
+        self._event_at: float | None = None  # earliest event which changed the state not written yet
+        self._relay_at: float | None = None  # last relay pulse not followed by a sensor edge yet
+
+    def event_received(self) -> None:
+        self.events += 1
+        self._handling_since = self._clock.monotonic()
+
+    def event_handled(self) -> None:
+        """Event didn't change the state (e.g. echo of our own pulse), or it did and update_requested() took note"""
+        self._handling_since = None
+
+    def update_requested(self) -> None:
+        """State changed; a write follows, measured from the event causing the change (if it's being handled now)"""
+        if self._event_at is None and self._handling_since is not None:
+            self._event_at = self._handling_since
+
+    def state_written(self) -> None:
+        self.writes += 1
+        if self._event_at is not None:
+            self.sensor_to_write.add(max(MIN_LATENCY, self._clock.monotonic() - self._event_at))
+            self._event_at = None
+
+    def relay_turned_on(self, command_started: float) -> None:
+        self._relay_at = self._clock.monotonic()
+        self.command_to_relay.add(max(MIN_LATENCY, self._relay_at - command_started))
+
+    def sensor_edge(self) -> None:
+        if self._relay_at is not None:
+            self.relay_to_sensor.add(max(MIN_LATENCY, self._clock.monotonic() - self._relay_at))
+            self._relay_at = None
+
+    def pulse_suppressed(self) -> None:
+        self.suppressed_pulses += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "latency": {name: _summary(histogram) for name, histogram in (
+                ("sensor_to_write", self.sensor_to_write),
+                ("command_to_relay", self.command_to_relay),
+                ("relay_to_sensor", self.relay_to_sensor),
+            )},
+            "events": self.events,
+            "writes": self.writes,
+            "suppressed_pulses": self.suppressed_pulses,
+        }
+
+
+def _summary(histogram: DurationHistogram) -> dict[str, Any]:
+    summary: dict[str, Any] = {"count": histogram.count}
+    for q in REPORTED_QUANTILES:
+        summary["max" if q == 1.0 else f"p{int(q * 100)}"] = histogram.quantile(q)
+
+    return summary
@@ -1,32 +1,122 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Final, NamedTuple, Protocol
 from dataclasses import dataclass
 from enum import Enum
+import math
+import struct
 import time
 import logging
-from homeassistant.helpers.entity import DeviceInfo
-from .const import DOMAIN
+from .checkpoints import Checkpoint
+from .debounce import DebounceSettings
+from .decoders import DecoderSettings
+from .drift import DriftDetector
+from .histogram import DurationHistogram
+from .metrics import DoorMetrics
+from .trace import TransitionTrace
+from .travel_profile import TravelProfile
+
+# This module (as well as the engine) must not depend on HomeAssistant - it's the pure core of the integration, usable
+# and testable without a running HA instance.
 
 _LOGGER = logging.getLogger(__package__)
 
+
+class Clock(Protocol):
+    def monotonic(self) -> float:
+        """Time used for measuring durations"""
+
+    def time(self) -> float:
+        """Wall-clock time (UNIX timestamp)"""
+
+
+class SystemClock:
+    monotonic = staticmethod(time.monotonic)
+    time = staticmethod(time.time)
+
+
 class DoorState(Enum):
+    # Values are stable codes used in packed snapshots - never renumber them
     CLOSED = 0
     OPENED = 1
     PARTIALLY_OPEN = 2
 
 
-@dataclass
+NO_STATE_CODE: Final[int] = -1  # stands for "None" (unknown state/no target) in packed snapshots
+
+# version, last_state code, target_state code, error, wall-clock time transition started at (NaN when not in motion)
+_SNAPSHOT: Final[struct.Struct] = struct.Struct("<BbbBd")
+_SNAPSHOT_VERSION: Final[int] = 1
+
+
+class TransitionEventType(Enum):
+    STARTED = "started"
+    COMPLETED = "completed"
+    ABORTED = "aborted"  # stopped mid-way on purpose
+    ERROR = "error"
+    SYNCED = "synced"  # state derived from sensors while not in motion, or error cleared
+
+
+class TransitionEvent(NamedTuple):
+    type: TransitionEventType
+    source: str  # what caused the transition, e.g. "closed_sensor", "timer" or "command"
+    timestamp: float  # monotonic time of the event
+    old_state: DoorState | None  # for transitions this is the state the door was moving from
+    new_state: DoorState | None
+    target: DoorState | None  # target of the transition started, completed or aborted
+    started: float | None  # monotonic time the transition started at
+    error: bool
+
+    @property
+    def duration(self) -> float | None:
+        return None if self.started is None else self.timestamp - self.started
+
+    @property
+    def is_full_cycle(self) -> bool:
+        """Whether this is a successful, sensor-confirmed full transition - the only kind worth measuring"""
+        # When completed on timer the duration is just the timer deadline, and at startup it includes the downtime
+        return self.type is TransitionEventType.COMPLETED and self.source not in ("timer", "startup") \
+            and self.old_state in (DoorState.CLOSED, DoorState.OPENED) and self.started is not None \
+            and self.timestamp > self.started
+
+
+TransitionListener = Callable[[TransitionEvent], None]
+
+
+def time_to_seconds(time: dict) -> int:
+    """Converts the duration selector's value (e.g. {"minutes": 1, "seconds": 5}) into seconds"""
+    seconds = 0
+
+    if 'seconds' in time:
+        seconds += time['seconds']
+
+    if 'minutes' in time:
+        seconds += time['minutes'] * 60
+
+    if 'hours' in time:
+        seconds += time['hours'] * 3600
+
+    return seconds
+
+
+# Slotted, as a big installation can keep thousands of these (and their snapshots) around
+@dataclass(slots=True)
 class StateController:
     toggle_controller: str
 
     closed_sensor: str | None
     on_close: bool
+    closed_decoding: DecoderSettings
+    closed_debounce: DebounceSettings
     open_to_close_delta: float
 
     opened_sensor: str | None
     on_open: bool
+    opened_decoding: DecoderSettings
+    opened_debounce: DebounceSettings
     close_to_open_delta: float
 
+    checkpoints: tuple[Checkpoint, ...]  # intermediate sensors, ordered by position
+    power_sensor: str | None  # motor power draw reported by the relay, in watts
     pulse_time: float
 
     def __init__(self, controller: str, closed_sensor: str | None, close_time: int | float, opened_sensor: str | None,
@@ -34,8 +124,14 @@ class StateController:
         self.toggle_controller = controller
         self.closed_sensor = closed_sensor
         self.on_close = True
+        self.closed_decoding = DecoderSettings()
+        self.closed_debounce = DebounceSettings()
         self.opened_sensor = opened_sensor
         self.on_open = True
+        self.opened_decoding = DecoderSettings()
+        self.opened_debounce = DebounceSettings()
+        self.checkpoints = ()
+        self.power_sensor = None
         self.pulse_time = 1.5  # todo: I'm not sure if this needs to be user-configurable?
 
         if close_time <= 0:
@@ -52,8 +148,34 @@ class StateController:
     def invert_opened_signal(self, inverted: bool = True) -> None:
         self.on_open = not inverted
 
+    def decode_closed_signal(self, on_values: tuple[str, ...] = (), threshold: float | None = None,
+                             attribute: str | None = None) -> None:
+        self.closed_decoding = DecoderSettings(on_values, threshold, attribute)
+
+    def decode_opened_signal(self, on_values: tuple[str, ...] = (), threshold: float | None = None,
+                             attribute: str | None = None) -> None:
+        self.opened_decoding = DecoderSettings(on_values, threshold, attribute)
+
+    def debounce_closed_signal(self, window: float = 0.0, min_stable: float = 0.0) -> None:
+        self.closed_debounce = DebounceSettings(window, min_stable)
+
+    def debounce_opened_signal(self, window: float = 0.0, min_stable: float = 0.0) -> None:
+        self.opened_debounce = DebounceSettings(window, min_stable)
 
-@dataclass
+    def monitor_power(self, sensor: str | None) -> None:
+        self.power_sensor = sensor
+
+    def add_checkpoint(self, sensor: str, position: float) -> None:
+        if not 0 < position < 100:
+            raise ValueError(f"Checkpoint position must be between 0 and 100 (got \"{position}\")")
+        if any(checkpoint.position == position for checkpoint in self.checkpoints):
+            raise ValueError(f"There is already a checkpoint at {position}")
+
+        self.checkpoints = tuple(sorted(self.checkpoints + (Checkpoint(sensor, position),),
+                                        key=lambda checkpoint: checkpoint.position))
+
+
+@dataclass(slots=True)
 class GarageDoorState:
     internal_id: str
     controller: StateController
@@ -61,14 +183,32 @@ class GarageDoorState:
     target_state: DoorState | None  # if None it means the state isn't in progress
     transition_triggered: float | None
     error: bool
+    trace: TransitionTrace
+    clock: Clock
+    metrics: DoorMetrics
+    durations: dict[DoorState, DurationHistogram]  # learned durations of full transitions, keyed by their target
+    profiles: dict[DoorState, TravelProfile]  # learned travel of full transitions, keyed by their target
+    drift: dict[DoorState, DriftDetector]  # wear indicators of full transitions, keyed by their target
+    _listeners: list[TransitionListener]
 
-    def __init__(self, int_id: str, controller: StateController, current_tate: DoorState | None = None):
+    def __init__(self, int_id: str, controller: StateController, current_tate: DoorState | None = None,
+                 clock: Clock | None = None):
         self.internal_id = int_id
         self.controller = controller
         self.last_state = current_tate
         self.target_state = None
         self.transition_triggered = None
         self.error = False
+        self.trace = TransitionTrace()
+        self.clock = SystemClock() if clock is None else clock
+        self.metrics = DoorMetrics(self.clock)
+        self.durations = {DoorState.OPENED: DurationHistogram(), DoorState.CLOSED: DurationHistogram()}
+        self.profiles = {
+            DoorState.OPENED: TravelProfile(controller.close_to_open_delta),
+            DoorState.CLOSED: TravelProfile(controller.open_to_close_delta),
+        }
+        self.drift = {DoorState.OPENED: DriftDetector(), DoorState.CLOSED: DriftDetector()}
+        self._listeners = []
 
     @property
     def delta_for_current_state(self) -> float:
@@ -78,33 +218,100 @@ class GarageDoorState:
         return self.controller.close_to_open_delta if self.target_state == DoorState.OPENED \
             else self.controller.open_to_close_delta
 
-    def transition(self, target: DoorState) -> None:
+    def transition(self, target: DoorState, source: str = "command") -> None:
         assert target is not None
         if self.last_state is target:
             raise ValueError(
                 f"Current ({self.last_state.name}) and target ({target.name}) states are the same")
 
         self.target_state = target
-        self.transition_triggered = time.monotonic()
+        self.transition_triggered = self.clock.monotonic()
+        self._publish(TransitionEventType.STARTED, source, self.last_state, target, self.transition_triggered)
 
-    def complete_transition(self) -> None:
+    def complete_transition(self, source: str = "command") -> None:
         if self.target_state is None:
             raise ValueError("There is no transition in progress")
 
-        self.force_state(self.target_state)
+        self.force_state(self.target_state, source=source, event_type=TransitionEventType.COMPLETED)
 
-    def abort_transition(self, error: bool = False) -> None:
+    def abort_transition(self, error: bool = False, source: str = "command") -> None:
         if self.target_state is None:
             raise ValueError("There is no transition in progress")
 
-        self.force_state(DoorState.PARTIALLY_OPEN, error)
+        self.force_state(DoorState.PARTIALLY_OPEN, error, source,
+                         TransitionEventType.ERROR if error else TransitionEventType.ABORTED)
 
-    def force_state(self, state: DoorState, error: bool = False) -> None:
+    def force_state(self, state: DoorState, error: bool = False, source: str = "command",
+                    event_type: TransitionEventType | None = None) -> None:
+        old_state, target, started = self.last_state, self.target_state, self.transition_triggered
         self.last_state = state
         self.target_state = None
         self.transition_triggered = None
         self.error = error
 
+        if event_type is None:
+            event_type = TransitionEventType.ERROR if error else TransitionEventType.SYNCED
+        self._publish(event_type, source, old_state, target, started)
+
+    def clear_error(self, source: str = "command") -> None:
+        if not self.error:
+            return
+
+        self.error = False
+        self._publish(TransitionEventType.SYNCED, source, self.last_state, self.target_state, self.transition_triggered)
+
+    def snapshot(self) -> bytes:
+        """Packs the state into a compact binary form, restorable even after a restart (see restore())"""
+        started = self.transition_started_at()
+        return _SNAPSHOT.pack(_SNAPSHOT_VERSION,
+                              NO_STATE_CODE if self.last_state is None else self.last_state.value,
+                              NO_STATE_CODE if self.target_state is None else self.target_state.value,
+                              self.error, math.nan if started is None else started)
+
+    def delta(self) -> tuple[int, int, float | None, bool]:
+        """State codes, wall-clock transition start and error flag; the same fields as snapshot(), but JSON-friendly"""
+        started = self.transition_started_at()
+        return (NO_STATE_CODE if self.last_state is None else self.last_state.value,
+                NO_STATE_CODE if self.target_state is None else self.target_state.value,
+                None if started is None else round(started, 3),  # so clock jitter doesn't make it look changed
+                self.error)
+
+    def transition_started_at(self) -> float | None:
+        """Wall-clock time the transition in progress started at; monotonic time isn't meaningful outside the process"""
+        if self.transition_triggered is None:
+            return None
+
+        return self.clock.time() - (self.clock.monotonic() - self.transition_triggered)
+
+    def restore(self, snapshot: bytes, source: str = "restore") -> None:
+        version, last_code, target_code, error, started = _SNAPSHOT.unpack(snapshot)
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version \"{version}\"")
+
+        self.last_state = None if last_code == NO_STATE_CODE else DoorState(last_code)
+        self.target_state = None if target_code == NO_STATE_CODE else DoorState(target_code)
+        self.transition_triggered = None if math.isnan(started) \
+            else self.clock.monotonic() - (self.clock.time() - started)
+        self.error = bool(error)
+        self._publish(TransitionEventType.SYNCED, source, self.last_state, self.target_state, self.transition_triggered)
+
+    def subscribe(self, listener: TransitionListener) -> Callable[[], None]:
+        """Delivers every state change to the listener, synchronously; returns a callable unsubscribing it"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _publish(self, event_type: TransitionEventType, source: str, old_state: DoorState | None,
+                 target: DoorState | None, started: float | None) -> None:
+        self.trace.record(self.clock.time(), source, old_state, self.last_state, target, self.error)
+        if not self._listeners:
+            return
+
+        event = TransitionEvent(event_type, source, self.clock.monotonic(), old_state, self.last_state, target,
+                                started, self.error)
+        for listener in tuple(self._listeners):
+            listener(event)
+
     def is_in_motion(self) -> bool:
-        _LOGGER.debug(f"isInMotion? target={self.target_state} state={self.target_state is not None}")
+        # This is called multiple times on every state write - keep it free of logging. Transitions are recorded in the
+        # trace instead.
         return self.target_state is not None
@@ -0,0 +1,125 @@
+"""Streaming analysis of the opener motor power draw, telling a stalled motor from one stopped at the end of travel"""
+from __future__ import annotations
+
+from collections import deque
+from enum import Enum
+from typing import Any, Final, NamedTuple
+
+DEFAULT_POWER_SAMPLES: Final[int] = 64  # per door; a relay reporting every 100ms fills it in ~6s
+INRUSH_TIME: Final[float] = 1.0  # seconds after the start when the motor is still spinning up
+WINDOW: Final[float] = 0.5  # seconds of samples windowed features are computed over
+STEADY_SMOOTHING: Final[float] = 0.2  # weight of a new sample in the steady-state level
+STALL_RATIO: Final[float] = 1.5  # window level over the steady-state one meaning the motor fights an obstruction
+STALL_MIN_SAMPLES: Final[int] = 2  # a single spike is most likely noise
+IDLE_RATIO: Final[float] = 0.2  # level under the steady-state one meaning the motor was cut off
+# Standby draw of the opener electronics, which never counts as running
+IDLE_POWER: Final[float] = 2.0  # watts
+IDLE_CURRENT: Final[float] = 0.02  # amps
+
+# Relays report either the power or the current of the motor; both are analyzed in their base unit
+_UNITS: Final[dict[str, tuple[float, float]]] = {  # unit => (multiplier to the base unit, idle level)
+    "W": (1.0, IDLE_POWER),
+    "kW": (1000.0, IDLE_POWER),
+    "mW": (0.001, IDLE_POWER),
+    "A": (1.0, IDLE_CURRENT),
+    "mA": (0.001, IDLE_CURRENT),
+}
+_DEFAULT_UNITS: Final[dict[str | None, str]] = {"power": "W", "current": "A"}  # for sensors not reporting a unit
+
+
+class MotorReading(NamedTuple):
+    level: float  # in watts or amps
+    idle: float  # level under which the motor surely doesn't run, in the same unit
+
+
+def motor_reading(value: float, unit: str | None, device_class: str | None = None) -> MotorReading | None:
+    """Normalizes a power or current sensor reading to its base unit; None if the unit isn't supported"""
+    if unit is None:
+        unit = _DEFAULT_UNITS.get(device_class, "W")
+    scale = _UNITS.get(unit)
+    if scale is None:
+        return None
+
+    return MotorReading(value * scale[0], scale[1])
+
+
+class PowerSignal(Enum):
+    STALLED = "stalled"  # draw spiked mid-travel - the door is obstructed
+    STOPPED = "stopped"  # draw dropped to idle - the opener cut the motor off, most likely at the end of travel
+
+
+class PowerAnalyzer:
+    """
+    Keeps a fixed-size ring buffer of power (or current) samples of a moving door and derives the features from it:
+      - inrush peak, i.e. the highest draw while the motor spins up
+      - steady-state level, i.e. smoothed draw while the door travels, not including spikes
+      - window level, i.e. the lowest draw over the last WINDOW seconds; a sustained spike raises it, noise doesn't
+
+    Every sample is classified right away, so a stall or stop is reported with at most WINDOW seconds of delay on top
+    of the sensor reporting interval. Apart from the idle level passed with every sample, all thresholds are relative,
+    so the unit doesn't matter.
+    """
+    __slots__ = ("inrush", "steady", "_samples", "_started", "_idle")
+
+    def __init__(self, size: int = DEFAULT_POWER_SAMPLES):
+        if size < STALL_MIN_SAMPLES:
+            raise ValueError(f"Power analyzer needs at least {STALL_MIN_SAMPLES} samples (got \"{size}\")")
+        self.inrush = 0.0
+        self.steady: float | None = None
+        self._samples: deque[tuple[float, float]] = deque(maxlen=size)
+        self._started: float | None = None
+        self._idle = IDLE_POWER
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the motor was seen drawing power since the start"""
+        return self._started is not None and self.inrush > self._idle
+
+    def start(self, now: float) -> None:
+        self.inrush = 0.0
+        self.steady = None
+        self._samples.clear()
+        self._started = now
+
+    def stop(self) -> None:
+        self._started = None
+
+    def window_level(self, now: float) -> float | None:
+        """Lowest draw over the last WINDOW seconds, if there are enough samples to tell a spike from noise"""
+        levels = [level for at, level in self._samples if now - at <= WINDOW]
+        return min(levels) if len(levels) >= STALL_MIN_SAMPLES else None
+
+    def add(self, now: float, level: float, idle: float = IDLE_POWER) -> PowerSignal | None:
+        """Classifies a new sample; returns a signal once, after which the analyzer needs to be started again"""
+        if self._started is None:
+            return None
+
+        self._idle = idle
+        self._samples.append((now, level))
+        if now - self._started < INRUSH_TIME:
+            self.inrush = max(self.inrush, level)
+            return None
+
+        if not self.is_running:  # relay pulsed, but the motor didn't start (yet)
+            self.inrush = max(self.inrush, level)
+            return None
+
+        if level < (idle if self.steady is None else max(idle, self.steady * IDLE_RATIO)):
+            self.stop()
+            return PowerSignal.STOPPED
+
+        if self.steady is None:
+            self.steady = level
+            return None
+
+        level_over_window = self.window_level(now)
+        if level_over_window is not None and level_over_window > self.steady * STALL_RATIO:
+            self.stop()
+            return PowerSignal.STALLED
+
+        if level <= self.steady * STALL_RATIO:  # spikes stay out of the baseline, so a slow stall can't hide in it
+            self.steady += STEADY_SMOOTHING * (level - self.steady)
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"inrush": self.inrush, "steady": self.steady, "samples": len(self._samples)}
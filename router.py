@@ -0,0 +1,80 @@
+"""Integration-wide router of sensor & relay state changes to the doors using them"""
+from __future__ import annotations
+
+from typing import Callable
+import logging
+
+from homeassistant.core import HomeAssistant, Event, State, callback, CALLBACK_TYPE
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DATA_ROUTER
+
+_LOGGER = logging.getLogger(__package__)
+
+StateHandler = Callable[[State], None]
+
+
+class SensorEventRouter:
+    """
+    Dispatches state changes of watched entities to handlers registered for them.
+
+    Every watched entity is tracked exactly once, no matter how many doors use it, and all of them share a single
+    dispatch callback. Updates which don't change the value a handler reads (the state itself or one attribute, e.g.
+    for attribute-only changes) are dropped before reaching the door.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._routes: dict[str, list[tuple[StateHandler, str | None]]] = {}
+        self._trackers: dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_register(self, entity_id: str, handler: StateHandler, attribute: str | None = None) -> CALLBACK_TYPE:
+        """Routes changes of the entity state (or its attribute) to the handler; returns a callable removing it"""
+        routes = self._routes.get(entity_id)
+        if routes is None:
+            self._routes[entity_id] = routes = []
+            self._trackers[entity_id] = async_track_state_change_event(self._hass, entity_id, self._dispatch)
+            _LOGGER.debug("Router now tracks %s (%d entities total)", entity_id, len(self._trackers))
+        route = (handler, attribute)
+        routes.append(route)
+
+        @callback
+        def _remove() -> None:
+            routes.remove(route)
+            if not routes:
+                del self._routes[entity_id]
+                self._trackers.pop(entity_id)()
+
+        return _remove
+
+    @callback
+    def _dispatch(self, event: Event) -> None:
+        new_state: State | None = event.data.get('new_state')
+        if new_state is None:  # entity removed
+            return
+
+        routes = self._routes.get(event.data['entity_id'])
+        if routes is None:  # all routes removed while the event was in flight
+            return
+
+        old_state: State | None = event.data.get('old_state')
+        state_changed = old_state is None or old_state.state != new_state.state
+        for handler, attribute in tuple(routes):  # handler may unregister itself
+            if attribute is None:
+                if not state_changed:
+                    continue
+            elif old_state is not None and \
+                    old_state.attributes.get(attribute) == new_state.attributes.get(attribute):
+                continue
+
+            handler(new_state)
+
+
+@callback
+def async_get_router(hass: HomeAssistant) -> SensorEventRouter:
+    router: SensorEventRouter | None = hass.data.get(DATA_ROUTER)
+    if router is None:
+        router = hass.data[DATA_ROUTER] = SensorEventRouter(hass)
+
+    return router
@@ -0,0 +1,88 @@
+"""
+Measures the memory footprint of a door: its state, controller and engine as freshly set up, together with the size of
+its packed snapshot. Optionally also once every door went through some transitions, which fill the trace and the
+learned durations & travel profiles (they stop growing after ~25 cycles, but that takes minutes at 10k doors).
+
+Doesn't need Home Assistant, e.g.:
+    python scripts/benchmark_memory.py --doors 10000 --cycles 5
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import gc
+import sys
+import tracemalloc
+import types
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The checkout is the integration package itself, and its __init__ sets up HA - so the package is registered without it
+_package = types.ModuleType("upsmart_garage")
+_package.__path__ = [str(ROOT)]
+sys.modules["upsmart_garage"] = _package
+sys.path.insert(0, str(ROOT / "tests"))  # for the virtual clock
+
+# pylint: disable=wrong-import-position
+from upsmart_garage.engine import DoorEngine  # noqa: E402
+from upsmart_garage.model import DoorState, GarageDoorState, StateController  # noqa: E402
+from simulator import VirtualClock  # noqa: E402
+
+TRAVEL_TIME = 15.0
+
+
+def build_doors(count: int, clock: VirtualClock) -> list[DoorEngine]:
+    engines = []
+    for index in range(count):
+        controller = StateController(f"switch.door_{index}", f"binary_sensor.door_{index}_closed", TRAVEL_TIME,
+                                     f"binary_sensor.door_{index}_opened", TRAVEL_TIME)
+        engine = DoorEngine(GarageDoorState(f"door_{index}", controller, clock=clock), clock)
+        engine.sensor_closed = True
+        engine.sensor_opened = False
+        engine.sync()
+        engines.append(engine)
+
+    return engines
+
+
+def cycle(engines: list[DoorEngine], clock: VirtualClock) -> None:
+    """Opens and closes every door, with both end sensors confirming it"""
+    for target, leaving, arriving in ((DoorState.OPENED, "on_closed_sensor", "on_opened_sensor"),
+                                      (DoorState.CLOSED, "on_opened_sensor", "on_closed_sensor")):
+        for engine in engines:
+            engine.begin_transition(target)
+            getattr(engine, leaving)(False)
+        clock.advance(TRAVEL_TIME)
+        for engine in engines:
+            getattr(engine, arriving)(True)
+
+
+def _allocated() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--doors", type=int, default=10000, help="doors to build (default: %(default)s)")
+    parser.add_argument("--cycles", type=int, default=0, help="open/close cycles every door goes through afterwards")
+    args = parser.parse_args()
+
+    clock = VirtualClock()
+    tracemalloc.start()
+    baseline = _allocated()
+    engines = build_doors(args.doors, clock)
+    fresh = _allocated() - baseline
+    print(f"{args.doors} doors: {fresh / args.doors:.0f} bytes per door when set up "
+          f"({fresh / 2 ** 20:.1f}MiB in total), packed snapshot {len(engines[0].state.snapshot())} bytes")
+
+    if args.cycles:
+        for _ in range(args.cycles):
+            cycle(engines, clock)
+        used = _allocated() - baseline
+        print(f"{used / args.doors:.0f} bytes per door after {args.cycles} cycles ({used / 2 ** 20:.1f}MiB in total)")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
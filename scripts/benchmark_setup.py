@@ -0,0 +1,137 @@
+"""
+Measures what the integration adds to Home Assistant boot: import time of the integration and its platforms, and
+async_setup_entry latency of every door as the number of doors grows.
+
+Needs Home Assistant with its test helpers (pip install pytest-homeassistant-custom-component), e.g.:
+    python scripts/benchmark_setup.py --doors 100
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+DOMAIN = "upsmart_garage"
+PLATFORMS = ("cover", "binary_sensor", "sensor")
+# Imported by Home Assistant itself before any integration is loaded, so they don't count against the integration
+PRELOADED = ("homeassistant.core", "homeassistant.config_entries", "homeassistant.helpers.config_validation",
+             "homeassistant.helpers.entity_platform", "homeassistant.helpers.event", "homeassistant.components.cover",
+             "homeassistant.components.binary_sensor", "homeassistant.components.sensor")
+
+_IMPORT_TIMER = """
+import importlib, json, sys, time
+sys.path.insert(0, sys.argv[1])
+for module in json.loads(sys.argv[2]):
+    importlib.import_module(module)
+started = time.perf_counter()
+importlib.import_module("custom_components.{domain}")
+integration = time.perf_counter()
+for platform in json.loads(sys.argv[3]):
+    importlib.import_module("custom_components.{domain}." + platform)
+print(json.dumps([integration - started, time.perf_counter() - integration]))
+"""
+
+
+def _custom_components(directory: str) -> str:
+    """Lays out the checkout as a custom component, the way Home Assistant loads it; returns the path to import from"""
+    package = Path(directory, "custom_components")
+    package.mkdir()
+    (package / "__init__.py").touch()
+    (package / DOMAIN).symlink_to(ROOT, target_is_directory=True)
+    return directory
+
+
+def measure_imports(path: str, runs: int) -> tuple[float, float]:
+    """Median import time of the integration and of its platforms, each in a fresh interpreter"""
+    integration, platforms = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_TIMER.format(domain=DOMAIN), path, json.dumps(PRELOADED),
+                                 json.dumps(PLATFORMS)], check=True, capture_output=True, text=True).stdout
+        times = json.loads(output)
+        integration.append(times[0])
+        platforms.append(times[1])
+
+    return statistics.median(integration), statistics.median(platforms)
+
+
+def _entry_data(index: int) -> dict[str, Any]:
+    return {
+        "name": f"Door {index}",
+        "state_toggle_relay": f"switch.door_{index}",
+        "closed_sensor": f"binary_sensor.door_{index}_closed",
+        "invert_closed_sensor": False,
+        "opened_sensor": f"binary_sensor.door_{index}_opened",
+        "invert_opened_sensor": False,
+        "open_time": {"seconds": 20},
+        "close_time": {"seconds": 20},
+    }
+
+
+async def measure_setup(doors: int, directory: str) -> list[float]:
+    """async_setup_entry latency of every door, set up one after another"""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.setup import async_setup_component  # before the loader, which can't be imported first
+    from homeassistant import loader
+    from homeassistant.helpers import recorder as recorder_helper
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    durations = []
+    async with async_test_home_assistant() as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        recorder_helper.async_initialize_recorder(hass)
+        assert await async_setup_component(hass, "recorder", {"recorder": {"db_url": f"sqlite:///{directory}/ha.db"}})
+        for index in range(doors):
+            hass.states.async_set(f"switch.door_{index}", "off")
+            hass.states.async_set(f"binary_sensor.door_{index}_closed", "on")
+            hass.states.async_set(f"binary_sensor.door_{index}_opened", "off")
+        await hass.async_block_till_done()
+
+        for index in range(doors):
+            entry = MockConfigEntry(domain=DOMAIN, data=_entry_data(index), title=f"Door {index}")
+            entry.add_to_hass(hass)
+            started = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            durations.append(time.perf_counter() - started)
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--doors", type=int, default=100, help="doors to set up (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time the imports in")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)  # warns about every custom integration
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = _custom_components(directory)
+        integration, platforms = measure_imports(path, args.runs)
+        print(f"import: integration {integration * 1000:.1f}ms, platforms {platforms * 1000:.1f}ms")
+
+        sys.path.insert(0, path)
+        import custom_components  # pylint: disable=import-outside-toplevel,unused-import # before HA test helpers do
+        durations = [duration * 1000 for duration in asyncio.run(measure_setup(args.doors, directory))]
+        # the first door also sets up the integration itself (services, WebSocket commands, shared timers)
+        print(f"setup: first door {durations[0]:.1f}ms", end="")
+        if len(durations) > 1:
+            rest = sorted(durations[1:])
+            print(f", then per door median {statistics.median(rest):.1f}ms, "
+                  f"p95 {rest[int(0.95 * (len(rest) - 1))]:.1f}ms, max {rest[-1]:.1f}ms; "
+                  f"{sum(durations):.0f}ms for {args.doors} doors", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
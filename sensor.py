@@ -1,26 +1,20 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-
-import datetime
-import time
 from typing import TYPE_CHECKING
 import logging
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change
-from homeassistant.helpers import entity_registry as er
-from homeassistant.const import (Platform, UnitOfTime, EntityCategory)
+from homeassistant.const import PERCENTAGE, UnitOfTime, EntityCategory
 
 from .const import DOMAIN
 from .entity import UpSmartCoverDerivedEntity
 from .model import DoorState
 if TYPE_CHECKING:
-    from .model import GarageDoorState
+    from .model import GarageDoorState, TransitionEvent
 
 _LOGGER = logging.getLogger(__package__)
 PARALLEL_UPDATES = 0
@@ -40,6 +34,7 @@ async def async_setup_entry(
         entities.append(GarageDoorOpenTime(hass, state))
     if state.controller.closed_sensor:
         entities.append(GarageDoorCloseTime(hass, state))
+    entities.append(GarageDoorHealthSensor(hass, state))
 
     async_add_entities(entities, True)
 
@@ -54,7 +49,6 @@ class GarageTransitionTimeSensor(UpSmartCoverDerivedEntity, SensorEntity):
     _attr_native_unit_of_measurement = UnitOfTime.SECONDS
     _attr_suggested_display_precision = 0
 
-    _accumulating: float | None = None
     _target_of_interest: DoorState = None # type: ignore[assignment]
 
     @abstractmethod
@@ -63,24 +57,13 @@ class GarageTransitionTimeSensor(UpSmartCoverDerivedEntity, SensorEntity):
         self._target_of_interest = target
 
     @callback
-    async def _on_cover_state_change(self, entity_id, old_state, new_state) -> None:
-        if self._garage_state.is_in_motion():
-            # we only care about full transitions, not partial to avoid bogus data
-            if self._garage_state.last_state != DoorState.PARTIALLY_OPEN and self._garage_state.last_state is not None \
-               and self._garage_state.target_state == self._target_of_interest:
-                self._accumulating = time.monotonic()
-            return
-
-        if self._accumulating is None:
+    def _on_transition(self, event: TransitionEvent) -> None:
+        # we only care about successful full transitions, not partial or errored-out ones, to avoid bogus data
+        if not event.is_full_cycle or event.target != self._target_of_interest:
             return
 
-        if self._garage_state.error:  # we do not want to track errored-out states, only successful transitions
-            self._accumulating = None
-            return
-
-        self._attr_native_value = time.monotonic() - self._accumulating
-        self._accumulating = None
-        self.async_write_ha_state()
+        self._attr_native_value = event.duration
+        self._async_mark_dirty()
 
 
 class GarageDoorOpenTime(GarageTransitionTimeSensor):
@@ -93,3 +76,25 @@ class GarageDoorCloseTime(GarageTransitionTimeSensor):
     def __init__(self, hass: HomeAssistant, state: GarageDoorState):
         super().__init__(hass, state, "time_to_closed", DoorState.CLOSED)
         self._attr_icon = "mdi:sort-clock-ascending"
+
+
+# Wear indicator derived from drift of transition times, so slowing down motor or weakening springs can be serviced
+# before the door jams. Falls from 100% as transitions get consistently slower than the door used to be.
+class GarageDoorHealthSensor(UpSmartCoverDerivedEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _attr_icon = "mdi:heart-pulse"
+
+    def __init__(self, hass: HomeAssistant, state: GarageDoorState):
+        super().__init__(hass, state, "health")
+
+    @property
+    def native_value(self) -> float:
+        return 100 * min(drift.health for drift in self._garage_state.drift.values())
+
+    @callback
+    def _on_transition(self, event: TransitionEvent) -> None:
+        if event.is_full_cycle:  # the only kind of transition fed to the drift detectors
+            self._async_mark_dirty()
@@ -0,0 +1,123 @@
+"""Integration-wide services, registered once regardless of the number of configured doors"""
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .commands import DoorCommand, async_run_staggered
+from .const import *
+
+if TYPE_CHECKING:
+    from .commands import CommandQueue
+    from .model import GarageDoorState
+    from .storage import DoorHistory
+
+_LOGGER = logging.getLogger(__package__)
+
+DOOR_SELECTION_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+OPERATE_DOORS_SCHEMA = DOOR_SELECTION_SCHEMA.extend({
+    vol.Required(ATTR_COMMAND): vol.In([command.value for command in DoorCommand if command is not DoorCommand.PULSE]),
+    vol.Optional(ATTR_MAX_CONCURRENT, default=DEFAULT_MAX_CONCURRENT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(ATTR_STAGGER, default=DEFAULT_STAGGER): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+QUERY_HISTORY_SCHEMA = DOOR_SELECTION_SCHEMA.extend({
+    vol.Optional(ATTR_SINCE): cv.datetime,
+    vol.Optional(ATTR_UNTIL): cv.datetime,
+    vol.Optional(ATTR_LIMIT, default=DEFAULT_HISTORY_LIMIT): vol.All(vol.Coerce(int),
+                                                                     vol.Range(min=1, max=MAX_HISTORY_LIMIT)),
+    vol.Optional(ATTR_AGGREGATE, default=False): cv.boolean,
+})
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registers services of the integration (idempotent)"""
+    if hass.services.has_service(DOMAIN, SERVICE_DUMP_TRACE):
+        return
+
+    hass.services.async_register(DOMAIN, SERVICE_DUMP_TRACE, partial(_async_dump_trace, hass),
+                                 schema=DOOR_SELECTION_SCHEMA, supports_response=SupportsResponse.ONLY)
+    hass.services.async_register(DOMAIN, SERVICE_OPERATE_DOORS, partial(_async_operate_doors, hass),
+                                 schema=OPERATE_DOORS_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_QUERY_HISTORY, partial(_async_query_history, hass),
+                                 schema=QUERY_HISTORY_SCHEMA, supports_response=SupportsResponse.ONLY)
+
+
+@callback
+def resolve_doors(hass: HomeAssistant, device_ids: list[str] | None) -> dict[str, GarageDoorState]:
+    """Maps selected devices to door states, keyed by config entry id. No selection = all doors."""
+    doors: dict[str, GarageDoorState] = hass.data.get(DOMAIN, {})
+    if not device_ids:
+        return dict(doors)
+
+    device_registry = dr.async_get(hass)
+    selected: dict[str, GarageDoorState] = {}
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            raise HomeAssistantError(f"Device \"{device_id}\" does not exist")
+
+        entry_ids = [entry_id for entry_id in device.config_entries if entry_id in doors]
+        if not entry_ids:
+            raise HomeAssistantError(f"Device \"{device_id}\" is not an {ATTR_MODEL} door")
+        for entry_id in entry_ids:
+            selected[entry_id] = doors[entry_id]
+
+    return selected
+
+
+async def _async_dump_trace(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Returns transition trace of selected doors, from the oldest to the newest record"""
+    doors = resolve_doors(hass, call.data.get(ATTR_DEVICE_ID))
+    return {entry_id: state.trace.dump() for entry_id, state in doors.items()}
+
+
+async def _async_operate_doors(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Commands many doors at once, staggering relay pulses so the motors don't all start at the same moment"""
+    command = DoorCommand(call.data[ATTR_COMMAND])
+    queues: dict[str, CommandQueue] = hass.data.get(DATA_COMMANDS, {})
+    jobs = {}
+    response: dict[str, Any] = {}
+    for entry_id in resolve_doors(hass, call.data.get(ATTR_DEVICE_ID)):
+        if entry_id in queues:
+            jobs[entry_id] = partial(queues[entry_id].async_submit, command)
+        else:  # door entity disabled or not loaded yet
+            response[entry_id] = {"success": False, "error": "Door is not available"}
+
+    results = await async_run_staggered(jobs, call.data[ATTR_MAX_CONCURRENT], call.data[ATTR_STAGGER])
+    for entry_id, error in results.items():
+        if error is not None:
+            _LOGGER.error("Failed to %s %s: %s", command.value, entry_id, error)
+        response[entry_id] = {"success": error is None, "error": None if error is None else str(error)}
+
+    return response if call.return_response else None
+
+
+async def _async_query_history(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Returns records (or per-direction aggregates) of finished transitions of selected doors from the given window"""
+    since = call.data.get(ATTR_SINCE)
+    since = None if since is None else dt_util.as_timestamp(since)
+    until = call.data.get(ATTR_UNTIL)
+    until = None if until is None else dt_util.as_timestamp(until)
+
+    histories: dict[str, DoorHistory] = hass.data.get(DATA_HISTORY, {})
+    response: dict[str, Any] = {}
+    for entry_id in resolve_doors(hass, call.data.get(ATTR_DEVICE_ID)):
+        if entry_id not in histories:
+            continue
+        if call.data[ATTR_AGGREGATE]:
+            response[entry_id] = await histories[entry_id].async_aggregate(since, until)
+        else:
+            records = await histories[entry_id].async_read(since, until, call.data[ATTR_LIMIT])
+            response[entry_id] = [record.as_dict() for record in records]
+
+    return response
@@ -0,0 +1,149 @@
+"""Persistence of per-door state, learned data and transition history across HA restarts"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+import asyncio
+import base64
+import binascii
+import logging
+import struct
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback, CALLBACK_TYPE
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN, HISTORY_WRITE_DELAY, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .model import DoorState
+from .transition_log import LogRecord, TransitionLog
+
+if TYPE_CHECKING:
+    from .model import GarageDoorState, TransitionEvent
+
+_LOGGER = logging.getLogger(__package__)
+
+
+async def async_remove_door_data(hass: HomeAssistant, door_id: str) -> None:
+    """Deletes everything kept in storage for a door, i.e. its learned data and transition log"""
+    await Store(hass, STORAGE_VERSION, _store_key(door_id)).async_remove()
+    await hass.async_add_executor_job(TransitionLog(_log_path(hass, door_id)).delete)
+    _LOGGER.debug("%s removed stored data", door_id)
+
+
+def _store_key(door_id: str) -> str:
+    return f"{DOMAIN}.{door_id}"
+
+
+def _log_path(hass: HomeAssistant, door_id: str) -> str:
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{door_id}.log")
+
+
+class DoorStore:
+    """Keeps state & learned data of a door in HA storage; saves are delayed, so a burst of changes is one write"""
+
+    def __init__(self, hass: HomeAssistant, state: GarageDoorState):
+        self._state = state
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, _store_key(state.internal_id))
+
+    async def async_load(self) -> None:
+        """Loads previously saved data into the door state"""
+        data = await self._store.async_load()
+        if data is None:
+            return
+
+        for target, durations in data.get("durations", {}).items():
+            self._state.durations[DoorState[target]].load(durations)
+        for target, profile in data.get("profiles", {}).items():
+            self._state.profiles[DoorState[target]].load(profile)
+        for target, drift in data.get("drift", {}).items():
+            self._state.drift[DoorState[target]].load(drift)
+        _LOGGER.debug("%s loaded learned data", self._state.internal_id)
+
+        if (snapshot := data.get("snapshot")) is not None:
+            try:
+                self._state.restore(base64.b64decode(snapshot))
+            except (ValueError, binascii.Error, struct.error) as e:
+                _LOGGER.warning("%s cannot restore state from before restart: %s", self._state.internal_id, e)
+
+    @callback
+    def async_watch(self) -> CALLBACK_TYPE:
+        """Schedules a save whenever the state changes; returns a callable to stop watching"""
+        return self._state.subscribe(self._on_transition)
+
+    async def async_flush(self) -> None:
+        await self._store.async_save(self._data())
+
+    @callback
+    def _on_transition(self, _event: TransitionEvent) -> None:
+        # Data is only collected when the write actually happens. Pending writes are also flushed when HA stops, so the
+        # snapshot saved is always the latest state.
+        self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "snapshot": base64.b64encode(self._state.snapshot()).decode(),
+            "durations": {target.name: durations.as_dict() for target, durations in self._state.durations.items()},
+            "profiles": {target.name: profile.as_dict() for target, profile in self._state.profiles.items()},
+            "drift": {target.name: drift.as_dict() for target, drift in self._state.drift.items()},
+        }
+
+
+class DoorHistory:
+    """
+    Appends every finished transition of a door to its transition log. Records are buffered and written in batches by
+    a worker thread, so the event loop never waits for the disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, state: GarageDoorState):
+        self.log = TransitionLog(_log_path(hass, state.internal_id))
+        self._hass = hass
+        self._state = state
+        self._lock = asyncio.Lock()  # keeps batches in order
+        self._cancel_write: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_watch(self) -> CALLBACK_TYPE:
+        """Starts logging transitions; returns a callable to stop it"""
+        unsubscribe = self._state.subscribe(self._on_transition)
+        stop_listener = self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_on_final_write)
+
+        @callback
+        def _stop() -> None:
+            unsubscribe()
+            stop_listener()
+            if self._cancel_write is not None:
+                self._cancel_write()
+                self._cancel_write = None
+
+        return _stop
+
+    async def async_flush(self) -> None:
+        async with self._lock:
+            data = self.log.take()
+            if data:
+                await self._hass.async_add_executor_job(self.log.write, data)
+
+    async def async_read(self, since: float | None, until: float | None, limit: int) -> list[LogRecord]:
+        await self.async_flush()  # so recent transitions are included
+        return await self._hass.async_add_executor_job(self.log.read, since, until, limit)
+
+    async def async_aggregate(self, since: float | None, until: float | None) -> dict[str, dict[str, Any]]:
+        await self.async_flush()
+        return await self._hass.async_add_executor_job(self.log.aggregate, since, until)
+
+    @callback
+    def _on_transition(self, event: TransitionEvent) -> None:
+        record = LogRecord.from_event(event, self._state.clock.time())
+        if record is None:
+            return
+
+        self.log.append(record)
+        if self._cancel_write is None:
+            self._cancel_write = async_call_later(self._hass, HISTORY_WRITE_DELAY, self._async_on_write_due)
+
+    async def _async_on_write_due(self, _now: Any) -> None:
+        self._cancel_write = None
+        await self.async_flush()
+
+    async def _async_on_final_write(self, _event: Event) -> None:
+        await self.async_flush()
@@ -0,0 +1,222 @@
+"""
+Time-accelerated virtual garage doors, exercising the engine without a real door, relay or reed switches.
+
+Doors run on a virtual clock, which jumps straight to the next scheduled event instead of waiting for it, so a fleet of
+hundreds of doors goes through days of operation in seconds. Like the engine, this doesn't depend on HomeAssistant -
+the entity side (state decoding, relay pulses) is left to the integration's own tests.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Callable, Final, NamedTuple
+
+from upsmart_garage.debounce import DebounceSettings, SensorFilter
+from upsmart_garage.engine import DoorEngine
+from upsmart_garage.model import DoorState, GarageDoorState, StateController, TransitionEvent, TransitionEventType
+
+VIRTUAL_EPOCH: Final[float] = 1_700_000_000.0  # wall-clock time the virtual clock starts at
+
+
+class VirtualClock:
+    """Clock and scheduler in one; time only moves forward with advance()"""
+    __slots__ = ("_now", "_timers", "_sequence")
+
+    def __init__(self):
+        self._now = 0.0
+        self._timers: list[tuple[float, int, list[Any]]] = []  # (due, order of scheduling, [action or None])
+        self._sequence = itertools.count()
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return VIRTUAL_EPOCH + self._now
+
+    def call_later(self, delay: float, action: Callable[[], None]) -> Callable[[], None]:
+        timer = [action]
+        heapq.heappush(self._timers, (self._now + max(0.0, delay), next(self._sequence), timer))
+
+        def _cancel() -> None:
+            timer[0] = None
+
+        return _cancel
+
+    def advance(self, seconds: float = math.inf) -> None:
+        """Runs everything scheduled within the given time (or until nothing is left), in order"""
+        until = self._now + seconds
+        while self._timers and self._timers[0][0] <= until:
+            due, _order, timer = heapq.heappop(self._timers)
+            if timer[0] is not None:  # cancelled timers don't move the time
+                self._now = due
+                timer[0]()
+
+        if not math.isinf(until):
+            self._now = until
+
+
+class DoorFaults(NamedTuple):
+    jam_at: float | None = None  # position (0..100) the door gets stuck at the next time it passes it
+    bounce: int = 0  # extra on/off chatters of a reed switch whenever it changes
+    bounce_interval: float = 0.01  # seconds between the chatters
+
+
+class SimulatedDoor:
+    """
+    Door driven by a single-button opener: a press starts the motor when stopped, or stops it when moving. Like real
+    openers, every start goes in the opposite direction to the previous one.
+
+    The door travels at a constant speed and reports reaching either end through reed switches (with optional contact
+    bounce). A jam stops the door mid-way, as if the motor stalled.
+    """
+    __slots__ = ("travel_time", "faults", "closed", "opened", "arrived_at", "jammed_at", "_clock", "_on_closed",
+                 "_on_opened", "_position", "_direction", "_moving_since", "_last_direction", "_stop_motor")
+
+    def __init__(self, clock: VirtualClock, travel_time: float, on_closed: Callable[[bool], None],
+                 on_opened: Callable[[bool], None], faults: DoorFaults = DoorFaults(), position: float = 0.0):
+        self.travel_time = travel_time
+        self.faults = faults
+        self.closed = position <= 0
+        self.opened = position >= 100
+        self.arrived_at: float | None = None  # time the door last reached either end
+        self.jammed_at: float | None = None  # time the door last got stuck
+        self._clock = clock
+        self._on_closed = on_closed
+        self._on_opened = on_opened
+        self._position = position
+        self._direction = 0  # 1 = opening, -1 = closing, 0 = stopped
+        self._moving_since = 0.0
+        self._last_direction = 1 if position >= 100 else -1
+        self._stop_motor: Callable[[], None] | None = None
+
+    @property
+    def position(self) -> float:
+        elapsed = self._clock.monotonic() - self._moving_since
+        return min(100.0, max(0.0, self._position + self._direction * elapsed * 100 / self.travel_time))
+
+    @property
+    def is_moving(self) -> bool:
+        return self._direction != 0
+
+    def press(self) -> None:
+        if self.is_moving:
+            self._halt()
+            return
+
+        self._direction = self._last_direction = -self._last_direction
+        self._moving_since = self._clock.monotonic()
+        end = 100.0 if self._direction > 0 else 0.0
+        jam = self.faults.jam_at
+        stops_at = jam if jam is not None and min(self._position, end) < jam < max(self._position, end) else end
+        self._stop_motor = self._clock.call_later(abs(stops_at - self._position) * self.travel_time / 100,
+                                                  self._on_motor_stop)
+        self._set_sensors()
+
+    def _on_motor_stop(self) -> None:
+        self._stop_motor = None
+        self._halt()
+        if 0 < self._position < 100:
+            self.jammed_at = self._clock.monotonic()
+            self.faults = self.faults._replace(jam_at=None)
+        else:
+            self.arrived_at = self._clock.monotonic()
+        self._set_sensors()
+
+    def _halt(self) -> None:
+        self._position = self.position
+        self._direction = 0
+        if self._stop_motor is not None:
+            self._stop_motor()
+            self._stop_motor = None
+
+    def _set_sensors(self) -> None:
+        closed = self._position <= 0 and not self.is_moving
+        opened = self._position >= 100 and not self.is_moving
+        if closed != self.closed:
+            self.closed = closed
+            self._report(self._on_closed, closed)
+        if opened != self.opened:
+            self.opened = opened
+            self._report(self._on_opened, opened)
+
+    def _report(self, output: Callable[[bool], None], value: bool) -> None:
+        output(value)
+        for chatter in range(1, 2 * self.faults.bounce + 1):
+            self._clock.call_later(chatter * self.faults.bounce_interval,
+                                   lambda flipped=bool(chatter % 2): output(value is not flipped))
+
+
+class SimulatedInstallation:
+    """A door together with the engine watching it, its sensors debounced into the engine like the cover's are"""
+    __slots__ = ("door", "state", "engine", "issues", "detections", "_closed_filter", "_opened_filter")
+
+    def __init__(self, name: str, clock: VirtualClock, travel_time: float, faults: DoorFaults = DoorFaults(),
+                 debounce: DebounceSettings = DebounceSettings()):
+        controller = StateController(f"switch.{name}_relay", f"binary_sensor.{name}_closed", travel_time,
+                                     f"binary_sensor.{name}_opened", travel_time)
+        self.state = GarageDoorState(name, controller, clock=clock)
+        self.engine = DoorEngine(self.state, clock, on_issue=lambda key, _severity: self.issues.append(key))
+        self.issues: list[str] = []
+        self.detections: list[float] = []  # seconds between the door physically stopping and the engine noticing
+
+        self._closed_filter = SensorFilter(self.engine.on_closed_sensor, clock, clock, debounce)
+        self._opened_filter = SensorFilter(self.engine.on_opened_sensor, clock, clock, debounce)
+        self.door = SimulatedDoor(clock, travel_time, self._closed_filter.push, self._opened_filter.push, faults)
+
+        self.engine.sensor_closed = self.door.closed
+        self.engine.sensor_opened = self.door.opened
+        self.engine.toggle_state = False
+        self._closed_filter.reset(self.door.closed)
+        self._opened_filter.reset(self.door.opened)
+        self.engine.sync()
+        self.state.subscribe(self._on_transition)
+
+    def command(self, target: DoorState) -> None:
+        """Equivalent of opening/closing the cover: starts the transition and presses the button"""
+        if self.state.is_in_motion():
+            self.engine.stop()
+            self.door.press()
+        self.engine.begin_transition(target)
+        self.door.press()
+        self.state.clear_error()
+
+    def _on_transition(self, event: TransitionEvent) -> None:
+        if event.type is TransitionEventType.STARTED:
+            return
+
+        physical = self.door.jammed_at if event.error else self.door.arrived_at
+        if physical is not None and event.started is not None and physical >= event.started:
+            self.detections.append(event.timestamp - physical)
+
+
+def simulate_fleet(doors: int = 100, cycles: int = 10, travel_time: float = 15.0, faults: DoorFaults = DoorFaults(),
+                   debounce: DebounceSettings = DebounceSettings()) -> dict[str, Any]:
+    """
+    Opens and closes every door of a fleet the given number of times at once, reporting how long it took the engine
+    to notice each door arriving (or getting stuck) and how much faster than real time the simulation ran.
+    """
+    clock = VirtualClock()
+    fleet = [SimulatedInstallation(f"door_{index}", clock, travel_time, faults, debounce) for index in range(doors)]
+
+    started = time.perf_counter()
+    for _cycle in range(cycles):
+        for target in (DoorState.OPENED, DoorState.CLOSED):
+            for installation in fleet:
+                installation.command(target)
+            clock.advance()
+    elapsed = time.perf_counter() - started
+
+    detections = [detection for installation in fleet for detection in installation.detections]
+    return {
+        "doors": doors,
+        "transitions": doors * cycles * 2,
+        "detected": len(detections),
+        "detection_latency_mean": sum(detections) / len(detections) if detections else None,
+        "detection_latency_max": max(detections, default=None),
+        "issues": sum(len(installation.issues) for installation in fleet),
+        "simulated_time": clock.monotonic(),
+        "elapsed": elapsed,
+        "speedup": clock.monotonic() / elapsed if elapsed else math.inf,
+    }
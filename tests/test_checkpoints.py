@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.checkpoints import CHECKPOINT_MARGIN, CHECKPOINT_SLACK, CheckpointFusion
+from upsmart_garage.engine import DoorEngine
+from upsmart_garage.model import DoorState, GarageDoorState, StateController
+
+from simulator import VirtualClock
+
+TRAVEL_TIME = 20.0
+
+
+def test_position_is_fused_from_crossings() -> None:
+    fusion = CheckpointFusion([75, 25, 50])
+    fusion.start(True, 0.0, 100.0, TRAVEL_TIME)
+    assert fusion.velocity == 5.0
+    assert fusion.position(104.0) == 20.0
+    assert fusion.position(110.0) == 25.0  # not past the checkpoint which didn't report yet
+
+    fusion.cross(25.0, 110.0)  # slower than expected
+    assert fusion.velocity == 2.5
+    assert fusion.next_checkpoint() == 50.0
+    assert fusion.position(114.0) == 35.0
+
+    fusion.cross(50.0, 115.0)
+    fusion.cross(75.0, 120.0)
+    assert fusion.next_checkpoint() is None
+    assert fusion.position(130.0) == 100.0  # past the last checkpoint, only up to the end of travel
+
+
+def test_closing_door_passes_checkpoints_downwards() -> None:
+    fusion = CheckpointFusion([25, 50, 75])
+    fusion.start(False, 100.0, 0.0, TRAVEL_TIME)
+    assert fusion.next_checkpoint() == 75.0
+    assert fusion.position(2.0) == 90.0
+
+    fusion.cross(75.0, 5.0)
+    fusion.cross(25.0, 15.0)  # a sensor in between missed its crossing
+    assert fusion.velocity == 5.0
+    assert fusion.next_checkpoint() is None
+    assert fusion.position(100.0) == 0.0
+
+
+def test_deadline_of_next_checkpoint_follows_velocity() -> None:
+    fusion = CheckpointFusion([25, 50])
+    fusion.start(True, 0.0, 0.0, TRAVEL_TIME)
+    assert fusion.deadline() == pytest.approx(25 / 5 * CHECKPOINT_MARGIN + CHECKPOINT_SLACK)
+
+    fusion.cross(25.0, 10.0)
+    assert fusion.deadline() == pytest.approx(10 + 25 / 2.5 * CHECKPOINT_MARGIN + CHECKPOINT_SLACK)
+
+    fusion.cross(50.0, 20.0)
+    assert fusion.deadline() is None
+
+
+def test_unknown_start_is_tracked_from_first_crossing() -> None:
+    fusion = CheckpointFusion([25, 50])
+    fusion.start(True, None, 0.0, TRAVEL_TIME)
+    assert not fusion.is_tracking
+    assert fusion.position(1.0) is None
+    assert fusion.deadline() is None
+
+    fusion.cross(25.0, 3.0)
+    assert fusion.is_tracking
+    assert fusion.position(4.0) == 30.0
+
+    fusion.stop()
+    assert not fusion.is_tracking
+    assert fusion.next_checkpoint() is None
+
+
+def _engine(clock: VirtualClock, issues: list[str]) -> DoorEngine:
+    controller = StateController("switch.toggle", "binary_sensor.closed", TRAVEL_TIME, "binary_sensor.opened",
+                                 TRAVEL_TIME)
+    controller.add_checkpoint("binary_sensor.middle", 50.0)
+    engine = DoorEngine(GarageDoorState("door", controller, clock=clock), clock,
+                        on_issue=lambda key, _severity: issues.append(key))
+    engine.sensor_closed = True
+    engine.sensor_opened = False
+    engine.sync()
+    return engine
+
+
+def test_missed_checkpoint_aborts_transition_with_an_issue() -> None:
+    clock = VirtualClock()
+    issues: list[str] = []
+    engine = _engine(clock, issues)
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+    overdue = 50 / 5 * CHECKPOINT_MARGIN + CHECKPOINT_SLACK
+
+    clock.advance(overdue - 0.1)
+    assert engine.state.is_in_motion()
+    clock.advance(0.2)
+    assert not engine.state.is_in_motion()
+    assert (engine.state.last_state, engine.state.error) == (DoorState.PARTIALLY_OPEN, True)
+    assert issues == ["checkpoint_overdue"]
+
+
+def test_checkpoint_crossed_in_time_keeps_the_door_moving() -> None:
+    clock = VirtualClock()
+    issues: list[str] = []
+    engine = _engine(clock, issues)
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+    clock.advance(10)
+    engine.on_checkpoint(50.0)
+    assert engine.position() == 50
+
+    clock.advance(10)
+    engine.on_opened_sensor(True)
+    assert (engine.state.last_state, engine.state.error) == (DoorState.OPENED, False)
+    assert issues == []
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Any, Coroutine
+import asyncio
+
+import pytest
+
+from upsmart_garage.commands import CommandQueue, CommandSuperseded, DoorCommand, async_run_staggered
+
+
+class _Relay:
+    """Executes commands only once released, so the test decides what is running and what is queued"""
+
+    def __init__(self):
+        self.executed: list[DoorCommand] = []
+        self._released = asyncio.Event()
+
+    async def execute(self, command: DoorCommand) -> None:
+        self.executed.append(command)
+        await self._released.wait()
+
+    def release(self) -> None:
+        self._released.set()
+
+
+async def _settle() -> None:
+    """Lets submitted commands reach the queue, and the worker pick up the first of them"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _run(scenario: Coroutine[Any, Any, None]) -> None:
+    asyncio.run(asyncio.wait_for(scenario, 5))
+
+
+def test_identical_command_joins_the_running_one() -> None:
+    async def _scenario() -> None:
+        relay = _Relay()
+        queue = CommandQueue(relay.execute)
+        first = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        await _settle()
+        second = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        await _settle()
+        assert queue.depth == 1
+        assert queue.coalesced == 1
+
+        relay.release()
+        await asyncio.gather(first, second)
+        assert relay.executed == [DoorCommand.OPEN]
+        assert queue.executed == 1
+
+    _run(_scenario())
+
+
+def test_identical_command_joins_the_queued_tail() -> None:
+    async def _scenario() -> None:
+        relay = _Relay()
+        queue = CommandQueue(relay.execute)
+        running = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        await _settle()
+        submitted = [running] + [asyncio.create_task(queue.async_submit(DoorCommand.STOP)) for _ in range(2)]
+        await _settle()
+        assert queue.depth == 2
+        assert queue.coalesced == 1
+
+        relay.release()
+        await asyncio.gather(*submitted)
+        assert relay.executed == [DoorCommand.OPEN, DoorCommand.STOP]
+
+    _run(_scenario())
+
+
+def test_opposite_of_running_command_is_queued() -> None:
+    async def _scenario() -> None:
+        relay = _Relay()
+        queue = CommandQueue(relay.execute)
+        opening = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        await _settle()
+        closing = asyncio.create_task(queue.async_submit(DoorCommand.CLOSE))
+        await _settle()
+        assert queue.depth == 2
+        assert queue.coalesced == 0
+
+        relay.release()
+        await asyncio.gather(opening, closing)
+        assert relay.executed == [DoorCommand.OPEN, DoorCommand.CLOSE]
+
+    _run(_scenario())
+
+
+@pytest.mark.parametrize("queued, later", [(DoorCommand.OPEN, DoorCommand.CLOSE),
+                                           (DoorCommand.CLOSE, DoorCommand.OPEN)])
+def test_opposite_command_supersedes_the_queued_one(queued: DoorCommand, later: DoorCommand) -> None:
+    async def _scenario() -> None:
+        relay = _Relay()
+        queue = CommandQueue(relay.execute)
+        running = asyncio.create_task(queue.async_submit(DoorCommand.STOP))
+        await _settle()
+        superseded = asyncio.create_task(queue.async_submit(queued))
+        await _settle()
+        replacing = asyncio.create_task(queue.async_submit(later))
+        await _settle()
+        assert queue.depth == 2
+        assert queue.coalesced == 1
+        assert superseded.done()
+        with pytest.raises(CommandSuperseded):
+            superseded.result()
+
+        relay.release()
+        await asyncio.gather(running, replacing)
+        assert relay.executed == [DoorCommand.STOP, later]
+
+    _run(_scenario())
+
+
+def test_failure_is_raised_to_the_submitter_and_queue_moves_on() -> None:
+    async def _execute(command: DoorCommand) -> None:
+        if command is DoorCommand.OPEN:
+            raise RuntimeError("relay unavailable")
+
+    async def _scenario() -> None:
+        queue = CommandQueue(_execute)
+        failing = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        following = asyncio.create_task(queue.async_submit(DoorCommand.STOP))
+        with pytest.raises(RuntimeError):
+            await failing
+        await following
+        assert queue.executed == 2
+        assert queue.depth == 0
+
+    _run(_scenario())
+
+
+def test_worker_is_started_with_spawn() -> None:
+    async def _scenario() -> None:
+        relay = _Relay()
+        workers: list[asyncio.Task[None]] = []
+
+        def _spawn(run: Coroutine[Any, Any, None]) -> asyncio.Task[None]:
+            workers.append(asyncio.get_running_loop().create_task(run))
+            return workers[-1]
+
+        queue = CommandQueue(relay.execute, spawn=_spawn)
+        submitted = asyncio.create_task(queue.async_submit(DoorCommand.OPEN))
+        await _settle()
+        assert len(workers) == 1
+
+        # owner cancelling the worker (e.g. unloading the entry) cancels the command it was running
+        workers[0].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await submitted
+        assert queue.depth == 0
+
+    _run(_scenario())
+
+
+STAGGER = 0.05
+
+
+def test_staggered_jobs_start_apart() -> None:
+    async def _scenario() -> None:
+        loop = asyncio.get_running_loop()
+        started: dict[str, float] = {}
+
+        async def _job(key: str) -> None:
+            started[key] = loop.time()
+
+        results = await async_run_staggered({key: partial(_job, key) for key in "abc"}, 3, STAGGER)
+        assert results == {"a": None, "b": None, "c": None}
+        assert started["b"] - started["a"] >= STAGGER * 0.99
+        assert started["c"] - started["b"] >= STAGGER * 0.99
+
+    _run(_scenario())
+
+
+def test_staggered_jobs_respect_max_concurrent() -> None:
+    async def _scenario() -> None:
+        running = []
+        peak = 0
+
+        async def _job() -> None:
+            nonlocal peak
+            running.append(None)
+            peak = max(peak, len(running))
+            await asyncio.sleep(STAGGER)
+            running.pop()
+
+        await async_run_staggered({str(index): _job for index in range(5)}, 2, 0)
+        assert peak == 2
+
+    _run(_scenario())
+
+
+def test_staggered_job_failure_is_returned_without_stopping_others() -> None:
+    async def _fail() -> None:
+        raise RuntimeError("relay unavailable")
+
+    async def _succeed() -> None:
+        pass
+
+    async def _scenario() -> None:
+        results = await async_run_staggered({"failing": _fail, "working": _succeed}, 1, 0)
+        assert isinstance(results["failing"], RuntimeError)
+        assert results["working"] is None
+
+    _run(_scenario())
+
+
+def test_staggered_jobs_need_a_slot() -> None:
+    with pytest.raises(ValueError):
+        _run(async_run_staggered({}, 0, STAGGER))
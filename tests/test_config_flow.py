@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant
+
+from upsmart_garage.config_flow import ConfigFlow, InvalidDecoding
+
+
+def _data(**overrides: Any) -> dict[str, Any]:
+    return {"name": "Door", "state_toggle_relay": "switch.toggle", "closed_sensor": "sensor.closed",
+            "open_time": {"seconds": 20}, "close_time": {"seconds": 20}, **overrides}
+
+
+@pytest.mark.parametrize("sensor", ["closed", "opened"])
+async def test_threshold_and_on_values_are_exclusive(hass: HomeAssistant, sensor: str) -> None:
+    flow = ConfigFlow()
+    data = _data(**{f"{sensor}_sensor_on_values": ["open"], f"{sensor}_sensor_threshold": 0.5})
+    with pytest.raises(InvalidDecoding):
+        await flow.validate_input(hass, data)
+
+    flow.hass = hass
+    result = await flow.async_step_user(data)
+    assert result["errors"] == {"base": "invalid_decoding"}
+
+
+async def test_threshold_or_on_values_alone_are_valid(hass: HomeAssistant) -> None:
+    flow = ConfigFlow()
+    assert await flow.validate_input(hass, _data(closed_sensor_threshold=0.0))
+    assert await flow.validate_input(hass, _data(closed_sensor_on_values=["closed"]))
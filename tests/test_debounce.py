@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from upsmart_garage.debounce import DebounceSettings, SensorFilter
+
+from simulator import VirtualClock
+
+
+def _filter(clock: VirtualClock, edges: list[tuple[float, bool]], window: float = 0.0,
+            min_stable: float = 0.0) -> SensorFilter:
+    """Filter starting at False, recording accepted edges with their time"""
+    sensor = SensorFilter(lambda value: edges.append((clock.monotonic(), value)), clock, clock,
+                          DebounceSettings(window, min_stable))
+    sensor.reset(False)
+    return sensor
+
+
+def test_values_pass_right_away_when_disabled() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges)
+    for value in (True, False, False):
+        sensor.push(value)
+
+    assert edges == [(0.0, True), (0.0, False), (0.0, False)]
+    assert sensor.suppressed == 0
+
+
+def test_bouncing_input_is_suppressed() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges, min_stable=0.5)
+    for _ in range(5):  # reed contact chattering as the magnet passes by
+        sensor.push(True)
+        clock.advance(0.1)
+        sensor.push(False)
+        clock.advance(0.1)
+
+    clock.advance()
+    assert edges == []
+    assert sensor.value is False
+    assert sensor.suppressed == 10
+
+
+def test_stable_input_passes_once_min_stable_elapses() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges, min_stable=0.5)
+    sensor.push(True)
+    clock.advance(0.2)
+    sensor.push(True)  # repeated reading of the same value doesn't restart the wait
+    clock.advance(0.2)
+    assert edges == []
+
+    clock.advance(0.1)
+    assert edges == [(0.5, True)]
+    assert sensor.value is True
+
+
+def test_bounce_settles_into_the_final_value() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges, min_stable=0.5)
+    sensor.push(True)
+    clock.advance(0.1)
+    sensor.push(False)
+    clock.advance(0.1)
+    sensor.push(True)
+
+    clock.advance()
+    assert edges == [(0.7, True)]
+
+
+def test_edge_is_held_back_until_window_passes() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges, window=2.0)
+    sensor.push(True)
+    clock.advance(0.5)
+    sensor.push(False)
+    assert edges == [(0.0, True)]
+
+    clock.advance()
+    assert edges == [(0.0, True), (2.0, False)]
+
+    clock.advance(5.0)
+    sensor.push(True)  # long after the previous edge, so accepted right away
+    assert edges[-1] == (7.0, True)
+
+
+def test_reset_drops_pending_change() -> None:
+    clock = VirtualClock()
+    edges: list[tuple[float, bool]] = []
+    sensor = _filter(clock, edges, min_stable=0.5)
+    sensor.push(True)
+    sensor.reset(True)
+    clock.advance()
+    assert edges == []
+    assert sensor.value is True
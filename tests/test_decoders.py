@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from upsmart_garage.decoders import DecoderSettings, build_decoder, legacy_value_to_bool
+from upsmart_garage.decoders import _MAX_MEMOIZED, _memoized_decoder
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("on", True), ("ON", True), ("true", True), ("True", True), ("1", True), ("0.5", True), (2, True), (True, True),
+    ("off", False), ("false", False), ("0", False), ("-1", False), ("", False), ("unavailable", False), (0, False),
+    (False, False),
+])
+def test_legacy_decoding(value: Any, expected: bool) -> None:
+    assert legacy_value_to_bool(value) is expected
+    assert build_decoder()(value, {}) is expected
+    assert build_decoder(invert=True)(value, {}) is not expected
+
+
+def test_legacy_decoder_memoizes_distinct_values_up_to_the_limit() -> None:
+    calls: list[Any] = []
+
+    def _decode(value: Any) -> bool:
+        calls.append(value)
+        return legacy_value_to_bool(value)
+
+    decode = _memoized_decoder(_decode, False)
+    assert [decode("on"), decode("on"), decode("off"), decode("on")] == [True, True, False, True]
+    assert calls == ["on", "off"]
+
+    for value in range(_MAX_MEMOIZED * 2):
+        decode(value)
+    calls.clear()
+    assert decode(_MAX_MEMOIZED * 2 - 1) is True  # past the limit, values are decoded every time rather than cached
+    assert decode("on") is True
+    assert calls == [_MAX_MEMOIZED * 2 - 1]
+
+
+def test_memoized_decoder_inverts_cached_results() -> None:
+    decode = _memoized_decoder(legacy_value_to_bool, True)
+    assert [decode("on"), decode("on"), decode("off"), decode("off")] == [False, False, True, True]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10.5", True), (11, True), ("10", False), (3, False), ("-20", False), ("unavailable", False), (None, False),
+])
+def test_threshold_decoding(value: Any, expected: bool) -> None:
+    settings = DecoderSettings(threshold=10)
+    assert build_decoder(settings)(value, {}) is expected
+    assert build_decoder(settings, invert=True)(value, {}) is not expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("open", True), ("Detected", True), ("OPEN", True), ("closed", False), ("on", False), ("", False),
+    (True, True), (False, False),
+])
+def test_vocabulary_decoding(value: Any, expected: bool) -> None:
+    settings = DecoderSettings(on_values=("open", "DETECTED"))
+    assert build_decoder(settings)(value, {}) is expected
+    assert build_decoder(settings, invert=True)(value, {}) is not expected
+
+
+def test_threshold_takes_precedence_over_vocabulary() -> None:
+    decode = build_decoder(DecoderSettings(on_values=("open",), threshold=0))
+    assert decode("5", {}) is True
+    assert decode("open", {}) is False
+
+
+@pytest.mark.parametrize("settings", [
+    DecoderSettings(attribute="contact"),
+    DecoderSettings(on_values=("open",), attribute="contact"),
+    DecoderSettings(threshold=0.5, attribute="contact"),
+])
+def test_attribute_decoding_ignores_the_state(settings: DecoderSettings) -> None:
+    decode = build_decoder(settings)
+    tripped = {"contact": "open" if settings.on_values else 1}
+    assert decode("off", tripped) is True
+    assert decode("on", {"contact": 0}) is False
+    assert build_decoder(settings, invert=True)("off", tripped) is False
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_missing_attribute_is_not_tripped(invert: bool) -> None:
+    decode = build_decoder(DecoderSettings(attribute="contact"), invert)
+    assert decode("on", {}) is invert
+    assert decode("on", {"contact": None}) is invert
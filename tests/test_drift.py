@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from upsmart_garage.engine import DoorEngine
+from upsmart_garage.issues import IssueTracker
+from upsmart_garage.model import DoorState, GarageDoorState, StateController
+
+from simulator import VirtualClock
+
+CLOSE_TIME = 20.0
+
+
+class _Door:
+    def __init__(self):
+        self.clock = VirtualClock()
+        self.issues: dict[str, int] = {}  # as in the issue registry
+        self.tracker = IssueTracker(self.clock, self._report, self.issues.pop)
+        controller = StateController("switch.toggle", "binary_sensor.closed", CLOSE_TIME, "binary_sensor.opened", 20)
+        self.state = GarageDoorState("door", controller, clock=self.clock)
+        self.engine = DoorEngine(self.state, self.clock, on_issue=self.tracker.occurred,
+                                 on_resolve=self.tracker.resolve)
+        self.engine.sensor_closed = True
+        self.engine.sensor_opened = False
+        self.engine.sync()
+
+    def _report(self, key: str, _severity: str, occurrences: int) -> None:
+        self.issues[key] = occurrences
+
+    def cycle(self, opening_time: float) -> None:
+        self.engine.begin_transition(DoorState.OPENED)
+        self.engine.on_closed_sensor(False)
+        self.clock.advance(opening_time)
+        self.engine.on_opened_sensor(True)
+        assert self.state.last_state is DoorState.OPENED
+
+        self.engine.begin_transition(DoorState.CLOSED)
+        self.engine.on_opened_sensor(False)
+        self.clock.advance(CLOSE_TIME)
+        self.engine.on_closed_sensor(True)
+        assert self.state.last_state is DoorState.CLOSED
+        self.tracker.resolve()  # as after every error-free transition
+
+
+def _cycles_until(door: _Door, opening_time: float, drifting: bool, slowdown: float = 0.0, limit: int = 500) -> float:
+    """Cycles the door, each time opening slower by slowdown seconds; returns the last opening time"""
+    for _ in range(limit):
+        door.cycle(opening_time)
+        if door.state.drift[DoorState.OPENED].drifting is drifting:
+            return opening_time
+        opening_time += slowdown
+    raise AssertionError(f"Drifting didn't become {drifting} in {limit} cycles")
+
+
+def test_drift_issue_is_resolved_once_steady_and_raised_again_on_new_drift() -> None:
+    door = _Door()
+    for _ in range(20):
+        door.cycle(18.0)
+    assert not door.issues
+
+    # wear slows the door down gradually
+    opening_time = _cycles_until(door, 18.0, drifting=True, slowdown=0.1)
+    assert door.issues == {"slower_opening": 1}
+
+    # the door settles on the slower normal; the issue stays open until the detector agrees
+    door.cycle(opening_time)
+    assert door.issues == {"slower_opening": 1}
+    _cycles_until(door, opening_time, drifting=False)
+    assert not door.issues
+    assert not door.tracker.active
+
+    _cycles_until(door, opening_time, drifting=True, slowdown=0.1)
+    assert door.issues == {"slower_opening": 1}
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.engine import DoorEngine
+from upsmart_garage.model import DoorState, GarageDoorState, StateController, TransitionEventType
+
+from simulator import VirtualClock
+
+TRAVEL_TIME = 20.0
+
+
+def _engine(clock: VirtualClock) -> DoorEngine:
+    controller = StateController("switch.toggle", "binary_sensor.closed", TRAVEL_TIME, "binary_sensor.opened",
+                                 TRAVEL_TIME)
+    engine = DoorEngine(GarageDoorState("door", controller, clock=clock), clock)
+    engine.sensor_closed = True
+    engine.sensor_opened = False
+    engine.sync()
+    return engine
+
+
+def _move(engine: DoorEngine, clock: VirtualClock, target: DoorState, duration: float) -> None:
+    """Moves the door to target, the sensor there tripping after duration seconds"""
+    opening = target is DoorState.OPENED
+    engine.begin_transition(target)
+    (engine.on_closed_sensor if opening else engine.on_opened_sensor)(False)
+    clock.advance(duration)
+    (engine.on_opened_sensor if opening else engine.on_closed_sensor)(True)
+
+
+def test_deadline_never_drops_below_configured_grace() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    for _ in range(30):
+        _move(engine, clock, DoorState.OPENED, 18.0)
+        _move(engine, clock, DoorState.CLOSED, 18.0)
+
+    engine.begin_transition(DoorState.OPENED)
+    assert engine.transition_deadline() == TRAVEL_TIME * DoorEngine.transition_grace_multiplier
+    engine.stop()
+
+
+def test_gradually_slowing_door_is_not_aborted() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    state = engine.state
+    errors = []  # the door being considered stuck, even if it arrives later on
+    state.subscribe(lambda event: event.error and errors.append(event))
+    for _ in range(30):  # the learned deadline ends up just over the usual 18s
+        _move(engine, clock, DoorState.OPENED, 18.0)
+        _move(engine, clock, DoorState.CLOSED, 18.0)
+
+    # wear sets in: slower, yet within the configured time and its grace
+    for duration in (19.8, 20.5, 21.5):
+        for _ in range(5):
+            _move(engine, clock, DoorState.OPENED, duration)
+            assert state.last_state is DoorState.OPENED
+            assert not errors, f"considered stuck at {duration}s"
+            _move(engine, clock, DoorState.CLOSED, 18.0)
+
+
+def _restored(last: DoorState | None, target: DoorState | None, closed: bool | None,
+              opened: bool | None) -> tuple[DoorEngine, VirtualClock]:
+    """Engine of a door restored from before a restart, with sensors reading the given values (None when absent)"""
+    before = VirtualClock()
+    controller = StateController("switch.toggle", "binary_sensor.closed", TRAVEL_TIME, "binary_sensor.opened",
+                                 TRAVEL_TIME)
+    saved = GarageDoorState("door", controller, last, before)
+    if target is not None:
+        saved.transition(target)
+        before.advance(5)
+
+    clock = VirtualClock()
+    clock.advance(before.monotonic())  # restarted right away, so wall-clock times match
+    engine = DoorEngine(GarageDoorState("door", controller, clock=clock), clock)
+    engine.state.restore(saved.snapshot())
+    engine.sensor_closed = closed
+    engine.sensor_opened = opened
+    engine.sync()
+    return engine, clock
+
+
+@pytest.mark.parametrize("last, closed, opened, expected", [
+    (DoorState.CLOSED, False, True, DoorState.OPENED),
+    (DoorState.OPENED, True, False, DoorState.CLOSED),
+    (DoorState.CLOSED, False, False, DoorState.PARTIALLY_OPEN),  # away from both ends
+    (DoorState.CLOSED, False, None, DoorState.OPENED),  # away from the only sensor
+    (DoorState.OPENED, None, False, DoorState.CLOSED),
+    (DoorState.OPENED, False, None, DoorState.OPENED),  # nothing contradicts it
+    (None, False, False, None),
+])
+def test_sensors_override_restored_state(last: DoorState | None, closed: bool | None, opened: bool | None,
+                                         expected: DoorState | None) -> None:
+    engine, _clock = _restored(last, None, closed, opened)
+    assert engine.state.last_state is expected
+    assert not engine.state.is_in_motion()
+
+
+def test_conflicting_sensors_keep_restored_state() -> None:
+    engine, _clock = _restored(DoorState.CLOSED, None, True, True)
+    assert engine.state.last_state is DoorState.CLOSED
+
+
+@pytest.mark.parametrize("closed, opened, expected", [
+    (False, True, DoorState.OPENED),  # arrived while HA was down
+    (True, False, DoorState.CLOSED),  # stopped and sent back while HA was down
+])
+def test_restored_transition_ends_where_sensors_are(closed: bool, opened: bool, expected: DoorState) -> None:
+    engine, _clock = _restored(DoorState.CLOSED, DoorState.OPENED, closed, opened)
+    assert engine.state.last_state is expected
+    assert not engine.state.is_in_motion()
+
+
+def test_restored_transition_gets_the_time_left() -> None:
+    engine, clock = _restored(DoorState.CLOSED, DoorState.OPENED, False, False)
+    assert engine.state.target_state is DoorState.OPENED
+    remaining = TRAVEL_TIME * DoorEngine.transition_grace_multiplier - 5
+
+    clock.advance(remaining - 0.1)
+    assert engine.state.is_in_motion()
+    clock.advance(0.2)
+    assert not engine.state.is_in_motion()
+    assert engine.state.error
+
+
+def _recorded(engine: DoorEngine) -> list[tuple[TransitionEventType, str, DoorState | None]]:
+    """Subscribes to the door; returns list receiving type, source and new state of every event"""
+    events = []
+    engine.state.subscribe(lambda event: events.append((event.type, event.source, event.new_state)))
+    return events
+
+
+def test_cycle_driven_by_sensor_events() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    events = _recorded(engine)
+    assert engine.begin_transition(DoorState.OPENED) == TRAVEL_TIME * DoorEngine.transition_grace_multiplier
+
+    clock.advance(0.5)
+    engine.on_closed_sensor(False)
+    assert engine.state.is_in_motion()
+    clock.advance(9.5)
+    assert engine.position() == 50
+
+    clock.advance(8)
+    engine.on_opened_sensor(True)
+    clock.advance()  # the deadline timer is cancelled
+    assert events == [(TransitionEventType.STARTED, "command", DoorState.CLOSED),
+                      (TransitionEventType.COMPLETED, "opened_sensor", DoorState.OPENED)]
+    assert engine.state.durations[DoorState.OPENED].count == 1
+    assert engine.position() == 100
+
+
+def test_external_toggle_press_starts_transition() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    events = _recorded(engine)
+    assert engine.on_toggle(True)
+    assert not engine.on_toggle(False)  # relay released
+
+    clock.advance(TRAVEL_TIME)
+    engine.on_closed_sensor(False)
+    engine.on_opened_sensor(True)
+    assert [(event_type, source) for event_type, source, _state in events] == \
+           [(TransitionEventType.STARTED, "toggle"), (TransitionEventType.COMPLETED, "opened_sensor")]
+
+
+def test_stuck_door_errors_at_deadline() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    events = _recorded(engine)
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+
+    clock.advance()
+    assert clock.monotonic() == TRAVEL_TIME * DoorEngine.transition_grace_multiplier
+    assert events[-1] == (TransitionEventType.ERROR, "timer", DoorState.PARTIALLY_OPEN)
+    assert engine.state.error
+    assert engine.position() == 50
+
+
+def test_door_without_sensor_at_target_completes_on_timer() -> None:
+    clock = VirtualClock()
+    controller = StateController("switch.toggle", "binary_sensor.closed", TRAVEL_TIME, None, TRAVEL_TIME)
+    engine = DoorEngine(GarageDoorState("door", controller, DoorState.CLOSED, clock), clock)
+    engine.sensor_closed = True
+    events = _recorded(engine)
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+
+    clock.advance()
+    assert events[-1] == (TransitionEventType.COMPLETED, "timer", DoorState.OPENED)
+    assert not engine.state.error
+    assert engine.state.durations[DoorState.OPENED].count == 0  # not confirmed by a sensor
+
+
+def test_stopped_door_stays_partially_open() -> None:
+    clock = VirtualClock()
+    engine = _engine(clock)
+    events = _recorded(engine)
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+    clock.advance(5)
+    assert engine.stop()
+    assert not engine.stop()
+
+    clock.advance()
+    assert events[-1] == (TransitionEventType.ABORTED, "command", DoorState.PARTIALLY_OPEN)
+    assert not engine.state.error
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.hourly import HOUR, HourlyAggregator, hour_start
+from upsmart_garage.model import DoorState, TransitionEventType
+from upsmart_garage.transition_log import ERROR_BLOCKED, ERROR_NONE, LogRecord
+
+START = 1_700_000_000 - 1_700_000_000 % HOUR
+
+
+def _record(timestamp: float, direction: DoorState, duration: float | None = None,
+            outcome: TransitionEventType = TransitionEventType.COMPLETED) -> LogRecord:
+    return LogRecord(timestamp, direction, duration, outcome,
+                     ERROR_BLOCKED if outcome is TransitionEventType.ERROR else ERROR_NONE)
+
+
+def test_hour_start() -> None:
+    assert hour_start(START) == START
+    assert hour_start(START + HOUR - 0.001) == START
+    assert hour_start(START + HOUR) == START + HOUR
+
+
+def test_transitions_are_bucketed_per_hour() -> None:
+    aggregator = HourlyAggregator()
+    aggregator.add(_record(START + 10, DoorState.OPENED, 18.0))
+    aggregator.add(_record(START + 600, DoorState.CLOSED, 20.0))
+    aggregator.add(_record(START + 1200, DoorState.OPENED, 22.0))
+    aggregator.add(_record(START + 1800, DoorState.OPENED))  # not measured, e.g. completed by the timer
+    aggregator.add(_record(START + 2400, DoorState.CLOSED, outcome=TransitionEventType.ERROR))
+    aggregator.add(_record(START + 3000, DoorState.CLOSED, outcome=TransitionEventType.ABORTED))
+    aggregator.add(_record(START + HOUR, DoorState.CLOSED, 19.0))  # first moment of the next hour
+
+    first, second = aggregator.pop_finished(START + 2 * HOUR)
+    assert (first.start, first.cycles, first.jams) == (START, 4, 1)
+    assert (first.opening.count, first.opening.mean, first.opening.minimum, first.opening.maximum) == \
+           (2, 20.0, 18.0, 22.0)
+    assert (first.closing.count, first.closing.mean) == (1, 20.0)
+    assert (second.start, second.cycles, second.jams, second.closing.count) == (START + HOUR, 1, 0, 1)
+    assert second.opening.count == 0
+    assert second.opening.mean is None
+
+
+def test_only_finished_hours_are_popped() -> None:
+    aggregator = HourlyAggregator()
+    for hour in (2, 0, 1):  # added out of order, e.g. replayed after live ones
+        aggregator.add(_record(START + hour * HOUR + 5, DoorState.OPENED, 20.0))
+
+    assert aggregator.pop_finished(START + HOUR - 1) == []
+    assert [hour.start for hour in aggregator.pop_finished(START + 2 * HOUR)] == [START, START + HOUR]
+    assert aggregator.pop_finished(START + 2 * HOUR) == []
+
+    aggregator.add(_record(START + 2 * HOUR + 10, DoorState.CLOSED, 20.0))
+    [hour] = aggregator.pop_finished(START + 3 * HOUR)
+    assert (hour.start, hour.cycles) == (START + 2 * HOUR, 2)
+
+
+@pytest.mark.parametrize("outcome", [TransitionEventType.COMPLETED, TransitionEventType.ABORTED,
+                                     TransitionEventType.ERROR])
+def test_measured_duration_is_kept_whatever_the_outcome(outcome: TransitionEventType) -> None:
+    aggregator = HourlyAggregator()
+    aggregator.add(_record(START, DoorState.CLOSED, 21.0, outcome))
+    [hour] = aggregator.pop_finished(START + HOUR)
+    assert hour.closing.count == 1
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from upsmart_garage.issues import IssueTracker
+from upsmart_garage.transitions import ISSUE_CRITICAL, ISSUE_ERROR, ISSUE_WARNING
+
+from simulator import VirtualClock
+
+INTERVAL = 300.0
+
+
+class _Registry:
+    """Records reports & clears the tracker makes, in place of the HA issue registry"""
+
+    def __init__(self):
+        self.reports: list[tuple[str, str, int]] = []
+        self.cleared: list[str] = []
+
+    def tracker(self, clock: VirtualClock) -> IssueTracker:
+        return IssueTracker(clock, lambda *report: self.reports.append(report), self.cleared.append, INTERVAL)
+
+
+def test_repeated_occurrences_within_interval_are_suppressed() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    for _ in range(10):
+        tracker.occurred("stuck", ISSUE_WARNING)
+        clock.advance(10)
+
+    assert registry.reports == [("stuck", ISSUE_WARNING, 1)]
+    assert tracker.suppressed == 9
+    assert tracker.active == {"stuck": 10}
+
+
+def test_issue_is_updated_with_the_count_once_interval_passes() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    clock.advance(INTERVAL - 1)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    clock.advance(1)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    tracker.occurred("stuck", ISSUE_WARNING)
+
+    assert registry.reports == [("stuck", ISSUE_WARNING, 1), ("stuck", ISSUE_WARNING, 3)]
+    assert tracker.suppressed == 2
+
+
+def test_escalation_is_reported_right_away() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    tracker.occurred("stuck", ISSUE_ERROR)
+    tracker.occurred("stuck", ISSUE_WARNING)  # lower severity doesn't downgrade the issue
+    tracker.occurred("stuck", ISSUE_CRITICAL)
+
+    assert registry.reports == [("stuck", ISSUE_WARNING, 1), ("stuck", ISSUE_ERROR, 2), ("stuck", ISSUE_CRITICAL, 4)]
+    assert tracker.suppressed == 1
+
+    clock.advance(INTERVAL)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    assert registry.reports[-1] == ("stuck", ISSUE_CRITICAL, 5)
+
+
+def test_issues_are_tracked_separately() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    tracker.occurred("open_and_closed", ISSUE_CRITICAL)
+    tracker.occurred("stuck", ISSUE_WARNING)
+
+    assert registry.reports == [("stuck", ISSUE_WARNING, 1), ("open_and_closed", ISSUE_CRITICAL, 1)]
+
+
+def test_resolving_keeps_persistent_issues() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    tracker.occurred("stuck", ISSUE_WARNING)
+    tracker.occurred("slower_opening", ISSUE_WARNING)
+    tracker.resolve()
+    assert registry.cleared == ["stuck"]
+    assert tracker.active == {"slower_opening": 1}
+
+    tracker.resolve("slower_opening")
+    tracker.resolve("slower_opening")  # no longer active
+    assert registry.cleared == ["stuck", "slower_opening"]
+
+    tracker.occurred("stuck", ISSUE_WARNING)  # reported anew after being resolved
+    assert registry.reports[-1] == ("stuck", ISSUE_WARNING, 1)
+
+
+def test_adopted_issue_is_updated_on_next_occurrence_and_resolved() -> None:
+    clock = VirtualClock()
+    registry = _Registry()
+    tracker = registry.tracker(clock)
+    tracker.adopt("stuck")
+    tracker.occurred("stuck", ISSUE_WARNING)
+    assert registry.reports == [("stuck", ISSUE_WARNING, 2)]
+
+    tracker.resolve()
+    assert registry.cleared == ["stuck"]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+import asyncio
+import logging
+import math
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from upsmart_garage import long_term_statistics
+from upsmart_garage.hourly import HOUR
+from upsmart_garage.long_term_statistics import DoorStatistics
+from upsmart_garage.model import DoorState, GarageDoorState, StateController, TransitionEventType
+from upsmart_garage.transition_log import ERROR_NONE, LogRecord, TransitionLog
+
+from simulator import VirtualClock
+
+START = 1_700_000_000 - 1_700_000_000 % HOUR
+PAGE = 4
+
+
+class _History:
+    """Reads the log directly, in place of DoorHistory and its executor"""
+
+    def __init__(self, log: TransitionLog):
+        self.log = log
+        self.reads = 0
+
+    async def async_read(self, since: float | None, until: float | None, limit: int) -> list[LogRecord]:
+        self.reads += 1
+        return self.log.read(since, until, limit)
+
+
+def _replay(tmp_path: Path, timestamps: list[float]) -> tuple[int, int, int]:
+    """Replays a log of transitions finished at the given offsets from START; returns replayed, cycles and reads"""
+    log = TransitionLog(str(tmp_path / "door.log"))
+    for timestamp in timestamps:
+        log.append(LogRecord(START + timestamp, DoorState.OPENED, 20.0, TransitionEventType.COMPLETED, ERROR_NONE))
+    log.write(log.take())
+
+    history = _History(log)
+    controller = StateController("switch.toggle", "binary_sensor.closed", 20, None, 20)
+    statistics = DoorStatistics(None, GarageDoorState("door", controller, clock=VirtualClock()), history, "Door")
+    statistics._watching_since = START + 10 * HOUR
+    replayed = asyncio.run(statistics._async_replay_log(START))
+    cycles = sum(hour.cycles for hour in statistics._aggregator.pop_finished(math.inf))
+    return replayed, cycles, history.reads
+
+
+@pytest.fixture(autouse=True)
+def _small_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(long_term_statistics, "MAX_HISTORY_LIMIT", PAGE)
+
+
+def test_replay_pages_through_the_whole_log(tmp_path: Path) -> None:
+    # every page starts with the last record of the previous one, as there could be more sharing its timestamp
+    assert _replay(tmp_path, [index * 60 for index in range(3 * PAGE + 1)]) == (3 * PAGE + 1, 3 * PAGE + 1, 5)
+
+
+def test_replay_doesnt_count_records_at_page_boundary_twice(tmp_path: Path) -> None:
+    # the first page ends within the 3 records at 120s, so the second one starts with them again
+    assert _replay(tmp_path, [0, 60, 120, 120, 120, 180, 240]) == (7, 7, 3)
+
+
+def test_replay_stops_at_page_of_a_single_timestamp(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.WARNING):
+        replayed, cycles, _reads = _replay(tmp_path, [0] + [60] * (PAGE + 1) + [120])
+
+    assert replayed == cycles == PAGE + 1
+    assert "statistics may miss" in caplog.text
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from upsmart_garage.metrics import DoorMetrics
+
+from simulator import VirtualClock
+
+
+def test_write_is_timed_from_the_event_causing_it() -> None:
+    clock = VirtualClock()
+    metrics = DoorMetrics(clock)
+    metrics.event_received()
+    clock.advance(0.2)
+    metrics.update_requested()
+    metrics.event_handled()
+    clock.advance(0.1)
+    metrics.state_written()
+    assert metrics.sensor_to_write.count == 1
+    assert metrics.sensor_to_write.quantile(1.0) > 0.25
+
+
+def test_dropped_event_is_not_measured_against_a_later_write() -> None:
+    clock = VirtualClock()
+    metrics = DoorMetrics(clock)
+    metrics.event_received()  # e.g. echo of our own relay pulse
+    metrics.event_handled()
+    clock.advance(5)
+    metrics.update_requested()  # e.g. transition timer, not caused by any event
+    metrics.state_written()
+    assert metrics.events == 1
+    assert metrics.sensor_to_write.count == 0
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from upsmart_garage.model import DoorState, GarageDoorState, StateController, TransitionEventType
+
+from simulator import VirtualClock
+
+
+class _RestartedClock(VirtualClock):
+    """Clock of a restarted process: monotonic time starts over, while the wall-clock time went on"""
+    __slots__ = ("_downtime",)
+
+    def __init__(self, downtime: float):
+        super().__init__()
+        self._downtime = downtime
+
+    def time(self) -> float:
+        return super().time() + self._downtime
+
+
+def _state(clock: VirtualClock, current: DoorState | None = None) -> GarageDoorState:
+    controller = StateController("switch.toggle", "binary_sensor.closed", 20, "binary_sensor.opened", 20)
+    return GarageDoorState("door", controller, current, clock)
+
+
+@pytest.mark.parametrize("last, error", [(None, False), (DoorState.CLOSED, False), (DoorState.OPENED, False),
+                                         (DoorState.PARTIALLY_OPEN, True)])
+def test_snapshot_round_trip_at_rest(last: DoorState | None, error: bool) -> None:
+    state = _state(VirtualClock(), last)
+    state.error = error
+    snapshot = state.snapshot()
+    assert len(snapshot) == struct.calcsize("<BbbBd")
+
+    restored = _state(_RestartedClock(3600))
+    restored.restore(snapshot)
+    assert (restored.last_state, restored.target_state, restored.transition_triggered, restored.error) == \
+           (last, None, None, error)
+
+
+def test_snapshot_round_trip_in_motion_keeps_elapsed_time_across_restart() -> None:
+    clock = VirtualClock()
+    clock.advance(100)
+    state = _state(clock, DoorState.CLOSED)
+    state.transition(DoorState.OPENED)
+    clock.advance(5)
+    snapshot = state.snapshot()
+
+    restarted = _RestartedClock(clock.monotonic() + 3)  # HA was down for 3s
+    restored = _state(restarted)
+    events = []
+    restored.subscribe(events.append)
+    restored.restore(snapshot)
+    assert (restored.last_state, restored.target_state) == (DoorState.CLOSED, DoorState.OPENED)
+    assert restarted.monotonic() - restored.transition_triggered == pytest.approx(8)
+    assert [event.type for event in events] == [TransitionEventType.SYNCED]
+
+
+def test_truncated_snapshot_is_rejected() -> None:
+    state = _state(VirtualClock(), DoorState.OPENED)
+    snapshot = _state(VirtualClock(), DoorState.CLOSED).snapshot()
+    with pytest.raises(struct.error):
+        state.restore(snapshot[:-1])
+    assert state.last_state is DoorState.OPENED
+
+
+def test_snapshot_of_another_version_is_rejected() -> None:
+    state = _state(VirtualClock(), DoorState.OPENED)
+    snapshot = _state(VirtualClock(), DoorState.CLOSED).snapshot()
+    with pytest.raises(ValueError):
+        state.restore(bytes([snapshot[0] + 1]) + snapshot[1:])
+    assert state.last_state is DoorState.OPENED
+
+
+def test_every_subscriber_receives_every_event() -> None:
+    state = _state(VirtualClock(), DoorState.CLOSED)
+    first, second = [], []
+    state.subscribe(first.append)
+    state.subscribe(second.append)
+
+    state.transition(DoorState.OPENED)
+    state.complete_transition()
+    assert [event.type for event in first] == [TransitionEventType.STARTED, TransitionEventType.COMPLETED]
+    assert second == first
+    assert (first[-1].old_state, first[-1].new_state, first[-1].target) == \
+           (DoorState.CLOSED, DoorState.OPENED, DoorState.OPENED)
+
+
+def test_unsubscribed_listener_receives_nothing_more() -> None:
+    state = _state(VirtualClock(), DoorState.CLOSED)
+    removed, kept = [], []
+    unsubscribe = state.subscribe(removed.append)
+    state.subscribe(kept.append)
+
+    state.transition(DoorState.OPENED)
+    unsubscribe()
+    state.complete_transition()
+    assert len(removed) == 1
+    assert len(kept) == 2
+
+
+def test_listener_can_unsubscribe_while_an_event_is_delivered() -> None:
+    state = _state(VirtualClock(), DoorState.CLOSED)
+    received = []
+    unsubscribe = state.subscribe(lambda event: (received.append(event), unsubscribe()))
+    later = []
+    state.subscribe(later.append)
+
+    state.transition(DoorState.OPENED)
+    state.complete_transition()
+    assert len(received) == 1
+    assert len(later) == 2  # not skipped by the other one unsubscribing mid-delivery
+
+
+def test_events_are_traced_without_subscribers() -> None:
+    state = _state(VirtualClock(), DoorState.CLOSED)
+    state.transition(DoorState.OPENED)
+    state.complete_transition()
+    assert len(state.trace.dump()) == 2
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from upsmart_garage.engine import DoorEngine
+from upsmart_garage.model import DoorState, GarageDoorState, StateController
+from upsmart_garage.power import IDLE_CURRENT, IDLE_POWER, PowerAnalyzer, PowerSignal, motor_reading
+
+from simulator import VirtualClock
+
+SAMPLE_INTERVAL = 0.1
+RUNNING_AMPS = [0.0, 0.0, 4.0, 3.5, 2.2] + [2.0, 2.1, 1.9, 2.0] * 20
+
+
+def _feed(analyzer: PowerAnalyzer, levels: list[float], idle: float, start: float = 0.0) -> PowerSignal | None:
+    analyzer.start(start)
+    now = start
+    for level in levels:
+        now += SAMPLE_INTERVAL
+        signal = analyzer.add(now, level, idle)
+        if signal is not None:
+            return signal
+    return None
+
+
+def test_units_are_normalized() -> None:
+    assert motor_reading(0.15, "kW") == (150.0, IDLE_POWER)
+    assert motor_reading(2000, "mA") == (2.0, IDLE_CURRENT)
+    assert motor_reading(2.0, None, "current") == (2.0, IDLE_CURRENT)
+    assert motor_reading(2.0, None) == (2.0, IDLE_POWER)
+    assert motor_reading(2.0, "V") is None
+
+
+def test_running_current_is_not_idle() -> None:
+    # a 2A motor would be under the idle power level, if the reading was taken for watts
+    assert _feed(PowerAnalyzer(), RUNNING_AMPS, IDLE_CURRENT) is None
+
+
+def test_current_drop_stops_and_spike_stalls() -> None:
+    assert _feed(PowerAnalyzer(), RUNNING_AMPS + [0.01], IDLE_CURRENT) is PowerSignal.STOPPED
+    assert _feed(PowerAnalyzer(), RUNNING_AMPS + [3.5] * 10, IDLE_CURRENT) is PowerSignal.STALLED
+
+
+def test_noise_spike_is_not_a_stall() -> None:
+    assert _feed(PowerAnalyzer(), RUNNING_AMPS + [3.5, 2.0] * 10, IDLE_CURRENT) is None
+
+
+def test_engine_completes_single_sensor_door_from_current_sensor() -> None:
+    clock = VirtualClock()
+    controller = StateController("switch.toggle", "binary_sensor.closed", 20, None, 20)
+    controller.monitor_power("sensor.motor_current")
+    state = GarageDoorState("door", controller, clock=clock)
+    engine = DoorEngine(state, clock)
+    engine.sensor_closed = True
+    engine.sync()
+
+    engine.begin_transition(DoorState.OPENED)
+    engine.on_closed_sensor(False)
+    for milliamps in [0, 0, 4000, 3500, 2200] + [2000, 2100, 1900, 2000] * 20:
+        clock.advance(SAMPLE_INTERVAL)
+        engine.on_power(*motor_reading(milliamps, "mA"))
+    assert state.target_state is DoorState.OPENED
+
+    clock.advance(SAMPLE_INTERVAL)
+    engine.on_power(*motor_reading(10, "mA"))
+    assert state.last_state is DoorState.OPENED
+    assert state.target_state is None
+    assert not state.error
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant, State
+
+from upsmart_garage.router import async_get_router
+
+
+class _Handler:
+    def __init__(self):
+        self.states: list[str] = []
+
+    def __call__(self, state: State) -> None:
+        self.states.append(state.state)
+
+
+async def test_changes_are_routed_by_entity_id(hass: HomeAssistant) -> None:
+    router = async_get_router(hass)
+    assert async_get_router(hass) is router
+    closed, opened, shared = _Handler(), _Handler(), _Handler()
+    router.async_register("binary_sensor.closed", closed)
+    router.async_register("binary_sensor.opened", opened)
+    router.async_register("binary_sensor.closed", shared)
+    router.async_register("binary_sensor.opened", shared)
+
+    hass.states.async_set("binary_sensor.closed", "on")
+    hass.states.async_set("binary_sensor.opened", "off")
+    hass.states.async_set("binary_sensor.unrelated", "on")
+    await hass.async_block_till_done()
+    assert (closed.states, opened.states, shared.states) == (["on"], ["off"], ["on", "off"])
+
+
+async def test_unchanged_values_are_dropped(hass: HomeAssistant) -> None:
+    router = async_get_router(hass)
+    state, attribute = _Handler(), _Handler()
+    router.async_register("sensor.door", state)
+    router.async_register("sensor.door", attribute, "contact")
+
+    hass.states.async_set("sensor.door", "on", {"contact": 1})
+    hass.states.async_set("sensor.door", "on", {"contact": 0})  # only the attribute changed
+    hass.states.async_set("sensor.door", "off", {"contact": 0})  # only the state changed
+    await hass.async_block_till_done()
+    assert state.states == ["on", "off"]
+    assert attribute.states == ["on", "on"]
+
+
+async def test_removed_route_stops_receiving_changes(hass: HomeAssistant) -> None:
+    router = async_get_router(hass)
+    removed, kept = _Handler(), _Handler()
+    remove = router.async_register("binary_sensor.closed", removed)
+    router.async_register("binary_sensor.closed", kept)
+
+    remove()
+    hass.states.async_set("binary_sensor.closed", "on")
+    await hass.async_block_till_done()
+    assert (removed.states, kept.states) == ([], ["on"])
+
+
+async def test_entity_is_untracked_with_its_last_route(hass: HomeAssistant) -> None:
+    router = async_get_router(hass)
+    handler = _Handler()
+    router.async_register("binary_sensor.closed", handler)()
+    assert router._trackers == {}
+
+    hass.states.async_set("binary_sensor.closed", "on")
+    await hass.async_block_till_done()
+    assert handler.states == []
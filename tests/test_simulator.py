@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.debounce import DebounceSettings
+from upsmart_garage.engine import DoorEngine
+
+from simulator import DoorFaults, simulate_fleet
+
+DOORS = 50
+TRAVEL_TIME = 15.0
+
+
+def test_fleet_arrivals_are_detected_right_away() -> None:
+    report = simulate_fleet(DOORS, cycles=3, travel_time=TRAVEL_TIME)
+    assert report["detected"] == report["transitions"] == DOORS * 3 * 2
+    assert report["detection_latency_max"] == 0
+    assert report["issues"] == 0
+    assert report["speedup"] > 10
+
+
+def test_debounced_contact_bounce_does_not_delay_detection() -> None:
+    debounce = DebounceSettings(window=0.2)
+    report = simulate_fleet(DOORS, cycles=3, travel_time=TRAVEL_TIME, faults=DoorFaults(bounce=3), debounce=debounce)
+    assert report["detected"] == report["transitions"]
+    assert report["detection_latency_max"] <= debounce.window
+    assert report["issues"] == 0
+
+
+def test_jam_is_detected_by_the_transition_deadline() -> None:
+    report = simulate_fleet(DOORS, cycles=1, travel_time=TRAVEL_TIME, faults=DoorFaults(jam_at=50))
+    assert report["detected"] == report["transitions"]  # the jam when opening, then closing from where it got stuck
+    # stuck halfway; noticed once the whole travel time (with its grace) is over
+    deadline = TRAVEL_TIME * DoorEngine.transition_grace_multiplier
+    assert report["detection_latency_max"] == pytest.approx(deadline - TRAVEL_TIME / 2)
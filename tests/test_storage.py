@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant
+
+from upsmart_garage.const import DOMAIN
+from upsmart_garage.model import GarageDoorState, StateController
+from upsmart_garage.storage import DoorHistory, DoorStore, async_remove_door_data
+
+
+async def _store_door(hass: HomeAssistant, door_id: str) -> Path:
+    """Saves learned data of a door and writes its transition log; returns path of the log"""
+    state = GarageDoorState(door_id, StateController("switch.toggle", "binary_sensor.closed", 20, None, 20))
+    await DoorStore(hass, state).async_flush()
+    history = DoorHistory(hass, state)
+    await hass.async_add_executor_job(history.log.write, b"")
+    return Path(history.log.path)
+
+
+async def test_removing_door_data_deletes_only_its_files(hass: HomeAssistant, hass_storage: dict[str, Any],
+                                                          tmp_path: Path) -> None:
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / ".storage").mkdir()
+    removed_log = await _store_door(hass, "removed")
+    kept_log = await _store_door(hass, "kept")
+    assert removed_log.exists()
+    assert f"{DOMAIN}.removed" in hass_storage
+
+    await async_remove_door_data(hass, "removed")
+    assert not removed_log.exists()
+    assert f"{DOMAIN}.removed" not in hass_storage
+    assert kept_log.exists()
+    assert f"{DOMAIN}.kept" in hass_storage
+
+    await async_remove_door_data(hass, "removed")  # nothing left to remove
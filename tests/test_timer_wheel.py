@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+
+from upsmart_garage.timer_wheel import LEVELS, SLOTS, TimerWheel
+
+from simulator import VirtualClock
+
+TICK = 0.0625  # exact in binary, so due times can be compared exactly
+
+
+class _Loop:
+    """Drives the wheel like the event loop does: a single wakeup armed at whatever time the wheel asks for"""
+
+    def __init__(self):
+        self.clock = VirtualClock()
+        self.wheel = TimerWheel(self.clock, self._wake, TICK)
+        self.fired: list[tuple[str, float]] = []
+        self._armed: Callable[[], None] | None = None
+
+    def call_later(self, delay: float, name: str, then: Callable[[], None] | None = None) -> Callable[[], None]:
+        def _fire() -> None:
+            self.fired.append((name, self.clock.monotonic()))
+            if then is not None:
+                then()
+
+        return self.wheel.call_later(delay, _fire)
+
+    def _wake(self, at: float | None) -> None:
+        if self._armed is not None:
+            self._armed()
+            self._armed = None
+        if at is not None:
+            self._armed = self.clock.call_later(at - self.clock.monotonic(), self._advance)
+
+    def _advance(self) -> None:
+        self._armed = None
+        self.wheel.advance()
+
+
+@pytest.mark.parametrize("ticks", [1, 5, SLOTS - 1, SLOTS + 3, SLOTS ** 2 + 7, SLOTS ** 3 - 1, SLOTS ** 3 * 2 + 11])
+def test_timer_fires_on_its_tick_across_levels(ticks: int) -> None:
+    loop = _Loop()
+    loop.call_later(ticks * TICK, "timer")
+    assert loop.wheel.pending == 1
+
+    loop.clock.advance()
+    assert loop.fired == [("timer", ticks * TICK)]
+    assert loop.wheel.pending == 0
+
+
+@pytest.mark.parametrize("level", range(1, LEVELS))
+def test_timers_on_slot_boundaries(level: int) -> None:
+    loop = _Loop()
+    boundary = SLOTS ** level
+    for ticks in (boundary - 1, boundary, boundary + 1):
+        loop.call_later(ticks * TICK, str(ticks))
+
+    loop.clock.advance()
+    assert loop.fired == [(str(ticks), ticks * TICK) for ticks in (boundary - 1, boundary, boundary + 1)]
+
+
+def test_delay_is_rounded_up_to_a_tick() -> None:
+    loop = _Loop()
+    loop.call_later(TICK / 3, "timer")
+    loop.clock.advance()
+    assert loop.fired == [("timer", TICK)]
+
+
+def test_timers_fire_in_order_of_due_time() -> None:
+    loop = _Loop()
+    delays = [SLOTS ** 2 + 1, 3, SLOTS + 2, 1, SLOTS ** 2 + 1]
+    for index, ticks in enumerate(delays):
+        loop.call_later(ticks * TICK, str(index))
+
+    loop.clock.advance()
+    assert [time for _name, time in loop.fired] == sorted(ticks * TICK for ticks in delays)
+
+
+@pytest.mark.parametrize("ticks", [2, SLOTS + 2, SLOTS ** 2 + 2])
+def test_cancelled_timer_never_fires(ticks: int) -> None:
+    loop = _Loop()
+    cancel = loop.call_later(ticks * TICK, "cancelled")
+    loop.call_later(ticks * TICK + 1, "kept")
+    loop.clock.advance(TICK)
+    cancel()
+    cancel()  # cancelling twice is harmless
+    assert loop.wheel.pending == 1
+
+    loop.clock.advance()
+    assert [name for name, _time in loop.fired] == ["kept"]
+
+
+def test_cancelling_a_fired_timer_is_harmless() -> None:
+    loop = _Loop()
+    cancel = loop.call_later(TICK, "timer")
+    loop.clock.advance()
+    cancel()
+    assert loop.wheel.pending == 0
+    assert loop.wheel.fired == 1
+
+
+def test_timer_can_rearm_from_its_action() -> None:
+    loop = _Loop()
+    remaining = [3]
+
+    def _rearm() -> None:
+        remaining[0] -= 1
+        if remaining[0]:
+            loop.call_later(SLOTS * TICK, "timer", _rearm)
+
+    loop.call_later(SLOTS * TICK, "timer", _rearm)
+    loop.clock.advance()
+    assert [time for _name, time in loop.fired] == [SLOTS * TICK, 2 * SLOTS * TICK, 3 * SLOTS * TICK]
+
+
+def test_timer_scheduled_for_the_same_tick_runs_in_the_same_wakeup() -> None:
+    loop = _Loop()
+    loop.call_later(TICK, "first", lambda: loop.call_later(0, "second"))
+    loop.clock.advance()
+    assert loop.fired == [("first", TICK), ("second", TICK)]
+
+
+def test_idle_wheel_needs_no_wakeup() -> None:
+    wakes: list[float | None] = []
+    clock = VirtualClock()
+    wheel = TimerWheel(clock, wakes.append, TICK)
+    cancel = wheel.call_later(1.0, lambda: None)
+    assert wakes == [1.0]
+    cancel()
+    clock.advance(1.0)
+    wheel.advance()
+    assert wakes[-1] is None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from upsmart_garage.model import DoorState, TransitionEventType
+from upsmart_garage.transition_log import ERROR_BLOCKED, ERROR_NONE, LogRecord, TransitionLog
+
+START = 1_700_000_000.0
+
+
+def _record(offset: float, direction: DoorState = DoorState.OPENED, duration: float | None = 20.0,
+            outcome: TransitionEventType = TransitionEventType.COMPLETED) -> LogRecord:
+    return LogRecord(START + offset, direction, duration, outcome,
+                     ERROR_BLOCKED if outcome is TransitionEventType.ERROR else ERROR_NONE)
+
+
+def _log(tmp_path: Path, records: list[LogRecord]) -> TransitionLog:
+    log = TransitionLog(str(tmp_path / "door.log"))
+    for record in records:
+        log.append(record)
+    log.write(log.take())
+    return log
+
+
+def test_records_are_read_back(tmp_path: Path) -> None:
+    records = [_record(0), _record(60, DoorState.CLOSED, None), _record(120, outcome=TransitionEventType.ERROR)]
+    log = _log(tmp_path, records)
+    assert log.pending == 0
+    assert log.read() == records
+
+
+def test_records_are_buffered_until_written(tmp_path: Path) -> None:
+    log = _log(tmp_path, [_record(0)])
+    log.append(_record(60))
+    assert log.pending == 1
+    assert log.read() == [_record(0)]
+
+    log.write(log.take())
+    assert log.read() == [_record(0), _record(60)]
+
+
+def test_read_window_and_limit(tmp_path: Path) -> None:
+    log = _log(tmp_path, [_record(offset) for offset in range(0, 600, 60)])
+    assert [record.timestamp - START for record in log.read(START + 120, START + 300)] == [120, 180, 240]
+    assert [record.timestamp - START for record in log.read(START + 120, limit=2)] == [120, 180]
+    assert [record.timestamp - START for record in log.read(limit=2)] == [480, 540]  # without since, the newest
+    assert log.read(START + 1000) == []
+
+
+def test_missing_log_reads_empty(tmp_path: Path) -> None:
+    log = TransitionLog(str(tmp_path / "door.log"))
+    assert log.read() == []
+    assert log.aggregate() == {}
+
+
+def test_aggregate_per_direction(tmp_path: Path) -> None:
+    log = _log(tmp_path, [
+        _record(0, DoorState.OPENED, 18.0),
+        _record(60, DoorState.OPENED, 22.0),
+        _record(120, DoorState.OPENED, None, TransitionEventType.ABORTED),
+        _record(180, DoorState.CLOSED, None, TransitionEventType.ERROR),
+        _record(240, DoorState.CLOSED, 25.0),
+    ])
+    assert log.aggregate() == {
+        "OPENED": {"count": 3, "completed": 2, "aborted": 1, "errors": 0, "measured": 2, "duration_mean": 20.0,
+                   "duration_min": 18.0, "duration_max": 22.0},
+        "CLOSED": {"count": 2, "completed": 1, "aborted": 0, "errors": 1, "measured": 1, "duration_mean": 25.0,
+                   "duration_min": 25.0, "duration_max": 25.0},
+    }
+    assert log.aggregate(START + 180)["CLOSED"]["count"] == 2
+    assert "OPENED" not in log.aggregate(START + 180)
+
+
+def test_torn_trailing_record_is_ignored_and_overwritten(tmp_path: Path) -> None:
+    log = _log(tmp_path, [_record(0), _record(60)])
+    with open(log.path, "ab") as file:  # crashed in the middle of writing a record
+        file.write(_record(120).pack()[:7])
+
+    assert log.read() == [_record(0), _record(60)]
+    assert log.aggregate()["OPENED"]["count"] == 2
+
+    log.append(_record(180))
+    log.write(log.take())
+    assert log.read() == [_record(0), _record(60), _record(180)]
+
+
+def test_log_of_another_layout_is_rejected(tmp_path: Path) -> None:
+    log = _log(tmp_path, [_record(0)])
+    with open(log.path, "r+b") as file:
+        file.write(b"XXXX")
+
+    with pytest.raises(ValueError):
+        log.read()
+
+
+def test_delete_drops_file_and_pending_records(tmp_path: Path) -> None:
+    log = _log(tmp_path, [_record(0)])
+    log.append(_record(60))
+    log.delete()
+    log.delete()  # deleting a missing log is harmless
+    assert log.pending == 0
+    assert log.read() == []
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.model import DoorState
+from upsmart_garage.transitions import (ISSUE_ERROR, LAST_STATES, READINGS, TARGETS, TRANSITIONS, Action, Effect,
+                                        EngineEvent, TransitionKey)
+
+CLOSED = DoorState.CLOSED
+OPENED = DoorState.OPENED
+SENSOR_EVENTS = {
+    EngineEvent.CLOSED_SENSOR_ON: ("closed", True),
+    EngineEvent.CLOSED_SENSOR_OFF: ("closed", False),
+    EngineEvent.OPENED_SENSOR_ON: ("opened", True),
+    EngineEvent.OPENED_SENSOR_OFF: ("opened", False),
+}
+
+
+def _end_of_travel(target: DoorState, closed: bool | None, opened: bool | None) -> Action:
+    """Travel time is over (or the motor was cut off) while there's no sensor at the target to confirm it"""
+    other = opened if target is CLOSED else closed
+    if other:  # the door never left the other end
+        issue = "open_after_closing" if target is CLOSED else "closed_after_opening"
+        return Action(Effect.FORCE, OPENED if target is CLOSED else CLOSED, True, issue, ISSUE_ERROR)
+    return Action(Effect.COMPLETE)
+
+
+def _expected(last: DoorState | None, target: DoorState | None, closed: bool | None, opened: bool | None,
+              event: EngineEvent) -> Action:
+    """
+    Semantics of the if/else handlers the table replaced, including the two asymmetries fixed along with it: the opened
+    sensor tripping on an idle door means OPENED (as with the closed sensor), and a closing door without a closed sensor
+    whose opened sensor is still on at the deadline stays OPENED (it used to be forced to CLOSED).
+    """
+    if event in SENSOR_EVENTS:
+        sensor, value = SENSOR_EVENTS[event]
+        if target is None:  # operated externally
+            return Action(Effect.FORCE, CLOSED if (sensor == "closed") == value else OPENED)
+        if value:  # reached an end
+            reached = CLOSED if sensor == "closed" else OPENED
+            if reached is target:
+                return Action(Effect.COMPLETE)
+            return Action(Effect.ABORT, error=True, issue="closed_when_opening" if reached is CLOSED
+                          else "opened_when_closing")
+        left = CLOSED if sensor == "closed" else OPENED
+        if left is not target:  # leaving the end it's headed to would be expected
+            return Action(Effect.NONE)
+        return Action(Effect.ABORT, error=True, issue="opened_when_closing" if left is CLOSED
+                      else "closed_when_opening")
+
+    if target is None:
+        if event is EngineEvent.TOGGLE:
+            return Action(Effect.BEGIN, OPENED if last is CLOSED else CLOSED)
+        return Action(Effect.NONE)
+
+    match event:
+        case EngineEvent.TOGGLE:
+            return Action(Effect.ABORT)
+        case EngineEvent.TIMER:
+            if (closed if target is CLOSED else opened) is None:
+                return _end_of_travel(target, closed, opened)
+            return Action(Effect.ABORT, error=True)
+        case EngineEvent.MOTOR_STOPPED:
+            if (closed if target is CLOSED else opened) is None:
+                return _end_of_travel(target, closed, opened)
+            return Action(Effect.NONE)  # the sensor decides
+        case EngineEvent.CHECKPOINT_OVERDUE:
+            return Action(Effect.ABORT, error=True, issue="checkpoint_overdue")
+        case EngineEvent.MOTOR_STALLED:
+            return Action(Effect.ABORT, error=True, issue="motor_stalled", severity=ISSUE_ERROR)
+
+    raise AssertionError(f"Unexpected event {event}")
+
+
+def _name(key: TransitionKey) -> str:
+    return "-".join(str(getattr(part, "name", part)) for part in key)
+
+
+def test_table_covers_every_reachable_combination() -> None:
+    reachable = [(last, target) for last in LAST_STATES for target in TARGETS if target is None or last is not target]
+    assert len(TRANSITIONS) == len(reachable) * len(READINGS) ** 2 * len(EngineEvent)
+
+
+@pytest.mark.parametrize("key", list(TRANSITIONS), ids=_name)
+def test_transition_matches_handler_semantics(key: TransitionKey) -> None:
+    action = TRANSITIONS[key]
+    expected = _expected(*key)
+    assert (action.effect, action.state, action.error, action.issue) == \
+        (expected.effect, expected.state, expected.error, expected.issue)
+    if expected.issue is not None:
+        assert action.severity == expected.severity
+
+
+@pytest.mark.parametrize("last", [OPENED, DoorState.PARTIALLY_OPEN])
+def test_closing_door_still_opened_at_deadline_stays_opened(last: DoorState) -> None:
+    action = TRANSITIONS[(last, CLOSED, None, True, EngineEvent.TIMER)]
+    assert action == Action(Effect.FORCE, OPENED, True, "open_after_closing", ISSUE_ERROR)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from upsmart_garage.travel_profile import TravelProfile
+
+
+@pytest.mark.parametrize("elapsed, expected", [(-1, 0), (0, 0), (5, 25), (10, 50), (17, 85), (20, 100), (30, 100)])
+def test_linear_fallback_without_cycles(elapsed: float, expected: float) -> None:
+    profile = TravelProfile(20.0)
+    assert not profile.fit()
+    assert profile.position(elapsed) == pytest.approx(expected)
+
+
+def test_interpolates_between_checkpoints() -> None:
+    profile = TravelProfile(20.0)
+    # slow start, e.g. the motor ramping up, then steady up to a checkpoint at 50%
+    profile.add_cycle([(0, 0), (10, 25), (15, 50), (20, 100)])
+    assert profile.fit()
+
+    assert profile.duration == 20
+    assert profile.position(5) == pytest.approx(12.5)
+    assert profile.position(10) == pytest.approx(25)
+    assert profile.position(12.5) == pytest.approx(37.5)
+    assert profile.position(17.5) == pytest.approx(75)
+    assert profile.position(25) == 100
+
+
+def test_cycles_are_averaged_and_oldest_dropped() -> None:
+    profile = TravelProfile(20.0, max_cycles=2)
+    profile.add_cycle([(0, 0), (30, 100)])  # dropped by the two below
+    profile.add_cycle([(0, 0), (16, 100)])
+    profile.add_cycle([(0, 0), (10, 50), (24, 100)])
+    profile.fit()
+
+    assert profile.cycles == 2
+    assert profile.duration == pytest.approx(20)
+    assert profile.position(9) == pytest.approx(50)  # half-way: (8 + 10) / 2 seconds
+
+
+def test_round_trip() -> None:
+    profile = TravelProfile(20.0)
+    profile.add_cycle([(0, 0), (10, 25), (22, 100)])
+    profile.fit()
+
+    restored = TravelProfile(20.0)
+    restored.load(profile.as_dict())
+    assert restored.cycles == 1
+    assert [restored.position(elapsed) for elapsed in range(25)] == [profile.position(elapsed) for elapsed in range(25)]
+
+
+@pytest.mark.parametrize("cycle", [[(0, 0)], [(1, 0), (20, 100)], [(0, 0), (20, 90)], [(0, 0), (0, 100)]])
+def test_partial_cycle_is_rejected(cycle: list[tuple[float, float]]) -> None:
+    with pytest.raises(ValueError):
+        TravelProfile(20.0).add_cycle(cycle)
+
+
+def test_duration_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        TravelProfile(0)
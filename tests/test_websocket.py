@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from upsmart_garage.const import DOMAIN, SIGNAL_DOORS_CHANGED
+from upsmart_garage.model import DoorState, GarageDoorState, StateController
+from upsmart_garage.websocket import _DoorDeltaSubscription
+
+
+def _door(entry_id: str, state: DoorState = DoorState.CLOSED) -> GarageDoorState:
+    return GarageDoorState(entry_id, StateController("switch.toggle", "binary_sensor.closed", 20, None, 20), state)
+
+
+async def _changes(hass: HomeAssistant, connection: MagicMock) -> dict | None:
+    """Returns changes sent since the last call, if any"""
+    await hass.async_block_till_done()
+    await asyncio.sleep(0)  # changes are flushed on the next event loop iteration
+    if not connection.send_message.called:
+        return None
+
+    message = connection.send_message.call_args[0][0]
+    connection.send_message.reset_mock()
+    return message["event"]["changes"]
+
+
+async def test_subscription_follows_reloaded_doors(hass: HomeAssistant) -> None:
+    doors = hass.data[DOMAIN] = {"door": _door("door")}
+    connection = MagicMock()
+    subscription = _DoorDeltaSubscription(hass, connection, 1, dict(doors), selected=True)
+
+    unloaded = doors.pop("door")
+    async_dispatcher_send(hass, SIGNAL_DOORS_CHANGED)
+    assert await _changes(hass, connection) == {"door": None}
+    unloaded.force_state(DoorState.OPENED)  # a dead door isn't watched anymore
+    assert await _changes(hass, connection) is None
+
+    reloaded = doors["door"] = _door("door")
+    doors["other"] = _door("other")  # not selected
+    async_dispatcher_send(hass, SIGNAL_DOORS_CHANGED)
+    assert await _changes(hass, connection) == {"door": reloaded.delta()}
+
+    reloaded.force_state(DoorState.OPENED)
+    assert await _changes(hass, connection) == {"door": reloaded.delta()}
+
+    subscription.unsubscribe()
+    reloaded.force_state(DoorState.CLOSED)
+    assert await _changes(hass, connection) is None
+
+
+async def test_subscription_to_all_doors_picks_up_new_doors(hass: HomeAssistant) -> None:
+    doors = hass.data[DOMAIN] = {"door": _door("door")}
+    connection = MagicMock()
+    subscription = _DoorDeltaSubscription(hass, connection, 1, dict(doors), selected=False)
+
+    added = doors["added"] = _door("added", DoorState.OPENED)
+    async_dispatcher_send(hass, SIGNAL_DOORS_CHANGED)
+    assert await _changes(hass, connection) == {"added": added.delta()}
+
+    added.force_state(DoorState.CLOSED)
+    assert await _changes(hass, connection) == {"added": added.delta()}
+    subscription.unsubscribe()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant.core import HomeAssistant
+
+from upsmart_garage.writes import async_get_writer
+
+
+class _Entity:
+    """Stands in for a door entity, recording its state writes"""
+
+    def __init__(self, writes: list[str], entity_id: str | None):
+        self.entity_id = entity_id
+        self._writes = writes
+
+    def async_write_ha_state(self) -> None:
+        self._writes.append(self.entity_id)
+
+
+async def test_dirty_marks_are_coalesced_into_one_write(hass: HomeAssistant) -> None:
+    writer = async_get_writer(hass)
+    assert async_get_writer(hass) is writer
+    writes: list[str] = []
+    first, second = _Entity(writes, "cover.first"), _Entity(writes, "cover.second")
+    for entity in (first, second, first, first, second):
+        writer.async_mark_dirty(entity)
+    assert writes == []
+
+    await asyncio.sleep(0)
+    assert writes == ["cover.first", "cover.second"]  # in order of the first change
+    assert (writer.requested, writer.written, writer.saved) == (5, 2, 3)
+
+    writer.async_mark_dirty(first)
+    await asyncio.sleep(0)
+    assert writes == ["cover.first", "cover.second", "cover.first"]
+
+
+async def test_discarded_and_unadded_entities_are_not_written(hass: HomeAssistant) -> None:
+    writer = async_get_writer(hass)
+    writes: list[str] = []
+    removed, unadded = _Entity(writes, "cover.removed"), _Entity(writes, None)
+    writer.async_mark_dirty(removed)
+    writer.async_mark_dirty(unadded)
+    writer.async_discard(removed)
+
+    await asyncio.sleep(0)
+    assert writes == []
+    assert writer.written == 0
@@ -0,0 +1,141 @@
+"""Integration-wide hierarchical timer wheel, running the timers of all doors from a single event loop wakeup"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Final
+import logging
+import math
+
+if TYPE_CHECKING:
+    from .model import Clock
+
+_LOGGER = logging.getLogger(__package__)
+
+DEFAULT_TICK: Final[float] = 0.05  # seconds; resolution of every timer, well below the debounce step
+SLOT_BITS: Final[int] = 6
+SLOTS: Final[int] = 1 << SLOT_BITS  # per level
+LEVELS: Final[int] = 3  # 3.2s, 3.4min & 3.6h spans with the default tick; longer timers get re-cascaded
+
+
+class _Timer:
+    __slots__ = ("due", "action", "slot")
+
+    def __init__(self, due: int, action: Callable[[], None]):
+        self.due = due  # tick
+        self.action: Callable[[], None] | None = action  # None once fired or cancelled
+        self.slot: dict[_Timer, None] | None = None
+
+
+class TimerWheel:
+    """
+    Timers are put into slots by their due tick, so adding and cancelling one is O(1) no matter how many are pending.
+    The lowest level covers the next SLOTS ticks one slot per tick; every level above covers SLOTS times more, and its
+    slots are cascaded down as the time approaches them.
+
+    The wheel doesn't keep time by itself - whoever drives it calls advance() at the time passed to wake, which is the
+    earliest tick anything may be due (or None when there's nothing left). An idle wheel needs no wakeups at all.
+    """
+    __slots__ = ("fired", "_clock", "_wake", "_tick", "_now", "_levels", "_pending", "_wake_at", "_advancing")
+
+    def __init__(self, clock: Clock, wake: Callable[[float | None], None], tick: float = DEFAULT_TICK):
+        if tick <= 0:
+            raise ValueError(f"Tick must be a positive number (got \"{tick}\")")
+        self.fired = 0
+        self._clock = clock
+        self._wake = wake
+        self._tick = tick
+        self._now = math.ceil(clock.monotonic() / tick)  # next tick to process; everything before it already ran
+        self._levels: list[list[dict[_Timer, None]]] = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._pending = 0
+        self._wake_at: int | None = None
+        self._advancing = False  # timers added by the actions being run are accounted for once they all ran
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def call_later(self, delay: float, action: Callable[[], None]) -> Callable[[], None]:
+        """Runs action after delay seconds (rounded up to a tick); returns a callable cancelling it, at any time"""
+        timer = _Timer(max(self._now, math.ceil((self._clock.monotonic() + delay) / self._tick)), action)
+        touched = self._insert(timer)
+        self._pending += 1
+        if not self._advancing and (self._wake_at is None or touched < self._wake_at):
+            self._wake_at = touched
+            self._wake(touched * self._tick)
+
+        def cancel() -> None:
+            if timer.action is None:  # fired or cancelled already
+                return
+            timer.action = None
+            del timer.slot[timer]
+            self._pending -= 1
+
+        return cancel
+
+    def advance(self) -> None:
+        """Runs all timers due by now, in order; to be called at the time passed to wake"""
+        until = math.floor(self._clock.monotonic() / self._tick + 1e-6)  # wakeup time may be rounded down
+        self._advancing = True
+        try:
+            while (tick := self._next_tick()) is not None and tick <= until:
+                self._now = tick
+                self._process(tick)
+                self._now = tick + 1
+        finally:
+            self._advancing = False
+        self._now = max(self._now, until + 1)
+
+        self._wake_at = self._next_tick()
+        self._wake(None if self._wake_at is None else self._wake_at * self._tick)
+
+    def _insert(self, timer: _Timer) -> int:
+        """Puts the timer into its slot; returns the tick the wheel needs to get to it (i.e. to run or cascade it)"""
+        # slot is chosen by the tick, not the delay - so it stays right while the wheel turns
+        placement = min(timer.due, self._now + SLOTS ** LEVELS - 1)  # too far ahead; re-cascaded from the top level
+        delta = placement - self._now
+        level = 0
+        while delta >= SLOTS ** (level + 1):
+            level += 1
+        timer.slot = self._levels[level][(placement >> (SLOT_BITS * level)) & (SLOTS - 1)]
+        timer.slot[timer] = None
+        return max(self._now, placement >> (SLOT_BITS * level) << (SLOT_BITS * level))
+
+    def _process(self, tick: int) -> None:
+        for level in range(LEVELS - 1, 0, -1):  # from the top, so timers cascaded twice still land in time
+            if tick & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                slot = self._levels[level][(tick >> (SLOT_BITS * level)) & (SLOTS - 1)]
+                timers = list(slot)
+                slot.clear()
+                for timer in timers:
+                    self._insert(timer)
+
+        slot = self._levels[0][tick & (SLOTS - 1)]
+        while slot:  # a timer can schedule another one for the very same tick
+            timer = next(iter(slot))
+            del slot[timer]
+            action, timer.action = timer.action, None
+            self._pending -= 1
+            self.fired += 1
+            try:
+                action()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Timer action failed")
+
+    def _next_tick(self) -> int | None:
+        """Earliest tick with timers to run or cascade"""
+        if self._pending == 0:
+            return None
+
+        earliest: int | None = None
+        for level in range(LEVELS):
+            shift = SLOT_BITS * level
+            start = self._now >> shift
+            if level > 0 and self._now & ((1 << shift) - 1):
+                start += 1  # cascade of the current slot is behind us
+            for offset in range(SLOTS):
+                if self._levels[level][(start + offset) & (SLOTS - 1)]:
+                    tick = max(self._now, (start + offset) << shift)
+                    if earliest is None or tick < earliest:
+                        earliest = tick
+                    break
+
+        return earliest
@@ -0,0 +1,59 @@
+"""In-memory ring buffer of door state transitions, used for debugging without verbose logging"""
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from .model import DoorState
+
+DEFAULT_TRACE_SIZE: Final[int] = 64
+
+
+class TransitionRecord(NamedTuple):
+    timestamp: float  # wall-clock time, so it can be correlated with HA logs
+    source: str  # what caused the transition, e.g. "closed_sensor", "timer" or "command"
+    old_state: DoorState | None
+    new_state: DoorState | None
+    target: DoorState | None  # target of the transition started, completed or aborted
+    error: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "old_state": None if self.old_state is None else self.old_state.name,
+            "new_state": None if self.new_state is None else self.new_state.name,
+            "target": None if self.target is None else self.target.name,
+            "error": self.error,
+        }
+
+
+class TransitionTrace:
+    """Fixed-size per-door trace. Records are plain tuples, so the steady-state cost is a single deque append."""
+    __slots__ = ("_records",)
+
+    def __init__(self, size: int = DEFAULT_TRACE_SIZE):
+        if size < 0:
+            raise ValueError(f"Trace size cannot be negative (got \"{size}\")")
+        self._records: deque[TransitionRecord] = deque(maxlen=size)
+
+    @property
+    def enabled(self) -> bool:
+        return self._records.maxlen != 0
+
+    def record(self, timestamp: float, source: str, old_state: DoorState | None, new_state: DoorState | None,
+               target: DoorState | None, error: bool) -> None:
+        if self._records.maxlen == 0:
+            return
+        self._records.append(TransitionRecord(timestamp, source, old_state, new_state, target, error))
+
+    def dump(self) -> list[dict[str, Any]]:
+        """Returns records from the oldest to the newest in a serializable form"""
+        return [record.as_dict() for record in self._records]
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
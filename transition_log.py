@@ -0,0 +1,193 @@
+"""Append-only binary log of finished door transitions, kept for long-term statistics outside of the recorder"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Final, Iterator, NamedTuple
+import math
+import mmap
+import os
+import struct
+
+from .model import DoorState, TransitionEventType
+
+if TYPE_CHECKING:
+    from .model import TransitionEvent
+
+# magic, version, size of a single record; the header is checked, so a log is never read with a wrong layout
+_HEADER: Final[struct.Struct] = struct.Struct("<4sHH")
+_MAGIC: Final[bytes] = b"USGL"
+_VERSION: Final[int] = 1
+# wall-clock timestamp, direction (target state code), duration (NaN when not measured), outcome code, error code
+_RECORD: Final[struct.Struct] = struct.Struct("<dbfBB")
+
+# Codes are stored in the log - never renumber them
+_OUTCOMES: Final = (TransitionEventType.COMPLETED, TransitionEventType.ABORTED, TransitionEventType.ERROR)
+_OUTCOME_CODES: Final = {outcome: code for code, outcome in enumerate(_OUTCOMES)}
+ERROR_NONE: Final[int] = 0
+ERROR_BLOCKED: Final[int] = 1  # door didn't reach its target, or moved without being asked to
+
+
+class LogRecord(NamedTuple):
+    timestamp: float  # wall-clock time the transition finished at
+    direction: DoorState  # target of the transition
+    duration: float | None  # only set for sensor-confirmed full transitions, see TransitionEvent.is_full_cycle
+    outcome: TransitionEventType
+    error: int
+
+    @classmethod
+    def from_event(cls, event: TransitionEvent, timestamp: float) -> LogRecord | None:
+        """Returns a record of a finished transition, or None if the event doesn't finish one"""
+        if event.type not in _OUTCOME_CODES or event.target is None:
+            return None
+
+        return cls(timestamp, event.target, event.duration if event.is_full_cycle else None, event.type,
+                   ERROR_BLOCKED if event.error else ERROR_NONE)
+
+    def pack(self) -> bytes:
+        return _RECORD.pack(self.timestamp, self.direction.value,
+                            math.nan if self.duration is None else self.duration,
+                            _OUTCOME_CODES[self.outcome], self.error)
+
+    @classmethod
+    def unpack(cls, raw: tuple[float, int, float, int, int]) -> LogRecord:
+        timestamp, direction, duration, outcome, error = raw
+        return cls(timestamp, DoorState(direction), None if math.isnan(duration) else duration, _OUTCOMES[outcome],
+                   error)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "direction": self.direction.name,
+            "duration": self.duration,
+            "outcome": self.outcome.value,
+            "error": self.error,
+        }
+
+
+class TransitionLog:
+    """
+    Fixed-size records appended to a single file per door. Appending only buffers a record in memory; the buffer is
+    written out with write(), which blocks and is meant to be run in a worker thread, in batches.
+
+    Records are appended in order they happened, so reads find the requested time window with a binary search over the
+    memory-mapped file, and only records within it are ever decoded.
+    """
+    __slots__ = ("path", "_pending")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pending = bytearray()
+
+    @property
+    def pending(self) -> int:
+        """Number of records not written out yet"""
+        return len(self._pending) // _RECORD.size
+
+    def append(self, record: LogRecord) -> None:
+        self._pending += record.pack()
+
+    def take(self) -> bytes:
+        """Removes buffered records, to be passed to write()"""
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+    def write(self, data: bytes) -> None:
+        with open(self.path, "ab") as file:
+            size = file.tell()
+            if size < _HEADER.size:
+                file.truncate(0)
+                file.write(_HEADER.pack(_MAGIC, _VERSION, _RECORD.size))
+            elif torn := (size - _HEADER.size) % _RECORD.size:  # crashed in the middle of the previous write
+                file.truncate(size - torn)
+            file.write(data)
+
+    def delete(self) -> None:
+        """Removes the file along with records not written out yet"""
+        self._pending.clear()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def read(self, since: float | None = None, until: float | None = None, limit: int = 100) -> list[LogRecord]:
+        """Returns up to limit records from the window, oldest first; without since it's the newest ones"""
+        with self._mapped() as mapped:
+            first, last = self._window(mapped, since, until)
+            if since is None:
+                first = max(first, last - limit)
+            else:
+                last = min(last, first + limit)
+
+            return [LogRecord.unpack(_RECORD.unpack_from(mapped, _offset(index))) for index in range(first, last)]
+
+    def aggregate(self, since: float | None = None, until: float | None = None) -> dict[str, dict[str, Any]]:
+        """Summarizes the window per direction, in a single pass over the records"""
+        totals: dict[int, list[Any]] = {}  # count, completed, aborted, errors, measured, sum, min, max
+        with self._mapped() as mapped:
+            first, last = self._window(mapped, since, until)
+            with memoryview(mapped)[_offset(first):_offset(last)] as window:
+                for _timestamp, direction, duration, outcome, _error in _RECORD.iter_unpack(window):
+                    total = totals.setdefault(direction, [0, 0, 0, 0, 0, 0.0, math.inf, -math.inf])
+                    total[0] += 1
+                    total[1 + outcome] += 1
+                    if not math.isnan(duration):
+                        total[4] += 1
+                        total[5] += duration
+                        total[6] = min(total[6], duration)
+                        total[7] = max(total[7], duration)
+
+        return {DoorState(direction).name: {
+            "count": count,
+            "completed": completed,
+            "aborted": aborted,
+            "errors": errors,
+            "measured": measured,
+            "duration_mean": duration_sum / measured if measured else None,
+            "duration_min": duration_min if measured else None,
+            "duration_max": duration_max if measured else None,
+        } for direction, (count, completed, aborted, errors, measured, duration_sum, duration_min, duration_max)
+            in totals.items()}
+
+    @contextmanager
+    def _mapped(self) -> Iterator[mmap.mmap | bytes]:
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:  # nothing was written yet
+            yield b""
+            return
+
+        with file:
+            if os.fstat(file.fileno()).st_size <= _HEADER.size:
+                yield b""
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, record_size = _HEADER.unpack_from(mapped)
+                if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size:
+                    raise ValueError(f"{self.path} is not a supported transition log")
+                yield mapped
+
+    @staticmethod
+    def _window(mapped: mmap.mmap | bytes, since: float | None, until: float | None) -> tuple[int, int]:
+        """Returns range of indexes of records within the window"""
+        count = max(0, (len(mapped) - _HEADER.size) // _RECORD.size)  # a torn record at the end is ignored
+        first = 0 if since is None else _bisect(mapped, since, 0, count)
+        last = count if until is None else _bisect(mapped, until, first, count)
+        return first, last
+
+
+def _offset(index: int) -> int:
+    return _HEADER.size + index * _RECORD.size
+
+
+def _bisect(mapped: mmap.mmap | bytes, timestamp: float, low: int, high: int) -> int:
+    """Returns index of the first record at or after the timestamp"""
+    while low < high:
+        middle = (low + high) // 2
+        if _RECORD.unpack_from(mapped, _offset(middle))[0] < timestamp:
+            low = middle + 1
+        else:
+            high = middle
+
+    return low
@@ -0,0 +1,189 @@
+"""
+Transition table of the door engine: what happens to the door state on every event, given the current state and sensor
+readings.
+
+Rules are written down below in a compact form, with wildcards. At import they are expanded into a table covering every
+possible combination, so dispatching an event is a single dictionary lookup. A combination no rule covers fails the
+import, instead of silently falling through at runtime.
+"""
+from __future__ import annotations
+
+import itertools
+from enum import Enum
+from typing import Any, Final, NamedTuple
+
+from .model import DoorState
+
+# Values match homeassistant.helpers.issue_registry.IssueSeverity, so the adapter can map them 1:1
+ISSUE_WARNING: Final = "warning"
+ISSUE_ERROR: Final = "error"
+ISSUE_CRITICAL: Final = "critical"
+
+
+class EngineEvent(Enum):
+    CLOSED_SENSOR_ON = "closed_sensor_on"
+    CLOSED_SENSOR_OFF = "closed_sensor_off"
+    OPENED_SENSOR_ON = "opened_sensor_on"
+    OPENED_SENSOR_OFF = "opened_sensor_off"
+    TOGGLE = "toggle"  # toggle pressed outside the integration
+    TIMER = "timer"  # transition took the maximum time expected
+    CHECKPOINT_OVERDUE = "checkpoint_overdue"  # door didn't reach the next checkpoint sensor in time
+    MOTOR_STALLED = "motor_stalled"  # motor power spiked mid-travel
+    MOTOR_STOPPED = "motor_stopped"  # motor power dropped to idle, i.e. the opener cut it off
+
+
+class Effect(Enum):
+    NONE = "none"
+    BEGIN = "begin"  # start a transition to the action's state
+    COMPLETE = "complete"  # finish the transition in progress
+    ABORT = "abort"  # stop the transition in progress mid-way
+    FORCE = "force"  # set the action's state, regardless of any transition in progress
+
+
+class Action(NamedTuple):
+    effect: Effect
+    state: DoorState | None = None
+    error: bool = False
+    issue: str | None = None
+    severity: str = ISSUE_WARNING
+
+
+# last state, target state (None = not in motion), closed sensor, opened sensor (None = no such sensor) and the event
+TransitionKey = tuple[DoorState | None, DoorState | None, bool | None, bool | None, EngineEvent]
+
+LAST_STATES: Final = (None, DoorState.CLOSED, DoorState.OPENED, DoorState.PARTIALLY_OPEN)
+TARGETS: Final = (None, DoorState.CLOSED, DoorState.OPENED)
+READINGS: Final = (None, False, True)
+
+ANY: Final = object()
+_ = ANY
+
+IDLE: Final = None
+CLOSED: Final = DoorState.CLOSED
+OPENED: Final = DoorState.OPENED
+
+NOTHING: Final = Action(Effect.NONE)
+
+# The first matching rule wins. Columns: target, last state, closed sensor, opened sensor, event, action
+RULES: Final[tuple[tuple[Any, Any, Any, Any, EngineEvent, Action], ...]] = (
+    # Door operated externally (e.g. with a remote) - follow the sensor
+    (IDLE, _, _, _, EngineEvent.CLOSED_SENSOR_ON, Action(Effect.FORCE, CLOSED)),
+    (IDLE, _, _, _, EngineEvent.CLOSED_SENSOR_OFF, Action(Effect.FORCE, OPENED)),
+    (IDLE, _, _, _, EngineEvent.OPENED_SENSOR_ON, Action(Effect.FORCE, OPENED)),
+    (IDLE, _, _, _, EngineEvent.OPENED_SENSOR_OFF, Action(Effect.FORCE, CLOSED)),
+    # Toggle pressed externally - a door that wasn't fully closed is most likely being closed
+    (IDLE, CLOSED, _, _, EngineEvent.TOGGLE, Action(Effect.BEGIN, OPENED)),
+    (IDLE, _, _, _, EngineEvent.TOGGLE, Action(Effect.BEGIN, CLOSED)),
+    (IDLE, _, _, _, EngineEvent.TIMER, NOTHING),  # stray timer; cannot happen as timer is cancelled on every stop
+    (IDLE, _, _, _, EngineEvent.CHECKPOINT_OVERDUE, NOTHING),
+    # Stuck between checkpoints - no need to wait for the full travel deadline
+    (_, _, _, _, EngineEvent.CHECKPOINT_OVERDUE, Action(Effect.ABORT, error=True, issue="checkpoint_overdue")),
+    # Power is only analyzed while the door moves; a spike means the motor is fighting an obstruction
+    (IDLE, _, _, _, EngineEvent.MOTOR_STALLED, NOTHING),
+    (IDLE, _, _, _, EngineEvent.MOTOR_STOPPED, NOTHING),
+    (_, _, _, _, EngineEvent.MOTOR_STALLED,
+     Action(Effect.ABORT, error=True, issue="motor_stalled", severity=ISSUE_ERROR)),
+
+    # Closing
+    (CLOSED, _, _, _, EngineEvent.CLOSED_SENSOR_ON, Action(Effect.COMPLETE)),
+    (CLOSED, _, _, _, EngineEvent.CLOSED_SENSOR_OFF, Action(Effect.ABORT, error=True, issue="opened_when_closing")),
+    (CLOSED, _, _, _, EngineEvent.OPENED_SENSOR_ON, Action(Effect.ABORT, error=True, issue="opened_when_closing")),
+    (CLOSED, _, _, _, EngineEvent.OPENED_SENSOR_OFF, NOTHING),  # leaving fully opened position, as expected
+    (CLOSED, _, _, _, EngineEvent.TOGGLE, Action(Effect.ABORT)),  # pressing the button stops the door
+    # Without a closed sensor the timer is the only way to know the door closed - unless it never left opened position
+    (CLOSED, _, None, True, EngineEvent.TIMER,
+     Action(Effect.FORCE, OPENED, error=True, issue="open_after_closing", severity=ISSUE_ERROR)),
+    (CLOSED, _, None, _, EngineEvent.TIMER, Action(Effect.COMPLETE)),
+    (CLOSED, _, _, _, EngineEvent.TIMER, Action(Effect.ABORT, error=True)),  # stuck on the way
+    # Motor cut off by the opener's limit switch - the precise completion time, if there is no sensor to wait for
+    (CLOSED, _, None, True, EngineEvent.MOTOR_STOPPED,
+     Action(Effect.FORCE, OPENED, error=True, issue="open_after_closing", severity=ISSUE_ERROR)),
+    (CLOSED, _, None, _, EngineEvent.MOTOR_STOPPED, Action(Effect.COMPLETE)),
+    (CLOSED, _, _, _, EngineEvent.MOTOR_STOPPED, NOTHING),  # the sensor reports with a delay; it or the timer decides
+
+    # Opening; mirror image of closing
+    (OPENED, _, _, _, EngineEvent.OPENED_SENSOR_ON, Action(Effect.COMPLETE)),
+    (OPENED, _, _, _, EngineEvent.OPENED_SENSOR_OFF, Action(Effect.ABORT, error=True, issue="closed_when_opening")),
+    (OPENED, _, _, _, EngineEvent.CLOSED_SENSOR_ON, Action(Effect.ABORT, error=True, issue="closed_when_opening")),
+    (OPENED, _, _, _, EngineEvent.CLOSED_SENSOR_OFF, NOTHING),
+    (OPENED, _, _, _, EngineEvent.TOGGLE, Action(Effect.ABORT)),
+    (OPENED, _, True, None, EngineEvent.TIMER,
+     Action(Effect.FORCE, CLOSED, error=True, issue="closed_after_opening", severity=ISSUE_ERROR)),
+    (OPENED, _, _, None, EngineEvent.TIMER, Action(Effect.COMPLETE)),
+    (OPENED, _, _, _, EngineEvent.TIMER, Action(Effect.ABORT, error=True)),
+    (OPENED, _, True, None, EngineEvent.MOTOR_STOPPED,
+     Action(Effect.FORCE, CLOSED, error=True, issue="closed_after_opening", severity=ISSUE_ERROR)),
+    (OPENED, _, _, None, EngineEvent.MOTOR_STOPPED, Action(Effect.COMPLETE)),
+    (OPENED, _, _, _, EngineEvent.MOTOR_STOPPED, NOTHING),
+)
+
+
+def _matches(pattern: Any, value: Any) -> bool:
+    return pattern is ANY or pattern == value
+
+
+def _compile() -> dict[TransitionKey, Action]:
+    table: dict[TransitionKey, Action] = {}
+    for last, target, closed, opened, event in itertools.product(LAST_STATES, TARGETS, READINGS, READINGS,
+                                                                 EngineEvent):
+        if target is not None and last is target:
+            continue  # not reachable - transition() refuses a target equal to the current state
+
+        for rule_target, rule_last, rule_closed, rule_opened, rule_event, action in RULES:
+            if _matches(rule_target, target) and _matches(rule_last, last) and _matches(rule_closed, closed) \
+                    and _matches(rule_opened, opened) and rule_event is event:
+                table[(last, target, closed, opened, event)] = action
+                break
+        else:
+            raise AssertionError(f"No transition rule for {(last, target, closed, opened, event)}")
+
+    return table
+
+
+TRANSITIONS: Final[dict[TransitionKey, Action]] = _compile()
+
+
+def describe() -> list[dict[str, Any]]:
+    """Returns the whole table in a serializable form, e.g. to review it or render it differently"""
+    return [{
+        "last_state": None if last is None else last.name,
+        "target": None if target is None else target.name,
+        "closed_sensor": closed,
+        "opened_sensor": opened,
+        "event": event.value,
+        "effect": action.effect.value,
+        "state": None if action.state is None else action.state.name,
+        "error": action.error,
+        "issue": action.issue,
+    } for (last, target, closed, opened, event), action in TRANSITIONS.items()]
+
+
+def mermaid() -> str:
+    """Renders the table as a Mermaid state diagram; sensor readings are folded into edge labels"""
+    edges: dict[tuple[str, str], set[str]] = {}
+    for (last, target, _closed, _opened, event), action in TRANSITIONS.items():
+        if action.effect is Effect.NONE:
+            continue
+
+        source = _node(last, target)
+        match action.effect:
+            case Effect.BEGIN:
+                destination = _node(last, action.state)
+            case Effect.COMPLETE:
+                destination = _node(target, None)
+            case Effect.ABORT:
+                destination = _node(DoorState.PARTIALLY_OPEN, None)
+            case _:
+                destination = _node(action.state, None)
+        edges.setdefault((source, destination), set()).add(event.value + (" (error)" if action.error else ""))
+
+    lines = ["stateDiagram-v2"]
+    lines.extend(f"    {source} --> {destination}: {', '.join(sorted(labels))}"
+                 for (source, destination), labels in sorted(edges.items()))
+    return "\n".join(lines)
+
+
+def _node(last: DoorState | None, target: DoorState | None) -> str:
+    if target is not None:
+        return "OPENING" if target is DoorState.OPENED else "CLOSING"
+    return "UNKNOWN" if last is None else last.name
@@ -0,0 +1,96 @@
+"""Learned, non-linear door travel profiles used for position estimation"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Any, Final, Iterable, Sequence
+
+# Positions (in % of travel) the profile keeps the expected elapsed time for
+PROFILE_GRID: Final[tuple[float, ...]] = tuple(float(p) for p in range(0, 101, 5))
+DEFAULT_MAX_CYCLES: Final[int] = 20
+
+Sample = tuple[float, float]  # (seconds since transition started, % of travel done)
+
+
+class TravelProfile:
+    """
+    Piecewise-linear mapping of time elapsed since a full transition started to the % of travel done.
+
+    Position is expressed in the direction of travel, i.e. 0 is where the door started and 100 is where it ends. Until
+    any cycle is recorded the profile assumes linear motion over the configured time, computed directly rather than
+    from a table, so a profile that hasn't learned anything yet stays small.
+    """
+    __slots__ = ("_duration", "_times", "_positions", "_cycles", "_max_cycles")
+
+    def __init__(self, duration: float, max_cycles: int = DEFAULT_MAX_CYCLES):
+        if duration <= 0:
+            raise ValueError(f"Travel duration must be a positive number (got \"{duration}\")")
+
+        self._duration = duration
+        self._positions: tuple[float, ...] = PROFILE_GRID
+        self._times: tuple[float, ...] | None = None  # None until fitted, i.e. linear over the configured duration
+        self._cycles: list[tuple[Sample, ...]] = []  # oldest first
+        self._max_cycles = max_cycles
+
+    @property
+    def duration(self) -> float:
+        return self._duration if self._times is None else self._times[-1]
+
+    @property
+    def cycles(self) -> int:
+        return len(self._cycles)
+
+    def position(self, elapsed: float) -> float:
+        """Returns % of travel done after elapsed seconds; a door slower than usual is held at the end position"""
+        times = self._times
+        if elapsed <= 0:
+            return 0.0
+        if times is None:
+            return min(100.0, 100 * elapsed / self._duration)
+
+        i = bisect_right(times, elapsed)
+        if i >= len(times):
+            return self._positions[-1]
+
+        t0, t1 = times[i - 1], times[i]
+        p0, p1 = self._positions[i - 1], self._positions[i]
+        return p1 if t1 == t0 else p0 + (p1 - p0) * (elapsed - t0) / (t1 - t0)
+
+    def add_cycle(self, samples: Iterable[Sample]) -> None:
+        """Records an observed full transition; samples must start at (0, 0) and end at (duration, 100)"""
+        cycle = tuple(sorted(samples, key=lambda sample: sample[1]))
+        if len(cycle) < 2 or cycle[0] != (0, 0) or cycle[-1][1] != 100 or cycle[-1][0] <= 0:
+            raise ValueError(f"Cycle must span the full travel (got {cycle})")
+
+        self._cycles.append(cycle)
+        if len(self._cycles) > self._max_cycles:
+            del self._cycles[0]
+
+    def fit(self) -> bool:
+        """Rebuilds the lookup table from all recorded cycles at once; returns False if there's nothing to fit"""
+        if not self._cycles:
+            return False
+
+        cycles = len(self._cycles)
+        self._times = tuple(
+            sum(_time_at(cycle, position) for cycle in self._cycles) / cycles for position in self._positions
+        )
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"cycles": [[list(sample) for sample in cycle] for cycle in self._cycles]}
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Restores recorded cycles and refits the profile"""
+        self._cycles.clear()
+        for cycle in data.get("cycles", []):
+            self.add_cycle((float(elapsed), float(position)) for elapsed, position in cycle)
+        self.fit()
+
+
+def _time_at(cycle: Sequence[Sample], position: float) -> float:
+    """Interpolates the time at which the door reached the position in a single recorded cycle"""
+    for (t0, p0), (t1, p1) in zip(cycle, cycle[1:]):
+        if position <= p1:
+            return t1 if p1 == p0 else t0 + (t1 - t0) * (position - p0) / (p1 - p0)
+
+    return cycle[-1][0]
@@ -0,0 +1,133 @@
+"""WebSocket subscription to compact door state deltas, for dashboards watching many doors at once"""
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import ATTR_DEVICE_ID, DOMAIN, SIGNAL_DOORS_CHANGED, WS_TYPE_SUBSCRIBE_DOORS
+from .services import resolve_doors
+
+if TYPE_CHECKING:
+    from .model import GarageDoorState, TransitionEvent
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, _ws_subscribe_doors)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_TYPE_SUBSCRIBE_DOORS,
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+@callback
+def _ws_subscribe_doors(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """
+    Sends a snapshot of the selected doors (all by default), followed by changes only. Every door is a list of last
+    state code, target state code, wall-clock transition start and error flag (see GarageDoorState.delta()).
+
+    Doors unloaded in the meantime are sent as null, and doors set up again (e.g. reloaded) are sent in full. Without a
+    selection, doors added later are sent as well.
+    """
+    try:
+        doors = resolve_doors(hass, msg.get(ATTR_DEVICE_ID))
+    except HomeAssistantError as e:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(e))
+        return
+
+    subscription = _DoorDeltaSubscription(hass, connection, msg["id"], doors, bool(msg.get(ATTR_DEVICE_ID)))
+    connection.subscriptions[msg["id"]] = subscription.unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": dict(subscription.sent)}))
+
+
+class _DoorDeltaSubscription:
+    """
+    Doors changing within one event loop iteration are sent in a single message, and only if what the client got last
+    time differs - e.g. a transition started and aborted right away costs nothing.
+
+    Door states are replaced when their config entry is reloaded, so the subscription re-attaches to whatever is set up
+    every time doors change.
+    """
+    __slots__ = ("sent", "_hass", "_connection", "_id", "_entry_ids", "_doors", "_changed", "_scheduled",
+                 "_unsubscribes", "_stop_watching_doors")
+
+    def __init__(self, hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg_id: int,
+                 doors: dict[str, GarageDoorState], selected: bool):
+        self.sent = {entry_id: state.delta() for entry_id, state in doors.items()}  # as the client knows them
+        self._hass = hass
+        self._connection = connection
+        self._id = msg_id
+        self._entry_ids = set(doors) if selected else None  # None = all doors, including the ones added later
+        self._doors: dict[str, GarageDoorState] = {}
+        self._changed: dict[str, None] = {}
+        self._scheduled = False
+        self._unsubscribes: dict[str, CALLBACK_TYPE] = {}
+        for entry_id, state in doors.items():
+            self._watch(entry_id, state)
+        self._stop_watching_doors: CALLBACK_TYPE | None = \
+            async_dispatcher_connect(hass, SIGNAL_DOORS_CHANGED, self._on_doors_changed)
+
+    @callback
+    def unsubscribe(self) -> None:
+        if self._stop_watching_doors is not None:
+            self._stop_watching_doors()
+            self._stop_watching_doors = None
+        for entry_id in list(self._doors):
+            self._unwatch(entry_id)
+
+    def _watch(self, entry_id: str, state: GarageDoorState) -> None:
+        self._doors[entry_id] = state
+        self._unsubscribes[entry_id] = state.subscribe(partial(self._on_change, entry_id))
+
+    def _unwatch(self, entry_id: str) -> None:
+        del self._doors[entry_id]
+        self._unsubscribes.pop(entry_id)()
+
+    @callback
+    def _on_doors_changed(self) -> None:
+        doors: dict[str, GarageDoorState] = self._hass.data.get(DOMAIN, {})
+        for entry_id, state in list(self._doors.items()):
+            if doors.get(entry_id) is not state:  # unloaded, or reloaded in the meantime
+                self._unwatch(entry_id)
+                self._mark_changed(entry_id)
+        for entry_id, state in doors.items():
+            if entry_id not in self._doors and (self._entry_ids is None or entry_id in self._entry_ids):
+                self._watch(entry_id, state)
+                self._mark_changed(entry_id)
+
+    @callback
+    def _on_change(self, entry_id: str, _event: TransitionEvent) -> None:
+        self._mark_changed(entry_id)
+
+    def _mark_changed(self, entry_id: str) -> None:
+        self._changed[entry_id] = None
+        if not self._scheduled:
+            self._scheduled = True
+            self._hass.loop.call_soon(self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        self._scheduled = False
+        changes = {}
+        for entry_id in self._changed:
+            state = self._doors.get(entry_id)
+            if state is None:
+                if self.sent.pop(entry_id, None) is not None:
+                    changes[entry_id] = None
+                continue
+
+            delta = state.delta()
+            if delta != self.sent.get(entry_id):
+                self.sent[entry_id] = changes[entry_id] = delta
+        self._changed.clear()
+
+        if changes and self._stop_watching_doors is not None:
+            self._connection.send_message(websocket_api.event_message(self._id, {"changes": changes}))
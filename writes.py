@@ -0,0 +1,62 @@
+"""Coalescing of entity state writes, so a burst of changes results in a single write per event loop iteration"""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import DATA_WRITER
+
+_LOGGER = logging.getLogger(__package__)
+
+
+class StateWriteCoalescer:
+    """Integration-wide set of entities with pending state changes, flushed once per event loop iteration"""
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._dirty: dict[Entity, None] = {}  # dict rather than set, so writes happen in the order of changes
+        self._scheduled = False
+
+        self.requested = 0
+        self.written = 0
+
+    @property
+    def saved(self) -> int:
+        """Number of writes avoided so far"""
+        return self.requested - self.written - len(self._dirty)
+
+    @callback
+    def async_mark_dirty(self, entity: Entity) -> None:
+        self.requested += 1
+        self._dirty[entity] = None
+        if not self._scheduled:
+            self._scheduled = True
+            self._hass.loop.call_soon(self._flush)
+
+    @callback
+    def async_discard(self, entity: Entity) -> None:
+        """Forgets pending write of an entity, e.g. when it is being removed"""
+        self._dirty.pop(entity, None)
+
+    @callback
+    def _flush(self) -> None:
+        self._scheduled = False
+        dirty, self._dirty = self._dirty, {}
+        for entity in dirty:
+            if entity.entity_id is None:  # not added to HA yet; it will write its state once added anyway
+                continue
+            entity.async_write_ha_state()
+            self.written += 1
+
+        _LOGGER.debug("Flushed %d state writes (%d saved so far)", len(dirty), self.saved)
+
+
+@callback
+def async_get_writer(hass: HomeAssistant) -> StateWriteCoalescer:
+    writer: StateWriteCoalescer | None = hass.data.get(DATA_WRITER)
+    if writer is None:
+        writer = hass.data[DATA_WRITER] = StateWriteCoalescer(hass)
+
+    return writer